@@ -0,0 +1,346 @@
+"""
+Admission Control
+
+Sentiment analysis, hype analysis on the product detail and recommendation
+ranking are CPU-bound, so a burst of them can occupy every worker and starve
+the cheap endpoints. Views decorated with @admission_controlled(name), and
+functions wrapped with admission_required(name, func), are limited in two ways
+before any work is done:
+
+- Rate: each client (the logged-in user, otherwise the remote address) gets a
+  token bucket per endpoint holding `burst` requests and refilled at `rate`
+  requests per second. An empty bucket gets a 429.
+- Concurrency: at most `max_concurrent` requests of the endpoint run at once.
+  Further requests get a 503 immediately instead of queueing.
+
+Both responses carry Retry-After. Limits come from ADMISSION_<NAME>_RATE,
+ADMISSION_<NAME>_BURST and ADMISSION_<NAME>_CONCURRENCY (0 disables a limit).
+The ADMISSION_CONTROL config setting turns it all off (TestingConfig does).
+
+State is kept per process by default (ADMISSION_BACKEND=memory). With
+ADMISSION_BACKEND=local it is shared by all workers on the host through files
+in ADMISSION_STATE_DIR: concurrency slots are flock()ed files, released by the
+kernel if a worker dies, and token buckets live in a small SQLite database.
+Limits are then per host rather than per worker. Errors in the shared backend
+admit the request rather than failing it.
+
+Behind a reverse proxy, configure werkzeug's ProxyFix so the remote address is
+the client's rather than the proxy's.
+
+Cached endpoints wrap only the computation run on a cache miss, so cache hits
+are never limited. Requests coalesced onto another's computation wait without
+taking a slot and share its outcome, including a rejection.
+"""
+
+import fcntl
+import functools
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from flask import current_app, jsonify, request
+from flask_login import current_user
+
+from backend.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_BACKEND = os.environ.get("ADMISSION_BACKEND", "memory")
+ADMISSION_STATE_DIR = os.environ.get(
+    "ADMISSION_STATE_DIR", os.path.join(tempfile.gettempdir(), "sentiment_admission"))
+# Seconds a client is told to wait when all of an endpoint's slots are busy
+ADMISSION_RETRY_AFTER = int(os.environ.get("ADMISSION_RETRY_AFTER", "1"))
+# Buckets kept in memory before full (idle) ones are dropped
+MAX_TRACKED_CLIENTS = 10000
+# Shared buckets untouched for this many seconds are deleted, every CLEANUP_INTERVAL updates
+IDLE_BUCKET_SECONDS = 3600
+CLEANUP_INTERVAL = 1000
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """Limits for one endpoint; a value of 0 disables that limit"""
+    max_concurrent: int
+    rate: float
+    burst: int
+
+    @classmethod
+    def from_env(cls, name, max_concurrent, rate, burst):
+        prefix = f"ADMISSION_{name.upper()}_"
+        return cls(
+            max_concurrent=int(os.environ.get(prefix + "CONCURRENCY", max_concurrent)),
+            rate=float(os.environ.get(prefix + "RATE", rate)),
+            burst=int(os.environ.get(prefix + "BURST", burst)),
+        )
+
+
+POLICIES = {
+    "analyze": AdmissionPolicy.from_env("analyze", max_concurrent=4, rate=5, burst=10),
+    "product_detail": AdmissionPolicy.from_env("product_detail", max_concurrent=4, rate=10, burst=20),
+    "recommendations": AdmissionPolicy.from_env("recommendations", max_concurrent=4, rate=10, burst=20),
+}
+
+
+def _refill(tokens, updated, now, rate, burst):
+    return min(float(burst), tokens + (now - updated) * rate)
+
+
+def _wait_seconds(tokens, rate):
+    """Whole seconds until a bucket holding `tokens` has one to spend"""
+    return max(1, math.ceil((1 - tokens) / rate))
+
+
+class MemoryTokenBuckets:
+    """Token buckets in a dict, shared by the threads of one process"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Spend a token from the key's bucket, returning 0 or the seconds to wait for one"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+            tokens = _refill(tokens, updated, now, rate, burst)
+            wait = _wait_seconds(tokens, rate) if tokens < 1 else 0
+            if not wait:
+                tokens -= 1
+            # Keep when the bucket will be full again, after which it is the same as a missing one
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+            return wait
+
+
+class MemorySlots:
+    """Per-endpoint concurrency slots for the threads of one process"""
+
+    def __init__(self):
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, name, limit):
+        with self._lock:
+            if (name, limit) not in self._semaphores:
+                self._semaphores[name, limit] = threading.BoundedSemaphore(limit)
+            return self._semaphores[name, limit]
+
+    def acquire(self, name, limit):
+        """Take a slot without blocking, returning a handle for release() or None"""
+        semaphore = self._semaphore(name, limit)
+        return semaphore if semaphore.acquire(blocking=False) else None
+
+    def release(self, name, handle):
+        handle.release()
+
+
+class LocalTokenBuckets:
+    """Token buckets in a SQLite file shared by the worker processes of a host"""
+
+    def __init__(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, "buckets.db")
+        self._local = threading.local()
+        self._updates = 0
+        with sqlite3.connect(self.path, timeout=1) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+        conn.close()
+
+    def _connection(self):
+        # One connection per thread, reopened in workers forked after it was created
+        conn, pid = getattr(self._local, "conn", (None, None))
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            # Bucket state is disposable; losing the last writes on a crash is fine
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = (conn, os.getpid())
+        return conn
+
+    def take(self, key, rate, burst):
+        """Spend a token from the key's bucket, returning 0 or the seconds to wait for one"""
+        # Wall-clock time, since monotonic clocks are not comparable between processes
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM bucket WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(*row, now, rate, burst) if row else float(burst)
+            wait = _wait_seconds(tokens, rate) if tokens < 1 else 0
+            conn.execute("INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?, ?, ?)",
+                         (key, tokens if wait else tokens - 1, now))
+            self._updates += 1
+            if self._updates % CLEANUP_INTERVAL == 0:
+                conn.execute("DELETE FROM bucket WHERE updated < ?", (now - IDLE_BUCKET_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class LocalSlots:
+    """
+    Per-endpoint concurrency slots shared by the worker processes of a host
+
+    Slot i of an endpoint is an exclusive flock() on <name>.<i>.slot. flock()
+    locks belong to the open file, which the threads of a process share, so a
+    thread lock per slot keeps two threads of one worker from holding the same
+    slot.
+    """
+
+    def __init__(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_dir = state_dir
+        self._slots = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _endpoint_slots(self, name, limit):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Files opened before a fork share their locks with the parent
+                self._slots, self._pid = {}, os.getpid()
+            if (name, limit) not in self._slots:
+                self._slots[name, limit] = [
+                    (os.open(os.path.join(self.state_dir, f"{name}.{i}.slot"), os.O_RDWR | os.O_CREAT, 0o600),
+                     threading.Lock())
+                    for i in range(limit)
+                ]
+            return self._slots[name, limit]
+
+    def acquire(self, name, limit):
+        """Take a free slot without blocking, returning a handle for release() or None"""
+        for fd, thread_lock in self._endpoint_slots(name, limit):
+            if not thread_lock.acquire(blocking=False):
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                thread_lock.release()
+                continue
+            except BaseException:
+                thread_lock.release()
+                raise
+            return fd, thread_lock
+        return None
+
+    def release(self, name, handle):
+        fd, thread_lock = handle
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+
+def create_backend(kind=ADMISSION_BACKEND, state_dir=ADMISSION_STATE_DIR):
+    """(token buckets, concurrency slots) for a backend kind: memory or local"""
+    if kind == "memory":
+        return MemoryTokenBuckets(), MemorySlots()
+    if kind == "local":
+        return LocalTokenBuckets(state_dir), LocalSlots(state_dir)
+    raise ValueError(f"Unknown ADMISSION_BACKEND: {kind}")
+
+
+_buckets, _slots = create_backend()
+
+
+def client_key():
+    """Identify the client: the logged-in user, otherwise the remote address"""
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    return f"ip:{request.remote_addr}"
+
+
+class AdmissionRejected(Exception):
+    """Raised by admitted() for a request over an endpoint's limits"""
+
+    def __init__(self, name, reason, status, message, retry_after):
+        super().__init__(f"{name}: {reason}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    def response(self):
+        """The 429 or 503 response for the rejected request"""
+        return jsonify({"error": self.message}), self.status, {"Retry-After": str(self.retry_after)}
+
+
+def _reject(name, reason, status, message, retry_after):
+    registry.inc("admission_rejected_total", {"endpoint": name, "reason": reason})
+    return AdmissionRejected(name, reason, status, message, retry_after)
+
+
+@contextmanager
+def admitted(name):
+    """Apply POLICIES[name] to the block, raising AdmissionRejected if the request is over a limit"""
+    if not current_app.config.get("ADMISSION_CONTROL", True):
+        yield
+        return
+    # Looked up per request so limits can be changed at runtime
+    policy = POLICIES[name]
+    if policy.rate > 0 and policy.burst > 0:
+        try:
+            wait = _buckets.take(f"{name}:{client_key()}", policy.rate, policy.burst)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, admitting request: {e}")
+            wait = 0
+        if wait:
+            raise _reject(name, "rate_limited", 429, "Rate limit exceeded", wait)
+
+    if policy.max_concurrent <= 0:
+        yield
+        return
+    try:
+        handle = _slots.acquire(name, policy.max_concurrent)
+    except Exception as e:
+        logger.warning(f"Concurrency limiter unavailable, admitting request: {e}")
+        yield
+        return
+    if handle is None:
+        raise _reject(name, "overloaded", 503, "Server busy, try again shortly", ADMISSION_RETRY_AFTER)
+    try:
+        yield
+    finally:
+        _slots.release(name, handle)
+
+
+def admission_controlled(name):
+    """Decorator applying POLICIES[name] to a view before it runs"""
+    if name not in POLICIES:
+        raise KeyError(f"No admission policy named {name}")
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with admitted(name):
+                    return view(*args, **kwargs)
+            except AdmissionRejected as e:
+                return e.response()
+        return wrapper
+    return decorator
+
+
+def admission_required(name, func):
+    """
+    func wrapped to run under POLICIES[name]
+
+    For the computation behind a cache lookup, so only cache misses count
+    against the limits. Callers turn AdmissionRejected into e.response().
+    """
+    if name not in POLICIES:
+        raise KeyError(f"No admission policy named {name}")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with admitted(name):
+            return func(*args, **kwargs)
+    return wrapper
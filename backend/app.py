@@ -1,15 +1,27 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, current_app, jsonify, request, session, stream_with_context
 from flask_cors import CORS
 from flask_login import login_user, logout_user, login_required, current_user
 import logging
 import os
 from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment, get_sentiment_keywords, analyze_hype_vs_reality
-from backend.product_data import get_products, get_product_by_id
+from backend.product_data import get_products, get_product_by_id, products as sample_products
 from backend.recommendations import get_recommendations_for_product, get_top_rated_products
+from backend.personalization import get_personalized_recommendations, saved_product_ids
+from backend.metrics import render_prometheus
+from backend.db_routing import read_replica, replica_stream
+from backend.admission import AdmissionRejected, admission_controlled, admission_required
+from backend.single_flight import SingleFlight
+from backend.product_cache import product_cache, product_traffic
+from backend.password_hashing import PasswordHashingBusy
+from backend.user_cache import user_cache
+from backend.job_queue import JOB_HANDLERS, JOB_STATUSES, cancel_job, job_dict, retry_job, submit_job
+from backend.aspect_summary import ASPECT_FIELDS, aspects_from_reviews, find_products_by_aspect
+from backend.review_export import EXPORT_TABLES, arrow_stream, parse_date_filter, require_pyarrow
+from backend.sentiment_rollup import TIMELINE_BUCKETS, get_sentiment_timeline, timeline_from_reviews
 
 # Get the db from parent module
 from app import db
-from models import User
+from models import Job, Product, User, UserSavedProduct
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -17,6 +29,16 @@ logging.basicConfig(level=logging.DEBUG)
 # Create blueprint
 bp = Blueprint('backend', __name__, url_prefix='/api')
 
+# Largest limits accepted by the aspect lookup and the recommendation endpoints
+MAX_ASPECT_PRODUCTS = 100
+MAX_RECOMMENDATIONS = 20
+
+def bounded_limit(limit, maximum):
+    """A limit query parameter capped at maximum, or None if it is below 1"""
+    if limit is None or limit < 1:
+        return None
+    return min(limit, maximum)
+
 @bp.route('/')
 def home():
     return jsonify({"message": "Sentiment Analysis E-Commerce API"})
@@ -60,6 +82,9 @@ def register():
                 "email": user.email
             }
         }), 201
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         logging.error(f"Error registering user: {str(e)}")
         db.session.rollback()
@@ -93,6 +118,8 @@ def login():
                 "email": user.email
             }
         })
+    except PasswordHashingBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         logging.error(f"Error logging in: {str(e)}")
         return jsonify({"error": "Failed to log in"}), 500
@@ -102,6 +129,7 @@ def logout():
     """Log out the current user"""
     try:
         if current_user.is_authenticated:
+            user_cache.invalidate(current_user.id)
             logout_user()
             return jsonify({"message": "Logged out successfully"})
         else:
@@ -124,171 +152,436 @@ def get_user():
     else:
         return jsonify({"error": "Not authenticated"}), 401
 
+def add_review_sentiment(products):
+    """
+    Score the sample reviews of each product in the list and set its sentiment_score
+    """
+    # Add sentiment score to each product
+    for product in products:
+        # Calculate sentiment for each review
+        review_sentiments = []
+        for review in product["reviews"]:
+            sentiment_score = analyze_sentiment(review["text"])
+            review_sentiments.append(sentiment_score)
+
+        # Calculate overall sentiment score (weighted average based on Amazon review methodology)
+        if review_sentiments:
+            # Amazon style weighting - more weight to recent and longer reviews
+            product["sentiment_score"] = sum(review_sentiments) / len(review_sentiments)
+        else:
+            product["sentiment_score"] = 0.5  # Neutral if no reviews
+    return products
+
+# Concurrent cache misses for the same product share one computation (see backend/single_flight.py)
+product_detail_flight = SingleFlight("product_detail")
+recommendations_flight = SingleFlight("recommendations")
+personalized_flight = SingleFlight("personalized_recommendations")
+
+def build_product_detail(product):
+    """
+    Add sentiment counts, weighted score, key aspects and "Hype vs Reality"
+    analysis to a product detail dictionary
+    """
+    # Check if we need to process reviews
+    if "sentiment_counts" not in product and "reviews" in product and product["reviews"]:
+        # Initialize sentiment counts
+        sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
+
+        for review in product["reviews"]:
+            # Skip processing if review already has sentiment
+            if "sentiment" not in review:
+                # Analyze sentiment of the review
+                sentiment_score = analyze_sentiment(review["text"])
+                review["sentiment"] = sentiment_score
+
+                # Classify sentiment for counting
+                sentiment_class = classify_sentiment(sentiment_score)
+
+                # Extract keywords that contribute to the sentiment (if not already present)
+                if "keywords" not in review:
+                    review["keywords"] = get_sentiment_keywords(review["text"], sentiment_class)
+            else:
+                # Use existing sentiment class
+                sentiment_score = review["sentiment"]
+                sentiment_class = classify_sentiment(sentiment_score)
+
+            # Count the sentiment classes
+            sentiment_counts[sentiment_class] += 1
+
+        # Add sentiment counts to the response if not already present
+        if "sentiment_counts" not in product:
+            product["sentiment_counts"] = sentiment_counts
+
+    # Initialize sentiment_counts if not done already
+    if "sentiment_counts" not in product:
+        product["sentiment_counts"] = {"positive": 0, "neutral": 0, "negative": 0}
+
+        # If we have reviews, count sentiments
+        if "reviews" in product and product["reviews"]:
+            for review in product["reviews"]:
+                if "sentiment" in review:
+                    sentiment_class = classify_sentiment(review["sentiment"])
+                    product["sentiment_counts"][sentiment_class] += 1
+
+    # Calculate overall sentiment score (weighted average based on Amazon review methodology)
+    # Only do this if we need to and if there are reviews to process
+    if "sentiment_score" not in product and "reviews" in product and product["reviews"]:
+        # Only consider reviews that have sentiment scores
+        valid_reviews = [r for r in product["reviews"] if "sentiment" in r]
+
+        if valid_reviews:
+            # Process reviews in chronological order (newer reviews have more weight)
+            sorted_reviews = sorted(valid_reviews, key=lambda x: x.get("date", ""), reverse=True)
+
+            # Apply weighted averaging giving more weight to recent reviews
+            review_weights = []
+            review_scores = []
+
+            for i, review in enumerate(sorted_reviews):
+                # Weight based on recency (higher index = older review)
+                recency_weight = max(0.5, 1.0 - (i * 0.1))
+
+                # Weight based on review length (longer reviews get more weight)
+                length_weight = min(1.5, max(0.5, len(review["text"]) / 100))
+
+                total_weight = recency_weight * length_weight
+                review_weights.append(total_weight)
+                review_scores.append(review["sentiment"])
+
+            # Calculate weighted average
+            if review_weights and review_scores:
+                weighted_score = sum(w * s for w, s in zip(review_weights, review_scores)) / sum(review_weights)
+                product["sentiment_score"] = weighted_score
+            else:
+                product["sentiment_score"] = 0.5  # Neutral if no valid reviews
+        else:
+            product["sentiment_score"] = 0.5  # Neutral if no valid reviews
+    elif "sentiment_score" not in product:
+        product["sentiment_score"] = 0.5  # Neutral if no reviews or sentiment_score
+
+    # Ranked key aspects of sentiment; database products carry the precomputed summary
+    if "key_aspects" not in product:
+        product["key_aspects"] = aspects_from_reviews(product.get("reviews", []))
+
+    # Ensure sentiment counts is initialized
+    if "sentiment_counts" not in product:
+        product["sentiment_counts"] = {"positive": 0, "neutral": 0, "negative": 0}
+
+    # Add "Hype vs Reality" analysis by comparing product description with reviews
+    if "reviews" in product and product["reviews"]:
+        # analyze_hype_vs_reality needs each review's text and sentiment
+        hype_reviews = [r for r in product["reviews"] if "text" in r]
+        if hype_reviews and product.get("description"):
+            try:
+                product["hype_vs_reality"] = analyze_hype_vs_reality(
+                    product.get("description", ""), 
+                    hype_reviews
+                )
+            except Exception as hype_error:
+                logging.error(f"Error in hype vs reality analysis: {str(hype_error)}")
+                product["hype_vs_reality"] = {
+                    "matches": [],
+                    "contradictions": [],
+                    "marketing_claims": []
+                }
+        else:
+            product["hype_vs_reality"] = {
+                "matches": [],
+                "contradictions": [],
+                "marketing_claims": []
+            }
+    else:
+        product["hype_vs_reality"] = {
+            "matches": [],
+            "contradictions": [],
+            "marketing_claims": []
+        }
+    return product
+
+def product_summary_dict(product):
+    """
+    Convert a product model to the summary format used by recommendation lists
+    """
+    return {
+        "id": product.id,
+        "name": product.name,
+        "category": product.category,
+        "price": product.price,
+        "description": product.description,
+        "image_url": product.image_url,
+        "sentiment_scores": {
+            "positive": product.positive_score,
+            "neutral": product.neutral_score,
+            "negative": product.negative_score
+        }
+    }
+
+def load_product_detail(product_id):
+    """The product detail response for a product, or None if it doesn't exist"""
+    product = get_product_by_id(product_id)
+    return build_product_detail(product) if product else None
+
+def load_recommendations(product_id, limit):
+    """Summaries of the products recommended for a product"""
+    return [product_summary_dict(product) for product in get_recommendations_for_product(product_id, limit=limit)]
+
 @bp.route('/products', methods=['GET'])
+@read_replica
 def api_get_products():
     """
     Get all products with sentiment analysis
     """
     try:
-        products = get_products()
-        # Add sentiment score to each product
-        for product in products:
-            # Calculate sentiment for each review
-            review_sentiments = []
-            for review in product["reviews"]:
-                sentiment_score = analyze_sentiment(review["text"])
-                review_sentiments.append(sentiment_score)
-                
-            # Calculate overall sentiment score (weighted average based on Amazon review methodology)
-            if review_sentiments:
-                # Amazon style weighting - more weight to recent and longer reviews
-                product["sentiment_score"] = sum(review_sentiments) / len(review_sentiments)
-            else:
-                product["sentiment_score"] = 0.5  # Neutral if no reviews
-        
+        products = add_review_sentiment(get_products())
         return jsonify(products)
     except Exception as e:
         logging.error(f"Error fetching products: {str(e)}")
         return jsonify({"error": "Failed to fetch products"}), 500
 
 @bp.route('/products/<int:product_id>', methods=['GET'])
+@read_replica
 def api_get_product(product_id):
     """
     Get product details with sentiment analysis
     """
     try:
-        product = get_product_by_id(product_id)
-        if not product:
+        product_traffic.record(product_id)
+        detail = product_cache.get_or_compute(
+            ("detail", product_id), product_detail_flight,
+            admission_required("product_detail", load_product_detail), product_id)
+        if not detail:
             return jsonify({"error": "Product not found"}), 404
         
-        # Check if we need to process reviews
-        if "sentiment_counts" not in product and "reviews" in product and product["reviews"]:
-            # Initialize sentiment counts
-            sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
-            
-            for review in product["reviews"]:
-                # Skip processing if review already has sentiment
-                if "sentiment" not in review:
-                    # Analyze sentiment of the review
-                    sentiment_score = analyze_sentiment(review["text"])
-                    review["sentiment"] = sentiment_score
-                    
-                    # Classify sentiment for counting
-                    sentiment_class = classify_sentiment(sentiment_score)
-                    
-                    # Extract keywords that contribute to the sentiment (if not already present)
-                    if "keywords" not in review:
-                        review["keywords"] = get_sentiment_keywords(review["text"], sentiment_class)
-                else:
-                    # Use existing sentiment class
-                    sentiment_score = review["sentiment"]
-                    sentiment_class = classify_sentiment(sentiment_score)
-                
-                # Count the sentiment classes
-                sentiment_counts[sentiment_class] += 1
-            
-            # Add sentiment counts to the response if not already present
-            if "sentiment_counts" not in product:
-                product["sentiment_counts"] = sentiment_counts
-        
-        # Initialize sentiment_counts if not done already
-        if "sentiment_counts" not in product:
-            product["sentiment_counts"] = {"positive": 0, "neutral": 0, "negative": 0}
-            
-            # If we have reviews, count sentiments
-            if "reviews" in product and product["reviews"]:
-                for review in product["reviews"]:
-                    if "sentiment" in review:
-                        sentiment_class = classify_sentiment(review["sentiment"])
-                        product["sentiment_counts"][sentiment_class] += 1
-        
-        # Calculate overall sentiment score (weighted average based on Amazon review methodology)
-        # Only do this if we need to and if there are reviews to process
-        if "sentiment_score" not in product and "reviews" in product and product["reviews"]:
-            # Only consider reviews that have sentiment scores
-            valid_reviews = [r for r in product["reviews"] if "sentiment" in r]
-            
-            if valid_reviews:
-                # Process reviews in chronological order (newer reviews have more weight)
-                sorted_reviews = sorted(valid_reviews, key=lambda x: x.get("date", ""), reverse=True)
-                
-                # Apply weighted averaging giving more weight to recent reviews
-                review_weights = []
-                review_scores = []
-                
-                for i, review in enumerate(sorted_reviews):
-                    # Weight based on recency (higher index = older review)
-                    recency_weight = max(0.5, 1.0 - (i * 0.1))
-                    
-                    # Weight based on review length (longer reviews get more weight)
-                    length_weight = min(1.5, max(0.5, len(review["text"]) / 100))
-                    
-                    total_weight = recency_weight * length_weight
-                    review_weights.append(total_weight)
-                    review_scores.append(review["sentiment"])
-                
-                # Calculate weighted average
-                if review_weights and review_scores:
-                    weighted_score = sum(w * s for w, s in zip(review_weights, review_scores)) / sum(review_weights)
-                    product["sentiment_score"] = weighted_score
-                else:
-                    product["sentiment_score"] = 0.5  # Neutral if no valid reviews
-            else:
-                product["sentiment_score"] = 0.5  # Neutral if no valid reviews
-        elif "sentiment_score" not in product:
-            product["sentiment_score"] = 0.5  # Neutral if no reviews or sentiment_score
-            
-        # Add keyword extraction for key aspects of sentiment
-        product["key_aspects"] = {
-            "positive": [],
-            "negative": []
-        }
-        
-        # Extract key aspects from positive and negative reviews
-        if "reviews" in product:
-            for review in product["reviews"]:
-                if "sentiment" in review:
-                    if review["sentiment"] >= 0.7:  # Strongly positive
-                        product["key_aspects"]["positive"].extend(review.get("keywords", []))
-                    elif review["sentiment"] <= 0.3:  # Strongly negative
-                        product["key_aspects"]["negative"].extend(review.get("keywords", []))
-        
-        # Ensure sentiment counts is initialized
-        if "sentiment_counts" not in product:
-            product["sentiment_counts"] = {"positive": 0, "neutral": 0, "negative": 0}
-        
-        # Add "Hype vs Reality" analysis by comparing product description with reviews
-        if "reviews" in product and product["reviews"]:
-            review_texts = [r.get("text", "") for r in product["reviews"] if "text" in r]
-            if review_texts and product.get("description"):
-                try:
-                    product["hype_vs_reality"] = analyze_hype_vs_reality(
-                        product.get("description", ""), 
-                        review_texts
-                    )
-                except Exception as hype_error:
-                    logging.error(f"Error in hype vs reality analysis: {str(hype_error)}")
-                    product["hype_vs_reality"] = {
-                        "matching_claims": [],
-                        "contradicting_claims": []
-                    }
-            else:
-                product["hype_vs_reality"] = {
-                    "matching_claims": [],
-                    "contradicting_claims": []
-                }
-        else:
-            product["hype_vs_reality"] = {
-                "matching_claims": [],
-                "contradicting_claims": []
-            }
-        
-        return jsonify(product)
+        return jsonify(detail)
+    except AdmissionRejected as e:
+        return e.response()
     except Exception as e:
         logging.error(f"Error fetching product {product_id}: {str(e)}")
         return jsonify({"error": f"Failed to fetch product {product_id}"}), 500
 
+@bp.route('/products/<int:product_id>/sentiment-timeline', methods=['GET'])
+@read_replica
+def api_get_sentiment_timeline(product_id):
+    """
+    Get review sentiment counts and mean score per week or month
+    """
+    try:
+        bucket = request.args.get('bucket', default='month', type=str)
+        if bucket not in TIMELINE_BUCKETS:
+            return jsonify({"error": f"bucket must be one of: {', '.join(TIMELINE_BUCKETS)}"}), 400
+
+        if Product.query.get(product_id):
+            timeline = get_sentiment_timeline(product_id, bucket)
+        else:
+            # Fall back to the sample data, which has no rollups
+            product = next((p for p in sample_products if p["id"] == product_id), None)
+            if not product:
+                return jsonify({"error": "Product not found"}), 404
+            timeline = timeline_from_reviews(product["reviews"], bucket)
+
+        return jsonify({
+            "product_id": product_id,
+            "bucket": bucket,
+            "timeline": timeline
+        })
+    except Exception as e:
+        logging.error(f"Error fetching sentiment timeline for product {product_id}: {str(e)}")
+        return jsonify({"error": f"Failed to fetch sentiment timeline for product {product_id}"}), 500
+
+@bp.route('/aspects/<keyword>', methods=['GET'])
+@read_replica
+def api_get_products_by_aspect(keyword):
+    """
+    Get products praised (or criticized) for a sentiment keyword or keyword category
+    """
+    try:
+        field = request.args.get('field', default='keyword', type=str)
+        polarity = request.args.get('polarity', default='positive', type=str)
+        limit = bounded_limit(request.args.get('limit', default=20, type=int), MAX_ASPECT_PRODUCTS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        if field not in ASPECT_FIELDS:
+            return jsonify({"error": f"field must be one of: {', '.join(ASPECT_FIELDS)}"}), 400
+        if polarity not in ("positive", "negative"):
+            return jsonify({"error": "polarity must be positive or negative"}), 400
+
+        return jsonify({
+            field: keyword.lower(),
+            "polarity": polarity,
+            "products": find_products_by_aspect(db.session, keyword, field, polarity, limit)
+        })
+    except Exception as e:
+        logging.error(f"Error fetching products for aspect {keyword}: {str(e)}")
+        return jsonify({"error": f"Failed to fetch products for aspect {keyword}"}), 500
+
+@bp.route('/export/<table>', methods=['GET'])
+def api_export(table):
+    """
+    Stream reviews or product aggregates as an Arrow IPC stream (admin only)
+    """
+    error = admin_error()
+    if error:
+        return error
+    try:
+        if table not in EXPORT_TABLES:
+            return jsonify({"error": f"table must be one of: {', '.join(EXPORT_TABLES)}"}), 400
+        require_pyarrow()
+
+        product_ids = [int(pid) for pid in request.args.getlist('product_id')]
+        filters = {
+            "start_date": parse_date_filter(request.args.get('start_date')),
+            "end_date": parse_date_filter(request.args.get('end_date'), end=True),
+            "product_ids": product_ids or None,
+        }
+        return Response(
+            # The body streams after the view returns, so the generator routes its own reads
+            stream_with_context(replica_stream(arrow_stream(db.session, table, **filters))),
+            mimetype="application/vnd.apache.arrow.stream",
+            headers={"Content-Disposition": f"attachment; filename={table}.arrows"}
+        )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid filter: {str(e)}"}), 400
+    except ImportError as e:
+        logging.error(f"Export unavailable: {str(e)}")
+        return jsonify({"error": "Export is not available on this server"}), 501
+    except Exception as e:
+        logging.error(f"Error exporting {table}: {str(e)}")
+        return jsonify({"error": f"Failed to export {table}"}), 500
+
+def admin_error():
+    """Error response unless the current user is listed in ADMIN_USERNAMES"""
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not authenticated"}), 401
+    if current_user.username not in current_app.config.get("ADMIN_USERNAMES", []):
+        return jsonify({"error": "Admin access required"}), 403
+    return None
+
+def import_params():
+    """Import job parameters from an uploaded file or a file_path under JOB_IMPORT_DIR"""
+    import_dir = current_app.config["JOB_IMPORT_DIR"]
+    upload = request.files.get('file')
+    if upload is not None:
+        import uuid
+        from werkzeug.utils import secure_filename
+
+        upload_dir = os.path.join(import_dir, "uploads")
+        os.makedirs(upload_dir, exist_ok=True)
+        file_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}_{secure_filename(upload.filename or 'reviews')}")
+        upload.save(file_path)
+        options = request.form
+    else:
+        options = request.get_json(silent=True) or {}
+        if not options.get('file_path'):
+            raise ValueError("Provide a file upload or a file_path")
+        file_path = os.path.realpath(os.path.join(import_dir, options['file_path']))
+        if os.path.commonpath([file_path, import_dir]) != import_dir or not os.path.isfile(file_path):
+            raise ValueError(f"file_path must name a file in {import_dir}")
+
+    params = {"file_path": file_path}
+    if options.get('format'):
+        params["file_format"] = options['format']
+    if options.get('limit'):
+        params["limit"] = int(options['limit'])
+    return params
+
+@bp.route('/jobs', methods=['POST'])
+def api_submit_job():
+    """
+    Queue a background job (admin only): an import of an uploaded or server-side file,
+    a cleanup run or a re-scoring run
+    """
+    error = admin_error()
+    if error:
+        return error
+    try:
+        kind = request.form.get('kind') if request.files else (request.get_json(silent=True) or {}).get('kind')
+        if kind not in JOB_HANDLERS:
+            return jsonify({"error": f"kind must be one of: {', '.join(sorted(JOB_HANDLERS))}"}), 400
+        params = import_params() if kind == "import" else {}
+        job = submit_job(db.session, kind, params)
+        return jsonify(job_dict(job)), 202
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error submitting job: {str(e)}")
+        return jsonify({"error": "Failed to submit job"}), 500
+
+@bp.route('/jobs', methods=['GET'])
+def api_jobs():
+    """
+    List recent jobs, newest first (admin only)
+    """
+    error = admin_error()
+    if error:
+        return error
+    try:
+        status = request.args.get('status')
+        if status and status not in JOB_STATUSES:
+            return jsonify({"error": f"status must be one of: {', '.join(JOB_STATUSES)}"}), 400
+        limit = min(request.args.get('limit', 50, type=int), 500)
+
+        query = Job.query.order_by(Job.id.desc())
+        if status:
+            query = query.filter_by(status=status)
+        return jsonify([job_dict(job) for job in query.limit(limit)])
+    except Exception as e:
+        logging.error(f"Error listing jobs: {str(e)}")
+        return jsonify({"error": "Failed to list jobs"}), 500
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+def api_job(job_id):
+    """
+    Status and progress of a job (admin only)
+    """
+    error = admin_error()
+    if error:
+        return error
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_dict(job))
+
+@bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """
+    Cancel a queued job, or ask the worker running it to stop (admin only)
+    """
+    error = admin_error()
+    if error:
+        return error
+    try:
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job_dict(cancel_job(db.session, job)))
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error cancelling job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to cancel job"}), 500
+
+@bp.route('/jobs/<int:job_id>/retry', methods=['POST'])
+def api_retry_job(job_id):
+    """
+    Re-queue a failed or cancelled job (admin only)
+    """
+    error = admin_error()
+    if error:
+        return error
+    try:
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job_dict(retry_job(db.session, job)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error retrying job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to retry job"}), 500
+
 @bp.route('/analyze', methods=['POST'])
+@admission_controlled("analyze")
 def api_analyze_sentiment():
     """
     Analyze sentiment of provided text
@@ -312,45 +605,130 @@ def api_analyze_sentiment():
         return jsonify({"error": "Failed to analyze sentiment"}), 500
 
 @bp.route('/products/<int:product_id>/recommendations', methods=['GET'])
+@read_replica
 def api_get_recommendations(product_id):
     """
     Get product recommendations based on sentiment analysis
     """
     try:
-        # Get the limit parameter from query string (default to 3)
-        limit = request.args.get('limit', default=3, type=int)
-        
-        # Get recommended products
-        recommended_products = get_recommendations_for_product(product_id, limit=limit)
-        
-        # Return as JSON
-        result = []
-        for product in recommended_products:
-            # Convert product model to dict
-            product_dict = {
-                "id": product.id,
-                "name": product.name,
-                "category": product.category,
-                "price": product.price,
-                "description": product.description,
-                "image_url": product.image_url,
-                "sentiment_scores": {
-                    "positive": product.positive_score,
-                    "neutral": product.neutral_score,
-                    "negative": product.negative_score
-                }
-            }
-            result.append(product_dict)
+        # Get the limit parameter from query string (default to 3), before it becomes part of the cache key
+        limit = bounded_limit(request.args.get('limit', default=3, type=int), MAX_RECOMMENDATIONS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+
+        # Get recommended products, as dictionaries so requests can share them
+        result = product_cache.get_or_compute(
+            ("recommendations", product_id, limit), recommendations_flight,
+            admission_required("recommendations", load_recommendations), product_id, limit)
             
         return jsonify({
             "product_id": product_id,
             "recommendations": result
         })
+    except AdmissionRejected as e:
+        return e.response()
     except Exception as e:
         logging.error(f"Error getting recommendations for product {product_id}: {str(e)}")
         return jsonify({"error": f"Failed to get recommendations for product {product_id}"}), 500
 
+@bp.route('/products/<int:product_id>/save', methods=['POST'])
+def api_save_product(product_id):
+    """
+    Save a product for the current user
+    """
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        if db.session.get(Product, product_id) is None:
+            return jsonify({"error": "Product not found"}), 404
+        saved = UserSavedProduct.query.filter_by(user_id=current_user.id, product_id=product_id).first()
+        if saved is not None:
+            return jsonify({"product_id": product_id, "saved": True})
+
+        db.session.add(UserSavedProduct(user_id=current_user.id, product_id=product_id))
+        db.session.commit()
+        product_cache.invalidate(("for_me", current_user.id))
+        return jsonify({"product_id": product_id, "saved": True}), 201
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error saving product {product_id}: {str(e)}")
+        return jsonify({"error": f"Failed to save product {product_id}"}), 500
+
+@bp.route('/products/<int:product_id>/save', methods=['DELETE'])
+def api_unsave_product(product_id):
+    """
+    Remove a product from the current user's saved products
+    """
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        deleted = UserSavedProduct.query.filter_by(user_id=current_user.id, product_id=product_id).delete()
+        db.session.commit()
+        if not deleted:
+            return jsonify({"error": "Product not saved"}), 404
+        product_cache.invalidate(("for_me", current_user.id))
+        return jsonify({"product_id": product_id, "saved": False})
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error unsaving product {product_id}: {str(e)}")
+        return jsonify({"error": f"Failed to unsave product {product_id}"}), 500
+
+@bp.route('/saved-products', methods=['GET'])
+def api_get_saved_products():
+    """
+    Get the current user's saved products, most recently saved first
+    """
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        product_ids = saved_product_ids(db.session, current_user.id)
+        products = {product.id: product for product in Product.query.filter(Product.id.in_(product_ids))}
+        return jsonify({
+            "saved_products": [product_summary_dict(products[pid]) for pid in product_ids if pid in products]
+        })
+    except Exception as e:
+        logging.error(f"Error getting saved products: {str(e)}")
+        return jsonify({"error": "Failed to get saved products"}), 500
+
+def load_personalized_recommendations(saved_ids, limit):
+    """Summaries of the products recommended for someone who saved saved_ids"""
+    return [product_summary_dict(product)
+            for product in get_personalized_recommendations(db.session, saved_ids, limit)]
+
+@bp.route('/recommendations/for-me', methods=['GET'])
+def api_get_recommendations_for_me():
+    """
+    Get recommendations based on the current user's saved products, or the
+    top-rated products if they have saved none
+    """
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        limit = bounded_limit(request.args.get('limit', default=5, type=int), MAX_RECOMMENDATIONS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        # Keyed by the saved products too, so other workers' cached results for
+        # an older set of saved products are never served
+        saved_ids = tuple(saved_product_ids(db.session, current_user.id))
+        if not saved_ids:
+            result = [product_summary_dict(product) for product in get_top_rated_products(limit=limit)]
+        else:
+            result = product_cache.get_or_compute(
+                ("for_me", current_user.id, limit, saved_ids), personalized_flight,
+                admission_required("recommendations", load_personalized_recommendations), saved_ids, limit)
+
+        return jsonify({
+            "personalized": bool(saved_ids),
+            "recommendations": result
+        })
+    except AdmissionRejected as e:
+        return e.response()
+    except Exception as e:
+        logging.error(f"Error getting recommendations for user {current_user.id}: {str(e)}")
+        return jsonify({"error": "Failed to get recommendations"}), 500
+
 @bp.route('/recommendations/top-rated', methods=['GET'])
+@read_replica
 def api_get_top_rated():
     """
     Get top rated products based on sentiment score
@@ -358,29 +736,15 @@ def api_get_top_rated():
     try:
         # Get the category and limit parameters from query string
         category = request.args.get('category', default=None, type=str)
-        limit = request.args.get('limit', default=5, type=int)
-        
+        limit = bounded_limit(request.args.get('limit', default=5, type=int), MAX_RECOMMENDATIONS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+
         # Get top rated products
         top_products = get_top_rated_products(category=category, limit=limit)
         
         # Return as JSON
-        result = []
-        for product in top_products:
-            # Convert product model to dict
-            product_dict = {
-                "id": product.id,
-                "name": product.name,
-                "category": product.category,
-                "price": product.price,
-                "description": product.description,
-                "image_url": product.image_url,
-                "sentiment_scores": {
-                    "positive": product.positive_score,
-                    "neutral": product.neutral_score,
-                    "negative": product.negative_score
-                }
-            }
-            result.append(product_dict)
+        result = [product_summary_dict(product) for product in top_products]
             
         return jsonify({
             "category": category,
@@ -390,6 +754,17 @@ def api_get_top_rated():
         logging.error(f"Error getting top rated products: {str(e)}")
         return jsonify({"error": "Failed to get top rated products"}), 500
 
+@bp.route('/metrics', methods=['GET'])
+def api_metrics():
+    """
+    Expose request, SQL and hot-path timings in Prometheus text format
+    """
+    try:
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        logging.error(f"Error rendering metrics: {str(e)}")
+        return jsonify({"error": "Failed to render metrics"}), 500
+
 # Apply CORS to blueprint
 CORS(bp, supports_credentials=True)
 
@@ -0,0 +1,284 @@
+"""
+Product Aspect Summaries
+
+For each product, how often each sentiment keyword (from get_sentiment_keywords)
+is mentioned in its strongly positive and strongly negative reviews, with an
+example context, stored in ProductAspect. The product detail endpoint returns
+the top-ranked aspects from this table instead of collecting every keyword of
+every review per request.
+
+Like the sentiment timeline rollups, summaries are updated incrementally when
+a review is imported or re-scored and can be rebuilt from scratch with
+rebuild_aspect_summaries. The keyword changes of a batch of reviews are
+collected with aspect_deltas and applied as increments in two statements
+(apply_aspect_deltas), so concurrent writers don't overwrite each other's
+counts.
+
+The same table, indexed by keyword and by category, doubles as an inverted
+index: find_products_by_aspect ranks the products praised or criticized for a
+keyword (or any keyword of a category) without reading any reviews.
+"""
+
+import json
+import logging
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+
+from backend.upsert import insert_or_increment
+
+logger = logging.getLogger(__name__)
+
+# Review sentiment scores at or beyond which keywords count as key aspects
+POSITIVE_ASPECT_THRESHOLD = 0.7
+NEGATIVE_ASPECT_THRESHOLD = 0.3
+
+# Aspects returned per polarity
+TOP_ASPECTS = 10
+
+# Products returned by an aspect lookup
+TOP_PRODUCTS = 20
+
+ASPECT_FIELDS = ("keyword", "category")
+
+# Rows fetched per round trip and inserted per statement when rebuilding
+BATCH_SIZE = 5000
+
+
+def aspect_polarity(sentiment_score):
+    """'positive' or 'negative' for strongly polarized reviews, otherwise None"""
+    if sentiment_score is None:
+        return None
+    if sentiment_score >= POSITIVE_ASPECT_THRESHOLD:
+        return "positive"
+    if sentiment_score <= NEGATIVE_ASPECT_THRESHOLD:
+        return "negative"
+    return None
+
+
+def parse_keywords(sentiment_keywords):
+    """Keyword dicts from a review's sentiment_keywords (a parsed list, or JSON text)"""
+    if not sentiment_keywords:
+        return []
+    if isinstance(sentiment_keywords, str):
+        try:
+            sentiment_keywords = json.loads(sentiment_keywords)
+        except json.JSONDecodeError:
+            return []
+    return [kw for kw in sentiment_keywords if isinstance(kw, dict) and kw.get("keyword")]
+
+
+def _mentions(sentiment_score, keywords):
+    """(polarity, keyword dict) pairs a review contributes, one per distinct keyword"""
+    polarity = aspect_polarity(sentiment_score)
+    if polarity is None:
+        return []
+    seen = set()
+    mentions = []
+    for kw in parse_keywords(keywords):
+        if kw["keyword"] not in seen:
+            seen.add(kw["keyword"])
+            mentions.append((polarity, kw))
+    return mentions
+
+
+def aspect_deltas(product_id, old=None, new=None):
+    """
+    ProductAspect rows holding the mention count changes of a review's keyword
+    change, for apply_aspect_deltas (arguments as for record_review_aspects)
+    """
+    rows = []
+    for sign, change in ((-1, old), (1, new)):
+        if change is None:
+            continue
+        for polarity, kw in _mentions(*change):
+            rows.append({
+                "product_id": product_id, "polarity": polarity, "keyword": kw["keyword"],
+                "category": kw.get("category"), "mention_count": sign,
+                "example_context": (kw.get("context") or None) if sign > 0 else None,
+            })
+    return rows
+
+
+def apply_aspect_deltas(session, rows):
+    """
+    Apply aspect_deltas rows (of any number of reviews and products) as
+    increments: one INSERT ... ON CONFLICT DO UPDATE for the aspects that gain
+    mentions and one UPDATE for those that lose them
+
+    Args:
+        session: Session to update the summaries in (not committed)
+        rows: Rows from aspect_deltas
+    """
+    from models import ProductAspect
+
+    net = {}
+    for row in rows:
+        key = (row["product_id"], row["polarity"], row["keyword"])
+        if key in net:
+            net[key]["mention_count"] += row["mention_count"]
+            net[key]["example_context"] = net[key]["example_context"] or row["example_context"]
+        else:
+            net[key] = dict(row)
+
+    gained = [row for row in net.values() if row["mention_count"] > 0]
+    insert_or_increment(session, ProductAspect, gained, ["product_id", "polarity", "keyword"],
+                        ["mention_count"], fill_columns=["example_context"])
+
+    lost = [{"b_product_id": row["product_id"], "b_polarity": row["polarity"], "b_keyword": row["keyword"],
+             "b_count": row["mention_count"]} for row in net.values() if row["mention_count"] < 0]
+    if lost:
+        # Aspects missing from the summary are not created with negative counts
+        table = ProductAspect.__table__
+        session.execute(
+            update(table)
+            .where(table.c.product_id == bindparam("b_product_id"), table.c.polarity == bindparam("b_polarity"),
+                   table.c.keyword == bindparam("b_keyword"))
+            .values(mention_count=table.c.mention_count + bindparam("b_count")),
+            lost,
+        )
+
+
+def record_review_aspects(session, product_id, old=None, new=None):
+    """
+    Apply a review's keyword change to its product's aspect summary
+
+    Args:
+        session: Session to update the summary in (not committed)
+        product_id: The review's product
+        old: (sentiment_score, sentiment_keywords) before the change, None for a new review
+        new: (sentiment_score, sentiment_keywords) after the change, None for a deleted review
+    """
+    apply_aspect_deltas(session, aspect_deltas(product_id, old, new))
+
+
+def rebuild_aspect_summaries(session):
+    """Recompute all aspect summaries from the reviews, returning the number of rows written"""
+    from models import ProductAspect, Review
+
+    summaries = {}
+    result = session.execute(
+        select(Review.product_id, Review.sentiment_score, Review.sentiment_keywords)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for product_id, sentiment_score, sentiment_keywords in result:
+        for polarity, kw in _mentions(sentiment_score, sentiment_keywords):
+            key = (product_id, polarity, kw["keyword"])
+            row = summaries.get(key)
+            if row is None:
+                row = summaries[key] = {
+                    "product_id": product_id, "polarity": polarity, "keyword": kw["keyword"],
+                    "category": kw.get("category"), "mention_count": 0, "example_context": None,
+                }
+            row["mention_count"] += 1
+            if not row["example_context"] and kw.get("context"):
+                row["example_context"] = kw["context"]
+
+    session.execute(delete(ProductAspect))
+    rows = list(summaries.values())
+    for i in range(0, len(rows), BATCH_SIZE):
+        session.execute(insert(ProductAspect), rows[i:i + BATCH_SIZE])
+    session.commit()
+    logger.info(f"Rebuilt {len(rows)} product aspect rows")
+    return len(rows)
+
+
+def aspect_entry(keyword, category, count, context):
+    entry = {"keyword": keyword, "category": category, "count": count}
+    if context:
+        entry["context"] = context
+    return entry
+
+
+def aspect_summary_query(product_id, polarity, limit=TOP_ASPECTS):
+    """Select statement for a product's top aspects of one polarity"""
+    from models import ProductAspect
+
+    return select(ProductAspect).where(
+        ProductAspect.product_id == product_id,
+        ProductAspect.polarity == polarity,
+        ProductAspect.mention_count > 0,
+    ).order_by(ProductAspect.mention_count.desc(), ProductAspect.keyword).limit(limit)
+
+
+def summary_from_aspects(aspects_by_polarity):
+    """Key aspects response from ProductAspect rows grouped by polarity"""
+    return {
+        polarity: [aspect_entry(a.keyword, a.category, a.mention_count, a.example_context) for a in aspects]
+        for polarity, aspects in aspects_by_polarity.items()
+    }
+
+
+def get_aspect_summary(session, product_id, limit=TOP_ASPECTS):
+    """Top aspects of a product by mention count for each polarity"""
+    return summary_from_aspects({
+        polarity: session.scalars(aspect_summary_query(product_id, polarity, limit)).all()
+        for polarity in ("positive", "negative")
+    })
+
+
+def aspects_from_reviews(reviews, limit=TOP_ASPECTS):
+    """Same summary computed from review dicts with sentiment and keywords (sample data fallback)"""
+    counts = {"positive": {}, "negative": {}}
+    for review in reviews:
+        for polarity, kw in _mentions(review.get("sentiment"), review.get("keywords")):
+            entry = counts[polarity].get(kw["keyword"])
+            if entry is None:
+                entry = counts[polarity][kw["keyword"]] = aspect_entry(
+                    kw["keyword"], kw.get("category"), 0, kw.get("context"))
+            elif "context" not in entry and kw.get("context"):
+                entry["context"] = kw["context"]
+            entry["count"] += 1
+    return {
+        polarity: sorted(entries.values(), key=lambda e: (-e["count"], e["keyword"]))[:limit]
+        for polarity, entries in counts.items()
+    }
+
+
+def find_products_by_aspect(session, term, field="keyword", polarity="positive", limit=TOP_PRODUCTS):
+    """
+    Products whose strongly positive (or negative) reviews mention a keyword or category
+
+    Args:
+        session: Database session
+        term: Keyword (e.g. "flimsy") or category (e.g. "quality") to look up
+        field: "keyword" or "category"
+        polarity: Rank by "positive" or "negative" mentions
+        limit: Maximum number of products to return
+
+    Returns:
+        List of dicts with product info and positive/negative mention counts, best first
+    """
+    from models import Product, ProductAspect
+
+    column = ProductAspect.keyword if field == "keyword" else ProductAspect.category
+    positive = func.sum(case((ProductAspect.polarity == "positive", ProductAspect.mention_count), else_=0))
+    negative = func.sum(case((ProductAspect.polarity == "negative", ProductAspect.mention_count), else_=0))
+    ranked = positive if polarity == "positive" else negative
+
+    mentions = (
+        select(ProductAspect.product_id, positive.label("positive"), negative.label("negative"))
+        .where(column == term.lower())
+        .group_by(ProductAspect.product_id)
+        .having(ranked > 0)
+        .order_by(ranked.desc(), ProductAspect.product_id)
+        .limit(limit)
+        .subquery()
+    )
+    order = mentions.c.positive if polarity == "positive" else mentions.c.negative
+    rows = session.execute(
+        select(Product, mentions.c.positive, mentions.c.negative)
+        .join(mentions, Product.id == mentions.c.product_id)
+        .order_by(order.desc(), Product.id)
+    )
+    return [
+        {
+            "id": product.id,
+            "name": product.name,
+            "category": product.category,
+            "price": product.price,
+            "image_url": product.image_url,
+            "positive_mentions": int(positive_count),
+            "negative_mentions": int(negative_count),
+        }
+        for product, positive_count, negative_count in rows
+    ]
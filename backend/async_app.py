@@ -0,0 +1,217 @@
+"""
+Async Read API
+
+ASGI application serving the read-only product endpoints (products, product
+detail, recommendations, top-rated) with async views, so a slow query no
+longer pins a worker. Sentiment scoring and recommendation ranking are
+CPU-bound and run in a thread pool, keeping the event loop free to accept and
+serve other requests.
+
+Responses match the blueprint in backend/app.py:
+
+- The product list and top-rated products are queried with an async database
+  driver, in the same order as the blueprint's queries.
+- The product detail and recommendations run the blueprint's loaders in the
+  thread pool, through the same product cache and request coalescing (and
+  recommendation candidate generation), with the Flask app's database
+  session on the read replica. Cache misses therefore use the sync driver.
+
+Admission control is not applied here; run the async API behind a proxy
+that limits it. Auth, /api/analyze and the rest of the API stay on the Flask
+app.
+
+Requires the optional async dependencies:
+    pip install quart aiosqlite asyncpg uvicorn "sqlalchemy[asyncio]"
+
+Run with:
+    uvicorn backend.async_app:app --host 0.0.0.0 --port 5001 --workers 4
+"""
+
+import asyncio
+import copy
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from quart import Quart, jsonify, request
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import aliased
+except ImportError as e:
+    raise ImportError(
+        f"The async read API requires optional dependencies ({e}). "
+        "Install them with: pip install quart aiosqlite asyncpg uvicorn sqlalchemy[asyncio]"
+    ) from e
+
+from app import app as flask_app
+from models import Product, Review
+from backend.categories import category_filter
+from backend.app import (
+    MAX_RECOMMENDATIONS, add_review_sentiment, bounded_limit, load_product_detail, load_recommendations,
+    product_detail_flight, product_summary_dict, recommendations_flight
+)
+from backend.db_routing import replica_reads
+from backend.product_cache import product_cache, product_traffic
+from backend.product_data import product_list_dict, products as sample_products
+
+logger = logging.getLogger(__name__)
+
+# Threads used for CPU-bound sentiment and recommendation work
+CPU_WORKERS = int(os.environ.get("ASYNC_CPU_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+
+# Reviews included with each product in the product list
+PRODUCT_LIST_REVIEWS = 3
+
+
+def async_database_url(url):
+    """Convert a sync database URL to its async driver equivalent"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def create_engine_from_config(config):
+    """Async engine for the replica if configured, otherwise the primary database"""
+    url = config.get("SQLALCHEMY_REPLICA_URI") or config["SQLALCHEMY_DATABASE_URI"]
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    if url.startswith("postgres"):
+        # asyncpg does not understand the psycopg2 sslmode query parameter
+        url = url.replace("sslmode=", "ssl=")
+    return create_async_engine(async_database_url(url), **options)
+
+
+app = Quart(__name__)
+engine = create_engine_from_config(flask_app.config)
+Session = async_sessionmaker(engine, expire_on_commit=False)
+executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+
+
+async def run_cpu_bound(func, *args):
+    """Run a CPU-bound function in the thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def fetch_products_with_reviews():
+    """Load all products with the first few reviews of each, in two queries"""
+    async with Session() as session:
+        products_db = (await session.scalars(select(Product).order_by(Product.id))).all()
+        if not products_db:
+            return None
+
+        # Number each product's reviews so the sample can be fetched for all products at once
+        row_number = func.row_number().over(
+            partition_by=Review.product_id, order_by=Review.id
+        ).label("row_number")
+        numbered = select(Review, row_number).subquery()
+        sampled = aliased(Review, numbered)
+        query = select(sampled).where(numbered.c.row_number <= PRODUCT_LIST_REVIEWS)
+        reviews_by_product = defaultdict(list)
+        for review in (await session.scalars(query)).all():
+            reviews_by_product[review.product_id].append(review)
+
+    return [product_list_dict(product, reviews_by_product[product.id]) for product in products_db]
+
+
+def load_cached(key, flight, loader, *args):
+    """The blueprint's cached payload for the key, computed with loader(*args) on a miss"""
+    with flask_app.app_context(), replica_reads():
+        return product_cache.get_or_compute(key, flight, loader, *args)
+
+
+def load_product_detail_cached(product_id):
+    product_traffic.record(product_id)
+    return load_cached(("detail", product_id), product_detail_flight, load_product_detail, product_id)
+
+
+@app.route('/api/products', methods=['GET'])
+async def api_get_products():
+    """
+    Get all products with sentiment analysis
+    """
+    try:
+        products = await fetch_products_with_reviews()
+        if products is None:
+            # Fall back to sample data if the database is empty
+            products = copy.deepcopy(sample_products)
+        return jsonify(await run_cpu_bound(add_review_sentiment, products))
+    except Exception as e:
+        logging.error(f"Error fetching products: {str(e)}")
+        return jsonify({"error": "Failed to fetch products"}), 500
+
+
+@app.route('/api/products/<int:product_id>', methods=['GET'])
+async def api_get_product(product_id):
+    """
+    Get product details with sentiment analysis
+    """
+    try:
+        detail = await run_cpu_bound(load_product_detail_cached, product_id)
+        if not detail:
+            return jsonify({"error": "Product not found"}), 404
+
+        return jsonify(detail)
+    except Exception as e:
+        logging.error(f"Error fetching product {product_id}: {str(e)}")
+        return jsonify({"error": f"Failed to fetch product {product_id}"}), 500
+
+
+@app.route('/api/products/<int:product_id>/recommendations', methods=['GET'])
+async def api_get_recommendations(product_id):
+    """
+    Get product recommendations based on sentiment analysis
+    """
+    try:
+        limit = bounded_limit(request.args.get('limit', default=3, type=int), MAX_RECOMMENDATIONS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        result = await run_cpu_bound(
+            load_cached, ("recommendations", product_id, limit), recommendations_flight,
+            load_recommendations, product_id, limit)
+        return jsonify({
+            "product_id": product_id,
+            "recommendations": result
+        })
+    except Exception as e:
+        logging.error(f"Error getting recommendations for product {product_id}: {str(e)}")
+        return jsonify({"error": f"Failed to get recommendations for product {product_id}"}), 500
+
+
+@app.route('/api/recommendations/top-rated', methods=['GET'])
+async def api_get_top_rated():
+    """
+    Get top rated products based on sentiment score
+    """
+    try:
+        category = request.args.get('category', default=None, type=str)
+        limit = bounded_limit(request.args.get('limit', default=5, type=int), MAX_RECOMMENDATIONS)
+        if limit is None:
+            return jsonify({"error": "limit must be at least 1"}), 400
+
+        async with Session() as session:
+            query = select(Product)
+            if category:
+                condition = await session.run_sync(category_filter, category)
+                query = query.where(condition)
+            query = query.order_by(Product.positive_score.desc()).limit(limit)
+            top_products = (await session.scalars(query)).all()
+
+        return jsonify({
+            "category": category,
+            "top_rated": [product_summary_dict(product) for product in top_products]
+        })
+    except Exception as e:
+        logging.error(f"Error getting top rated products: {str(e)}")
+        return jsonify({"error": "Failed to get top rated products"}), 500
+
+
+@app.after_serving
+async def shutdown():
+    await engine.dispose()
+    executor.shutdown(wait=False)
@@ -0,0 +1,304 @@
+"""
+Canonical Product Categories
+
+The importer maps each product's category to a row of the Category table, so
+spellings that only differ in case or whitespace ("Electronics",
+"electronics ") are one category with one integer ID. A record's
+comma-separated Datafiniti categories are read as the product's category
+followed by successively broader ones, and each entry becomes the parent of
+the one before it (the first parent seen for a category is kept).
+
+CategorySimilarity holds the category points rank_recommendations gives for
+pairs of different categories, computed once when categories are created:
+
+- 3 for the same category (not stored)
+- 1.5 when one category is an ancestor of the other, or one name contains the
+  other ("Electronics" / "Electronic Devices")
+
+Recommendation scoring looks the points up by category ID instead of
+comparing names for every candidate, and category filters match the indexed
+Product.category_id of a category and its subcategories. A CategoryTaxonomy
+of both tables is cached per process for CATEGORY_TAXONOMY_TTL seconds.
+Products without a category_id (not yet backfilled) are scored by name as
+before.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import delete, select, update
+
+from backend.upsert import insert_ignoring_conflicts
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_TAXONOMY_TTL = float(os.environ.get("CATEGORY_TAXONOMY_TTL", "300"))
+
+SAME_CATEGORY_SCORE = 3
+SIMILAR_CATEGORY_SCORE = 1.5
+# Length of Category.key and Category.name
+CATEGORY_NAME_LENGTH = 128
+
+
+def category_key(name):
+    """Canonical form of a category name: lowercase with collapsed whitespace"""
+    return " ".join((name or "").lower().split())[:CATEGORY_NAME_LENGTH]
+
+
+def category_name_similarity(a, b):
+    """Category points rank_recommendations gives a candidate in category b for a base product in category a, by name"""
+    if a == b:
+        return SAME_CATEGORY_SCORE
+    if a and b and (a.lower() in b.lower() or b.lower() in a.lower()):
+        return SIMILAR_CATEGORY_SCORE
+    return 0.0
+
+
+class CategoryTaxonomy:
+    """In-memory copy of the Category and CategorySimilarity tables"""
+
+    def __init__(self, categories, similarities):
+        """
+        Args:
+            categories: Rows of (id, key, name, parent_id)
+            similarities: Rows of (category_id, similar_id, score)
+        """
+        self.names = {}
+        self.ids_by_key = {}
+        self.children = defaultdict(list)
+        for category_id, key, name, parent_id in categories:
+            self.names[category_id] = name
+            self.ids_by_key[key] = category_id
+            if parent_id is not None:
+                self.children[parent_id].append(category_id)
+        self.similar = {category_id: {category_id: SAME_CATEGORY_SCORE} for category_id in self.names}
+        for category_id, similar_id, score in similarities:
+            if category_id in self.similar:
+                self.similar[category_id][similar_id] = score
+        self.created_at = time.time()
+
+    def __contains__(self, category_id):
+        return category_id in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_for(self, name):
+        """ID of the category with this name (in any spelling), or None"""
+        return self.ids_by_key.get(category_key(name))
+
+    def similar_to(self, category_id):
+        """Category ID -> points for candidates of a base product in category_id"""
+        return self.similar.get(category_id, {})
+
+    def score(self, a, b):
+        """Category points for categories a and b, or None if either is not in the taxonomy"""
+        if a not in self.names or b not in self.names:
+            return None
+        return self.similar[a].get(b, 0.0)
+
+    def descendants(self, category_id):
+        """The category and all its subcategories"""
+        found, stack = [], [category_id]
+        seen = {category_id}
+        while stack:
+            current = stack.pop()
+            found.append(current)
+            for child in self.children.get(current, ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return found
+
+
+def category_points(base_product, taxonomy=None):
+    """
+    Function giving the category points of a candidate for base_product
+
+    Candidates are scored by category ID when both categories are in the
+    taxonomy, and by name otherwise.
+    """
+    base_id = getattr(base_product, "category_id", None)
+    if taxonomy is None or base_id not in taxonomy:
+        return lambda product: category_name_similarity(base_product.category, product.category)
+
+    similar = taxonomy.similar_to(base_id)
+
+    def points(product):
+        category_id = getattr(product, "category_id", None)
+        if category_id in taxonomy:
+            return similar.get(category_id, 0.0)
+        return category_name_similarity(base_product.category, product.category)
+
+    return points
+
+
+def ensure_categories(session, paths):
+    """
+    Create the categories on the given paths that don't exist yet
+
+    Args:
+        session: Database session (not committed)
+        paths: Category name sequences, a product's category first and then
+            each broader one
+
+    Returns:
+        Dictionary of category_key -> category ID for every name on the paths
+    """
+    from models import Category
+
+    paths = [[name[:CATEGORY_NAME_LENGTH] for name in path if category_key(name)] for path in paths]
+    keys = {category_key(name) for path in paths for name in path}
+    if not keys:
+        return {}
+    ids = dict(session.execute(select(Category.key, Category.id).where(Category.key.in_(keys))).all())
+
+    new_rows, parent_keys = {}, {}
+    for path in paths:
+        for i, name in enumerate(path):
+            key = category_key(name)
+            if key not in ids and key not in new_rows:
+                new_rows[key] = {"key": key, "name": name}
+            if key not in ids and key not in parent_keys and i + 1 < len(path):
+                parent_keys[key] = category_key(path[i + 1])
+    if not new_rows:
+        return ids
+
+    created = dict(insert_ignoring_conflicts(session, Category, list(new_rows.values()), ["key"],
+                                             returning=(Category.key, Category.id)))
+    ids.update(created)
+    if len(created) < len(new_rows):
+        # Created concurrently by another importer, which also set their parents
+        ids.update(session.execute(
+            select(Category.key, Category.id).where(Category.key.in_(new_rows.keys() - created.keys()))).all())
+
+    # Existing categories never get a new parent, so only the ones created here can form a cycle
+    parents = {}
+    for key, parent_key in parent_keys.items():
+        if key not in created or parent_key == key:
+            continue
+        ancestor = parent_key
+        while ancestor in parents and ancestor != key:
+            ancestor = parents[ancestor]
+        if ancestor != key:
+            parents[key] = parent_key
+    for key, parent_key in parents.items():
+        session.execute(update(Category).where(Category.id == ids[key]).values(parent_id=ids[parent_key]))
+
+    add_category_similarity(session, created.values())
+    invalidate_category_taxonomy()
+    logger.info(f"Created {len(created)} categories")
+    return ids
+
+
+def add_category_similarity(session, category_ids):
+    """Store the similar pairs involving the given (newly created) categories"""
+    from models import Category, CategorySimilarity
+
+    category_ids = set(category_ids)
+    if not category_ids:
+        return 0
+    rows = session.execute(select(Category.id, Category.key, Category.parent_id)).all()
+    keys = {category_id: key for category_id, key, _ in rows}
+    parent = {category_id: parent_id for category_id, _, parent_id in rows}
+
+    def ancestors(category_id):
+        found = set()
+        current = parent.get(category_id)
+        while current is not None and current not in found:
+            found.add(current)
+            current = parent.get(current)
+        return found
+
+    ancestors_by_id = {category_id: ancestors(category_id) for category_id in keys}
+    pairs = set()
+    for a in category_ids:
+        for b in keys:
+            if a == b:
+                continue
+            if (b in ancestors_by_id[a] or a in ancestors_by_id[b]
+                    or keys[a] in keys[b] or keys[b] in keys[a]):
+                pairs.update(((a, b), (b, a)))
+    rows = [{"category_id": a, "similar_id": b, "score": SIMILAR_CATEGORY_SCORE} for a, b in sorted(pairs)]
+    insert_ignoring_conflicts(session, CategorySimilarity, rows, ["category_id", "similar_id"])
+    return len(rows)
+
+
+def rebuild_category_similarity(session):
+    """Recompute every stored category pair, returning how many rows were written"""
+    from models import Category, CategorySimilarity
+
+    session.execute(delete(CategorySimilarity))
+    count = add_category_similarity(session, session.scalars(select(Category.id)).all())
+    session.commit()
+    invalidate_category_taxonomy()
+    return count
+
+
+def assign_product_categories(session):
+    """Set category_id on products that have a category name but none, returning how many were set"""
+    from models import Product
+
+    names = session.scalars(
+        select(Product.category).where(Product.category_id.is_(None), Product.category.is_not(None)).distinct()
+    ).all()
+    ids = ensure_categories(session, [(name,) for name in names])
+    assigned = 0
+    for name in names:
+        category_id = ids.get(category_key(name))
+        if category_id is None:
+            continue
+        assigned += session.execute(
+            update(Product).where(Product.category_id.is_(None), Product.category == name)
+            .values(category_id=category_id)).rowcount
+    session.commit()
+    logger.info(f"Assigned categories to {assigned} products")
+    return assigned
+
+
+def load_category_taxonomy(session):
+    from models import Category, CategorySimilarity
+
+    categories = session.execute(select(Category.id, Category.key, Category.name, Category.parent_id)).all()
+    similarities = session.execute(
+        select(CategorySimilarity.category_id, CategorySimilarity.similar_id, CategorySimilarity.score)).all()
+    return CategoryTaxonomy(categories, similarities)
+
+
+_cached_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def current_category_taxonomy(session):
+    """Taxonomy for request handlers, reloaded every CATEGORY_TAXONOMY_TTL seconds"""
+    global _cached_taxonomy
+    with _taxonomy_lock:
+        if _cached_taxonomy is None or time.time() - _cached_taxonomy.created_at > CATEGORY_TAXONOMY_TTL:
+            _cached_taxonomy = load_category_taxonomy(session)
+        return _cached_taxonomy
+
+
+def invalidate_category_taxonomy():
+    """Drop the cached taxonomy so the next request reloads it"""
+    global _cached_taxonomy
+    with _taxonomy_lock:
+        _cached_taxonomy = None
+
+
+def category_filter(session, category):
+    """
+    SQL condition for products in the category or its subcategories
+
+    Matches the indexed category_id; a name not in the taxonomy (yet) is
+    matched against Product.category as before.
+    """
+    from models import Product
+
+    taxonomy = current_category_taxonomy(session)
+    category_id = taxonomy.id_for(category)
+    if category_id is None:
+        return Product.category == category
+    return Product.category_id.in_(taxonomy.descendants(category_id))
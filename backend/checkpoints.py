@@ -0,0 +1,27 @@
+"""
+Job Checkpoints
+
+Resumable batch jobs (review re-scoring, imports) keep their progress in a
+JobCheckpoint row, updated in the same transaction as each batch of work, so
+a restarted job continues exactly after the last committed batch.
+"""
+
+import json
+
+from sqlalchemy import select
+
+
+def get_checkpoint(session, job_name):
+    """The job's checkpoint row, created (uncommitted) if it does not exist"""
+    from models import JobCheckpoint
+
+    checkpoint = session.scalars(select(JobCheckpoint).filter_by(job_name=job_name)).first()
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(job_name=job_name, processed=0)
+        session.add(checkpoint)
+    return checkpoint
+
+
+def checkpoint_state(checkpoint):
+    """The checkpoint's saved state dict (empty when none)"""
+    return json.loads(checkpoint.state) if checkpoint.state else {}
@@ -0,0 +1,84 @@
+"""
+Response Compression
+
+JSON responses of at least COMPRESS_MIN_SIZE bytes are compressed with the
+best encoding the client accepts (Accept-Encoding): brotli when the brotli
+package is installed (pip install brotli), otherwise gzip. API responses are
+compressed on every request, so the default levels favour speed; precompressed
+static assets (backend/static_assets.py) use the maximum levels instead.
+
+Streamed responses (the Arrow exports) and responses that already have a
+Content-Encoding are left alone.
+"""
+
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Smaller responses fit in a packet or two and are not worth compressing
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", "5"))
+
+COMPRESSIBLE_MIMETYPES = {"application/json"}
+
+
+def available_encodings():
+    """Supported content codings, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding, level=None):
+    """Compress bytes with a content coding from available_encodings()"""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY if level is None else level)
+    if encoding == "gzip":
+        # A fixed mtime keeps the output (and any ETag derived from it) deterministic
+        return gzip.compress(data, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def negotiate_encoding(accept_encodings, offered):
+    """The offered encoding with the highest quality in Accept-Encoding (ties go to the earlier), or None"""
+    best, best_quality = None, 0
+    for encoding in offered:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compress_response(response):
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    # The body depends on Accept-Encoding from here on, whether or not it is compressed
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(request.accept_encodings, available_encodings())
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    """Register the response compression middleware"""
+    app.after_request(_compress_response)
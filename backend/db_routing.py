@@ -0,0 +1,94 @@
+"""
+Read Replica Routing
+
+Routes read-only queries made by views decorated with @read_replica to the
+optional "replica" bind (configured with DATABASE_REPLICA_URL). Flushes and
+INSERT/UPDATE/DELETE statements always go to the primary database, as does
+everything outside a decorated view (auth endpoints, importer, maintenance
+scripts). Queries touching PRIMARY_TABLES (users and their saved products)
+stay on the primary inside decorated views too, so current_user is never
+resolved against a replica that has not caught up with a registration.
+Without a replica configured, all queries use the primary.
+
+Streamed responses run after the view returns, so their generators route
+their own reads with replica_reads().
+"""
+
+import contextlib
+import functools
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.util import find_tables
+
+REPLICA_BIND_KEY = "replica"
+# Tables read right after they are written (login, registration, saving a product)
+PRIMARY_TABLES = frozenset({"user", "user_saved_product"})
+
+
+def _touches_primary_tables(mapper, clause):
+    if mapper is not None and getattr(mapper, "local_table", None) is not None \
+            and mapper.local_table.name in PRIMARY_TABLES:
+        return True
+    if clause is not None:
+        return any(table.name in PRIMARY_TABLES
+                   for table in find_tables(clause, include_joins=True, include_aliases=True))
+    return False
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends reads to the replica when requested"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and has_app_context()
+            and g.get("use_read_replica", False)
+            and not _touches_primary_tables(mapper, clause)
+        ):
+            engine = self._db.engines.get(REPLICA_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Route read queries made inside the block to the read replica"""
+    previous = g.get("use_read_replica", False)
+    g.use_read_replica = True
+    try:
+        yield
+    finally:
+        g.use_read_replica = previous
+
+
+def read_replica(view):
+    """Decorator routing the view's read queries to the read replica"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def replica_stream(generator):
+    """
+    Iterate a response generator with its reads routed to the replica
+
+    For use inside stream_with_context: the body is produced after a
+    @read_replica view has returned and reset the flag.
+    """
+    with replica_reads():
+        yield from generator
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entry for the replica, using the same engine options as the primary"""
+    replica_uri = config.get("SQLALCHEMY_REPLICA_URI")
+    if not replica_uri:
+        return {}
+    return {REPLICA_BIND_KEY: {"url": replica_uri, **config.get("SQLALCHEMY_ENGINE_OPTIONS", {})}}
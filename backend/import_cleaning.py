@@ -0,0 +1,453 @@
+"""
+Import Record Cleaning
+
+Turns raw dataset records (Datafiniti CSV rows, Amazon JSON objects) into
+cleaned product and review fields for import_amazon_reviews.py, in two
+equivalent ways:
+
+- prepare_review: one record at a time (clean_text, clean_number and
+  parse_date per field)
+- prepare_reviews: a chunk of records at once, as DataFrame columns. Text is
+  normalized, prices and ratings parsed and dates parsed column-wise; the date
+  format is detected once per chunk. Records with unexpected value types fall
+  back to prepare_review, so both produce the same output.
+
+Products also get their category path (the category followed by the record's
+other categories), from which the importer builds the category table.
+"""
+
+import html
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from backend.categories import category_key
+from backend.text_normalization import (
+    _CHAR_TABLE, DEDUPE_SEPARATOR,
+    clean_text, dedupe_hash, normalize_text, review_dedupe_key
+)
+
+logger = logging.getLogger(__name__)
+
+# Accepted spellings of each field, in order of preference
+ASIN_FIELDS = ('asins', '\ufeffasins', 'asin', 'product_id')
+TITLE_FIELDS = ('name', 'product_title', 'product_name', 'title')
+DESCRIPTION_FIELDS = ('product_description', 'description')
+TEXT_FIELDS = ('reviews.text', 'review_text', 'reviewText', 'text')
+AUTHOR_FIELDS = ('reviews.username', 'reviewer_name', 'reviewerName', 'author')
+RATING_FIELDS = ('reviews.rating', 'rating', 'star_rating', 'overall')
+DATE_FIELDS = ('reviews.date', 'review_date', 'reviewTime', 'date')
+
+DATE_FORMATS = [
+    '%Y-%m-%d',  # 2023-04-15
+    '%m/%d/%Y',  # 04/15/2023
+    '%B %d, %Y', # April 15, 2023
+    '%d %B %Y',  # 15 April 2023
+]
+
+# Separates the values of a column joined into one string for column-wise regex passes.
+# A private-use character: not whitespace, not matched by the cleaning patterns below
+_SEP = "\ue000"
+_JOINED_TAG_OR_WHITESPACE_RE = re.compile(r'(?:<[^>\ue000]+>|\s)+')
+_JOINED_URL_OR_TAG_RE = re.compile(r'https?://[^\s\ue000]+|www\.[^\s\ue000]+|<[^\ue000]*?>')
+# Characters _CHAR_TABLE changes that the whitespace pass would not collapse anyway
+_NON_WHITESPACE_CONTROL_RE = re.compile('[\x00-\x08\x0e-\x1b\ufeff]')
+
+# Distinct (category, categories) pairs whose category paths are kept; records of one product repeat them
+CATEGORY_PATH_CACHE_SIZE = 4096
+
+_CURRENCY_RE = re.compile(r'[$,£€]')
+_NUMBER_RE = re.compile(r'([-+]?\d*\.?\d+)')
+
+
+def parse_date(date_str):
+    """Parse date string into datetime object"""
+    try:
+        # Try different date formats
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+                
+        # If none of the formats match, try a more flexible approach
+        return pd.to_datetime(date_str).to_pydatetime()
+    except Exception as e:
+        logger.warning(f"Could not parse date: {date_str}, error: {str(e)}")
+        return None
+
+
+def clean_number(value):
+    """Clean and convert numeric values"""
+    if not value:
+        return None
+        
+    if isinstance(value, (int, float)):
+        return float(value)
+        
+    if isinstance(value, str):
+        # Remove currency symbols and commas
+        value = _CURRENCY_RE.sub('', value)
+        
+        # Extract the first number found
+        match = _NUMBER_RE.search(value)
+        if match:
+            try:
+                return float(match.group(1))
+            except ValueError:
+                return None
+    
+    return None
+
+
+@lru_cache(maxsize=CATEGORY_PATH_CACHE_SIZE)
+def category_path(category, categories):
+    """
+    Category path of a record for ensure_categories: its cleaned category, then
+    the other comma-separated categories, cleaned and without repeats
+    """
+    if not category:
+        return ()
+    path, seen = [category], {category_key(category)}
+    for name in (categories or '').split(','):
+        name = clean_text(name)
+        key = category_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            path.append(name)
+    return tuple(path)
+
+
+def prepare_review(review_data, stats):
+    """Cleaned product and review fields of one input record, or None to skip it"""
+    # Extract product data and handle BOM character
+    asin = review_data.get('asins') or review_data.get('\ufeffasins') or review_data.get('asin') or review_data.get('product_id')
+    product_title = review_data.get('name') or review_data.get('product_title') or review_data.get('product_name') or review_data.get('title')
+    
+    # Clean up ASIN if it's a list
+    if isinstance(asin, str) and ',' in asin:
+        asin = asin.split(',')[0].strip()
+    
+    # Clean up data
+    if asin:
+        asin = asin.strip().upper()  # ASINs are typically uppercase
+    
+    # Clean product title and description
+    product_title = clean_text(product_title)
+    product_description = clean_text(review_data.get('product_description') or review_data.get('description') or '')
+    
+    if not asin or not product_title:
+        logger.warning(f"Missing required product data. ASIN: {asin}, Title: {product_title}")
+        stats['errors'] += 1
+        return None
+    
+    # Extract and clean review data from various formats
+    review_text, analysis_text = normalize_text(review_data.get('reviews.text') or review_data.get('review_text') or review_data.get('reviewText') or review_data.get('text') or '')
+    reviewer_name = clean_text(review_data.get('reviews.username') or review_data.get('reviewer_name') or review_data.get('reviewerName') or review_data.get('author') or 'Anonymous')
+    
+    # Clean rating value (1-5 stars)
+    raw_rating = review_data.get('reviews.rating') or review_data.get('rating') or review_data.get('star_rating') or review_data.get('overall') or 0
+    rating = clean_number(raw_rating)
+    if rating is not None:
+        # Ensure rating is between 1-5
+        rating = max(1, min(5, rating))
+    else:
+        rating = 3.0  # Default to neutral rating
+    
+    # Clean and parse review date
+    review_date_str = review_data.get('reviews.date') or review_data.get('review_date') or review_data.get('reviewTime') or review_data.get('date')
+    review_date = parse_date(review_date_str) if review_date_str else None
+    
+    product = {
+        "asin": asin,
+        "name": product_title,
+        "description": product_description,
+        "price": clean_number(review_data.get('price')),
+        "category": clean_text(review_data.get('category') or (review_data.get('categories') or '').split(',')[0]),
+    }
+    categories = review_data.get('categories')
+    product["category_path"] = category_path(product["category"], categories if isinstance(categories, str) else None)
+    
+    if not review_text or len(review_text) < 5:  # Skip very short reviews
+        logger.warning(f"Missing or too short review text for product {asin}")
+        stats['errors'] += 1
+        # The product is still created, as before
+        return {"product": product, "review": None}
+    
+    # Log that we cleaned some data
+    stats['cleaned_data'] += 1
+    
+    return {
+        "product": product,
+        "review": {
+            "author": reviewer_name,
+            "text": review_text,
+            "analysis_text": analysis_text,
+            "rating": rating,
+            "date": review_date,
+            "dedupe_key": review_dedupe_key(reviewer_name, review_text),
+        },
+    }
+
+
+# Column-wise cleaning
+
+_TEXT_COLUMNS = ASIN_FIELDS + TITLE_FIELDS + DESCRIPTION_FIELDS + TEXT_FIELDS + AUTHOR_FIELDS + DATE_FIELDS + (
+    'category', 'categories')
+_NUMBER_COLUMNS = RATING_FIELDS + ('price',)
+
+
+# Inferred column types (pd.api.types.infer_dtype) needing no per-value type check
+_UNIFORM_TYPES = {'empty', 'string'}
+_UNIFORM_NUMBER_TYPES = _UNIFORM_TYPES | {'integer', 'floating', 'mixed-integer-float'}
+
+
+def _unsupported_rows(frame):
+    """Rows with values of types the column-wise path does not handle exactly like prepare_review"""
+    unsupported = np.zeros(len(frame), dtype=bool)
+    for columns, allowed, uniform in ((_TEXT_COLUMNS, (str,), _UNIFORM_TYPES),
+                                      (_NUMBER_COLUMNS, (str, int, float), _UNIFORM_NUMBER_TYPES)):
+        for name in columns:
+            if name not in frame:
+                continue
+            values = frame[name].to_numpy()
+            if pd.api.types.infer_dtype(values, skipna=True) in uniform:
+                continue
+            # bool is an int subclass, but prepare_review treats it differently
+            unsupported |= np.fromiter(
+                (not (pd.isna(v) or (type(v) in allowed)) for v in values), dtype=bool, count=len(values))
+    return unsupported
+
+
+def _truthy(column):
+    values = column.to_numpy()
+    return pd.Series(pd.notna(values) & values.astype(bool), index=column.index)
+
+
+def _first_truthy(frame, fields, default=None):
+    """Column-wise `record.get(fields[0]) or record.get(fields[1]) or ... or default`"""
+    result = np.full(len(frame), default, dtype=object)
+    for name in reversed(fields):
+        if name in frame:
+            values = frame[name].to_numpy()
+            result = np.where(pd.notna(values) & values.astype(bool), values, result)
+    return pd.Series(result, index=frame.index, dtype=object)
+
+
+def _join(values):
+    """The strings of a column joined by _SEP, or None if a value contains _SEP itself"""
+    joined = _SEP.join(values)
+    if joined.count(_SEP) != len(values) - 1:
+        return None
+    return joined
+
+
+def _split(joined, index):
+    return pd.Series([part.strip() for part in joined.split(_SEP)], index=index, dtype=object)
+
+
+def clean_text_column(values):
+    """
+    clean_text over a Series of strings (missing values become "")
+
+    Each cleaning step runs once over the whole column, joined into one string
+    with a separator that the steps never match across.
+    """
+    strings = values.fillna("").tolist()
+    joined = _join(strings)
+    if joined is None:
+        return pd.Series([clean_text(s) for s in strings], index=values.index, dtype=object)
+
+    if '&' in joined:
+        joined = html.unescape(joined)
+    if _NON_WHITESPACE_CONTROL_RE.search(joined):
+        joined = joined.translate(_CHAR_TABLE)
+    joined = _JOINED_TAG_OR_WHITESPACE_RE.sub(' ', joined)
+    if '\\"' in joined:
+        joined = joined.replace('\\"', '"')
+    return _split(joined, values.index)
+
+
+def analysis_text_column(stored):
+    """Analysis form (as normalize_text returns it) of a Series of stored-form strings"""
+    strings = stored.tolist()
+    joined = _join(strings)
+    if joined is None:
+        return pd.Series([normalize_text(s)[1] for s in strings], index=stored.index, dtype=object)
+    return _split(_JOINED_URL_OR_TAG_RE.sub('', joined.lower()), stored.index)
+
+
+def _reclean(values):
+    """clean_text applied again; only values with entities or backslashes can change"""
+    strings = values.tolist()
+    joined = "".join(strings)
+    if '&' not in joined and '\\' not in joined:
+        return values
+    changeable = pd.Series([('&' in v or '\\' in v) for v in strings], index=values.index)
+    return values.where(~changeable, clean_text_column(values[changeable]))
+
+
+def clean_number_column(values):
+    """
+    clean_number over a Series of strings and numbers (NaN where it returns None)
+
+    Prices and ratings repeat a lot, so each distinct value is cleaned once.
+    """
+    codes, uniques = pd.factorize(values)
+    cleaned = np.array([clean_number(value) for value in uniques] + [None], dtype=np.float64)
+    # Missing values have code -1, which picks the trailing None
+    return pd.Series(cleaned[codes], index=values.index)
+
+
+def _detected_formats(sample):
+    """DATE_FORMATS with the one matching a sample value first"""
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(sample, fmt)
+        except ValueError:
+            continue
+        return [fmt] + [f for f in DATE_FORMATS if f != fmt]
+    return list(DATE_FORMATS)
+
+
+def parse_date_column(values):
+    """
+    parse_date over a Series of date strings (None where it returns None)
+
+    The format is detected from the chunk's first value and applied to the
+    whole column; values in other formats get the remaining formats, then
+    ISO 8601, and only distinct values matching none of them are parsed one by one.
+    The formats are mutually exclusive, so the order does not change results.
+    """
+    result = [None] * len(values)
+    remaining = values.reset_index(drop=True).dropna()
+
+    def take(parsed):
+        matched = parsed.notna()
+        for position, value in zip(remaining.index[matched], parsed[matched].dt.to_pydatetime()):
+            result[position] = value
+        return remaining[~matched]
+
+    if not remaining.empty:
+        for fmt in _detected_formats(remaining.iloc[0]):
+            remaining = take(pd.to_datetime(remaining, format=fmt, errors='coerce'))
+            if remaining.empty:
+                break
+
+    if not remaining.empty:
+        try:
+            remaining = take(pd.to_datetime(remaining, format='ISO8601', errors='coerce'))
+        except (ValueError, TypeError):
+            # Mixed time zones; leave them to parse_date
+            pass
+
+    parsed = {}
+    for position, value in remaining.items():
+        if value not in parsed:
+            parsed[value] = parse_date(value)
+        result[position] = parsed[value]
+    return pd.Series(result, index=values.index, dtype=object)
+
+
+def prepare_reviews(records, stats):
+    """
+    prepare_review for a chunk of records, computed column-wise
+
+    Args:
+        records: List of raw review dicts
+        stats: Import stats, updated like prepare_review updates them
+
+    Returns:
+        List with prepare_review's result for each record, in order
+    """
+    if not records:
+        return []
+    frame = pd.DataFrame(records, dtype=object)
+    prepared = [None] * len(records)
+
+    # Records the column-wise path cannot reproduce exactly go through prepare_review
+    unsupported = _unsupported_rows(frame)
+    for i in np.flatnonzero(unsupported):
+        try:
+            prepared[i] = prepare_review(records[i], stats)
+        except Exception as e:
+            logger.error(f"Error processing review: {str(e)}")
+            stats['errors'] += 1
+    frame = frame[~unsupported]
+    if frame.empty:
+        return prepared
+
+    asin = _first_truthy(frame, ASIN_FIELDS).astype(object)
+    asin = asin.str.split(',', n=1).str[0].str.strip().str.upper()
+    title = clean_text_column(_first_truthy(frame, TITLE_FIELDS))
+    description = clean_text_column(_first_truthy(frame, DESCRIPTION_FIELDS, ''))
+    has_product = _truthy(asin) & (title.str.len() > 0)
+
+    missing_product = int((~has_product).sum())
+    if missing_product:
+        logger.warning(f"Missing required product data in {missing_product} records")
+        stats['errors'] += missing_product
+
+    price = clean_number_column(frame['price']) if 'price' in frame else pd.Series(np.nan, index=frame.index)
+    category = _first_truthy(frame, ('category',))
+    if 'categories' in frame:
+        first_category = frame['categories'].astype(object).fillna('').str.split(',').str[0]
+        category = category.where(_truthy(category), first_category)
+    category = clean_text_column(category)
+    categories = frame['categories'] if 'categories' in frame else pd.Series(None, index=frame.index, dtype=object)
+    category_paths = [category_path(category_i, None if pd.isna(categories_i) else categories_i)
+                      for category_i, categories_i in zip(category.tolist(), categories.tolist())]
+
+    review_text = clean_text_column(_first_truthy(frame, TEXT_FIELDS, ''))
+    analysis_text = analysis_text_column(review_text)
+    author = clean_text_column(_first_truthy(frame, AUTHOR_FIELDS, 'Anonymous'))
+    rating = clean_number_column(_first_truthy(frame, RATING_FIELDS, 0)).clip(1, 5).fillna(3.0)
+    review_date = parse_date_column(_first_truthy(frame, DATE_FIELDS))
+
+    has_review = has_product & (review_text.str.len() >= 5)
+    short_text = int((has_product & ~has_review).sum())
+    if short_text:
+        logger.warning(f"Missing or too short review text in {short_text} records")
+        stats['errors'] += short_text
+    stats['cleaned_data'] += int(has_review.sum())
+
+    # Dedupe keys hash the re-cleaned author and text, exactly like review_dedupe_key
+    identities = _reclean(author[has_review]) + DEDUPE_SEPARATOR + _reclean(review_text[has_review])
+    dedupe_keys = dict(zip(identities.index, map(dedupe_hash, identities.tolist())))
+
+    columns = zip(
+        np.flatnonzero(~unsupported), frame.index, has_product, has_review, asin, title, description, price,
+        category, category_paths, author, review_text, analysis_text, rating, review_date,
+    )
+    for i, label, product_ok, review_ok, *values in columns:
+        if not product_ok:
+            continue
+        (asin_i, title_i, description_i, price_i, category_i, path_i,
+         author_i, text_i, analysis_i, rating_i, date_i) = values
+        product = {
+            "asin": asin_i,
+            "name": title_i,
+            "description": description_i,
+            "price": None if np.isnan(price_i) else float(price_i),
+            "category": category_i,
+            "category_path": path_i,
+        }
+        if not review_ok:
+            prepared[i] = {"product": product, "review": None}
+            continue
+        prepared[i] = {
+            "product": product,
+            "review": {
+                "author": author_i,
+                "text": text_i,
+                "analysis_text": analysis_i,
+                "rating": float(rating_i),
+                "date": date_i,
+                "dedupe_key": dedupe_keys[label],
+            },
+        }
+    return prepared
@@ -0,0 +1,371 @@
+"""
+Background Job Queue
+
+A small job system backed by the application's own database (the Job table),
+so imports and maintenance run in the background without an external broker:
+
+- submit_job adds a queued job; admin endpoints and scripts call it.
+- job_worker.py starts local worker processes. Each worker claims the oldest
+  runnable job with a conditional UPDATE (so two workers never run the same
+  job), runs its handler and records the result.
+- Handlers report progress through a JobContext, which also raises
+  JobCancelled when cancellation was requested and JobInterrupted when the
+  worker is shutting down.
+- A heartbeat thread keeps running jobs' heartbeat_at current. Jobs whose
+  worker died are re-queued by the other workers.
+- Failed jobs are retried with exponential backoff until max_attempts, and can
+  be re-queued by hand with retry_job.
+
+Concurrency is bounded by the number of worker processes, and per kind by
+KIND_CONCURRENCY (cleanup and re-scoring never run twice at once). On
+PostgreSQL, claims of a limited kind hold a transaction-level advisory lock on
+the kind, so two workers can't both see a free slot and take it; SQLite
+serializes the claims with its write lock.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Jobs of these kinds run at most this many at a time across all workers
+KIND_CONCURRENCY = {"cleanup": 1, "rescore": 1}
+
+DEFAULT_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# Seconds before the first retry; doubled for each further attempt
+RETRY_BACKOFF = float(os.environ.get("JOB_RETRY_BACKOFF", "30"))
+# Seconds between heartbeats, and without one before a running job counts as abandoned
+HEARTBEAT_INTERVAL = float(os.environ.get("JOB_HEARTBEAT_INTERVAL", "10"))
+HEARTBEAT_TIMEOUT = float(os.environ.get("JOB_HEARTBEAT_TIMEOUT", "120"))
+# Seconds an idle worker waits before polling for jobs again
+POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "2"))
+# Minimum seconds between progress writes
+PROGRESS_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job's cancellation was requested"""
+
+
+class JobInterrupted(Exception):
+    """Raised inside a handler when its worker is shutting down; the job is re-queued"""
+
+
+# Handlers: kind -> callable(context, **params) returning a JSON-serializable result.
+# They import the scripts lazily, since those import the Flask app.
+
+def _run_import(context, file_path, file_format=None, limit=None):
+    from import_amazon_reviews import import_file
+
+    context.report(0, None, "Importing reviews")
+    return import_file(file_path, file_format, limit, progress=context.report)
+
+
+def _run_cleanup(context):
+    from clean_database import CLEANUP_STEPS
+
+    for i, step in enumerate(CLEANUP_STEPS):
+        context.report(i, len(CLEANUP_STEPS), step.__name__, force=True)
+        step()
+    context.report(len(CLEANUP_STEPS), len(CLEANUP_STEPS), "Done", force=True)
+    return {"steps": [step.__name__ for step in CLEANUP_STEPS]}
+
+
+def _run_rescore(context, chunk_size=None, workers=None, pause=None):
+    from app import db
+    from backend import rescoring
+
+    return rescoring.rescore_stale_reviews(
+        db.session,
+        chunk_size=chunk_size or rescoring.CHUNK_SIZE,
+        workers=rescoring.WORKERS if workers is None else workers,
+        pause=rescoring.PAUSE if pause is None else pause,
+        progress=context.report,
+    )
+
+
+JOB_HANDLERS = {
+    "import": _run_import,
+    "cleanup": _run_cleanup,
+    "rescore": _run_rescore,
+}
+
+
+def job_dict(job):
+    """API representation of a job"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "params": json.loads(job.params) if job.params else {},
+        "status": job.status,
+        "progress": {"done": job.progress_done, "total": job.progress_total, "message": job.message},
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "cancel_requested": job.cancel_requested,
+        "worker": job.worker,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def submit_job(session, kind, params=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue a job and commit, returning the Job"""
+    from models import Job
+
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, params=json.dumps(params or {}), status="queued",
+              max_attempts=max_attempts, run_after=datetime.utcnow())
+    session.add(job)
+    session.commit()
+    logger.info(f"Queued job {job.id} ({kind})")
+    return job
+
+
+def cancel_job(session, job):
+    """Cancel a queued job now, or ask a running job's worker to stop it; returns the Job"""
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+    session.commit()
+    return job
+
+
+def retry_job(session, job):
+    """Re-queue a failed or cancelled job with a fresh set of attempts"""
+    if job.status not in ("failed", "cancelled"):
+        raise ValueError(f"Only failed or cancelled jobs can be retried (job is {job.status})")
+    job.status = "queued"
+    job.attempts = 0
+    job.cancel_requested = False
+    job.error = None
+    job.finished_at = None
+    job.run_after = datetime.utcnow()
+    session.commit()
+    return job
+
+
+def requeue_abandoned_jobs(session, timeout=HEARTBEAT_TIMEOUT):
+    """Re-queue running jobs whose worker stopped sending heartbeats, returning how many"""
+    from models import Job
+
+    now = datetime.utcnow()
+    abandoned = (Job.status == "running", Job.heartbeat_at < now - timedelta(seconds=timeout))
+    # A job that keeps taking its worker down fails once it is out of attempts
+    session.execute(
+        update(Job)
+        .where(*abandoned, Job.attempts >= Job.max_attempts)
+        .values(status="failed", finished_at=now, error="Worker stopped responding")
+    )
+    result = session.execute(
+        update(Job)
+        .where(*abandoned)
+        .values(status="queued", worker=None, run_after=now, error="Worker stopped responding")
+    )
+    session.commit()
+    if result.rowcount:
+        logger.warning(f"Re-queued {result.rowcount} abandoned jobs")
+    return result.rowcount
+
+
+def _kind_lock_key(kind):
+    """pg_advisory_xact_lock key serializing the claims of one job kind"""
+    digest = hashlib.sha1(f"job_kind:{kind}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def claim_next_job(session, worker_id):
+    """Mark the oldest runnable job as running for this worker, returning its ID or None"""
+    from models import Job
+
+    now = datetime.utcnow()
+    candidates = session.execute(
+        select(Job.id, Job.kind)
+        .where(Job.status == "queued", Job.run_after <= now)
+        .order_by(Job.run_after, Job.id)
+        .limit(20)
+    ).all()
+    session.rollback()
+
+    for job_id, kind in candidates:
+        claim = update(Job).where(Job.id == job_id, Job.status == "queued")
+        if kind in KIND_CONCURRENCY:
+            if session.get_bind(Job).dialect.name == "postgresql":
+                # Under READ COMMITTED, concurrent claims would each count the running jobs
+                # before the other committed; the lock, held until the commit below, orders them
+                session.execute(select(func.pg_advisory_xact_lock(_kind_lock_key(kind))))
+            other = aliased(Job)
+            running = (
+                select(func.count(other.id))
+                .where(other.kind == kind, other.status == "running")
+                .scalar_subquery()
+            )
+            claim = claim.where(running < KIND_CONCURRENCY[kind])
+        result = session.execute(claim.values(
+            status="running", worker=worker_id, attempts=Job.attempts + 1,
+            started_at=now, heartbeat_at=now, finished_at=None,
+            cancel_requested=False, progress_done=0, progress_total=None, message=None,
+        ).execution_options(synchronize_session=False))
+        session.commit()
+        if result.rowcount == 1:
+            return job_id
+    return None
+
+
+class JobContext:
+    """Handle passed to a job handler for progress reporting and cancellation checks"""
+
+    def __init__(self, engine, job_id, stop_event):
+        self.engine = engine
+        self.job_id = job_id
+        self.stop_event = stop_event
+        self.cancelled = threading.Event()
+        self._last_report = 0.0
+
+    def beat(self):
+        """Record a heartbeat and pick up a cancellation request (called by the heartbeat thread)"""
+        from models import Job
+
+        with self.engine.begin() as conn:
+            conn.execute(update(Job).where(Job.id == self.job_id).values(heartbeat_at=datetime.utcnow()))
+            if conn.scalar(select(Job.cancel_requested).where(Job.id == self.job_id)):
+                self.cancelled.set()
+
+    def check(self):
+        """Raise if the job was cancelled or the worker is stopping"""
+        if self.cancelled.is_set():
+            raise JobCancelled()
+        if self.stop_event.is_set():
+            raise JobInterrupted()
+
+    def report(self, done, total=None, message=None, force=False):
+        """Record progress (at most once per PROGRESS_INTERVAL unless forced), then check()"""
+        from models import Job
+
+        now = time.monotonic()
+        if force or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            values = {"progress_done": done, "progress_total": total}
+            if message is not None:
+                values["message"] = message[:256]
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(update(Job).where(Job.id == self.job_id).values(**values))
+                    if conn.scalar(select(Job.cancel_requested).where(Job.id == self.job_id)):
+                        self.cancelled.set()
+            except Exception as e:
+                # Progress is informational; a busy database must not fail the job
+                logger.debug(f"Could not record progress of job {self.job_id}: {str(e)}")
+        self.check()
+
+
+def _heartbeat(context, done):
+    while not done.wait(HEARTBEAT_INTERVAL):
+        try:
+            context.beat()
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {context.job_id} failed: {str(e)}")
+
+
+def _finish(session, job_id, **values):
+    from models import Job
+
+    session.rollback()
+    session.execute(update(Job).where(Job.id == job_id).values(**values)
+                    .execution_options(synchronize_session=False))
+    session.commit()
+
+
+def run_job(session, engine, job_id, stop_event):
+    """Run a claimed job's handler and record the outcome"""
+    from models import Job
+
+    job = session.get(Job, job_id)
+    kind, params, attempts, max_attempts = job.kind, json.loads(job.params or "{}"), job.attempts, job.max_attempts
+    session.rollback()
+
+    context = JobContext(engine, job_id, stop_event)
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(context, done), daemon=True)
+    heartbeat.start()
+    logger.info(f"Running job {job_id} ({kind}), attempt {attempts} of {max_attempts}")
+    try:
+        result = JOB_HANDLERS[kind](context, **params)
+    except JobCancelled:
+        logger.info(f"Job {job_id} cancelled")
+        _finish(session, job_id, status="cancelled", finished_at=datetime.utcnow())
+    except JobInterrupted:
+        logger.info(f"Job {job_id} interrupted by worker shutdown, re-queuing")
+        _finish(session, job_id, status="queued", worker=None, attempts=Job.attempts - 1,
+                run_after=datetime.utcnow())
+    except Exception as e:
+        logger.error(f"Job {job_id} ({kind}) failed: {str(e)}")
+        if attempts < max_attempts:
+            delay = RETRY_BACKOFF * 2 ** (attempts - 1)
+            _finish(session, job_id, status="queued", worker=None, error=str(e),
+                    run_after=datetime.utcnow() + timedelta(seconds=delay))
+        else:
+            _finish(session, job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+    else:
+        _finish(session, job_id, status="succeeded", result=json.dumps(result, default=str),
+                progress_done=func.coalesce(Job.progress_total, Job.progress_done),
+                error=None, finished_at=datetime.utcnow())
+        logger.info(f"Job {job_id} ({kind}) succeeded")
+    finally:
+        done.set()
+        heartbeat.join()
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(stop_event=None, poll_interval=POLL_INTERVAL, max_jobs=None):
+    """
+    Process jobs until stop_event is set (or max_jobs jobs have run)
+
+    Runs in its own process: stops on SIGTERM/SIGINT after re-queuing the current job.
+    """
+    from app import app, db
+
+    stop_event = stop_event or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop_event.set())
+
+    name = worker_id()
+    jobs_run = 0
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared
+        db.engine.dispose(close=False)
+        logger.info(f"Job worker {name} started")
+        while not stop_event.is_set():
+            requeue_abandoned_jobs(db.session)
+            job_id = claim_next_job(db.session, name)
+            if job_id is None:
+                stop_event.wait(poll_interval)
+                continue
+            run_job(db.session, db.engine, job_id, stop_event)
+            jobs_run += 1
+            if max_jobs is not None and jobs_run >= max_jobs:
+                break
+        logger.info(f"Job worker {name} stopped")
+    return jobs_run
@@ -0,0 +1,72 @@
+"""
+Fast JSON Serialization
+
+API responses and the JSON database columns (review.sentiment_keywords) are
+serialized with orjson when it is installed (pip install orjson), and with the
+standard library json module otherwise.
+
+Responses keep the output of Flask's default provider: keys are sorted, dates
+are HTTP dates, and Decimal, UUID and dataclass values are converted the same
+way. Non-ASCII characters are written as UTF-8 instead of \\u escapes.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Sorted keys like Flask's provider; dates go to the default hook for http_date
+    RESPONSE_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                        | orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def dumps(value):
+    """JSON text of a value stored in a JSON column"""
+    if orjson is None:
+        return json.dumps(value)
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def loads(text):
+    """Value of a JSON column's text"""
+    if orjson is None:
+        return json.loads(text)
+    return orjson.loads(text)
+
+
+def engine_options():
+    """SQLAlchemy engine options (de)serializing JSON columns with the functions above"""
+    return {"json_serializer": dumps, "json_deserializer": loads}
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson, falling back to the default provider without it"""
+
+    def _options(self, indent=None):
+        options = RESPONSE_OPTIONS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(kwargs.get("indent"))).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent=pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,353 @@
+"""
+Hot-path Instrumentation
+
+Collects per-request latency histograms, SQL query counts and time, and the
+time spent in the sentiment and recommendation functions, and renders them
+in Prometheus text exposition format for /api/metrics.
+
+Each process keeps its metrics in memory and periodically writes a snapshot
+to METRICS_DIR (one file per pid). The metrics endpoint merges all snapshots,
+so the numbers are aggregated across gunicorn workers regardless of which
+worker serves the scrape. Clear METRICS_DIR on deploy to reset counters.
+
+Snapshots of processes that have exited (by pid, so METRICS_DIR must not be
+shared between hosts or containers) are folded into metrics_retired.json and
+removed when metrics are collected, so restarted workers don't leave files
+behind and counters keep their totals.
+
+Histograms are recorded in per-thread stores without taking a lock, and
+timed() computes its label key once, as it wraps functions called for every
+review.
+"""
+
+import fcntl
+import functools
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(tempfile.gettempdir(), "sentiment_metrics"))
+FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0"))
+# Totals of exited processes, in METRICS_DIR
+RETIRED_SNAPSHOT = "metrics_retired.json"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint", LATENCY_BUCKETS),
+    "http_request_sql_queries": ("histogram", "SQL queries executed per request", QUERY_COUNT_BUCKETS),
+    "sql_queries_total": ("counter", "SQL queries executed by endpoint", None),
+    "sql_duration_seconds_total": ("counter", "Time spent executing SQL by endpoint", None),
+    "function_duration_seconds": ("histogram", "Time spent in instrumented hot-path functions", LATENCY_BUCKETS),
+    "user_cache_requests_total": ("counter", "User loader cache lookups by result", None),
+    "password_hash_rejected_total": ("counter", "Password hashes rejected by the login storm guard", None),
+    "admission_rejected_total": ("counter", "Requests rejected by admission control by endpoint and reason", None),
+    "product_cache_requests_total": ("counter", "Product response cache lookups by kind and result", None),
+    "single_flight_requests_total": ("counter", "Single-flight calls by group, as the leader computing or coalesced onto it", None),
+    "recommendation_candidates_total": ("counter", "Recommendation candidates loaded by candidate generation, fully scored or pruned", None),
+}
+
+
+class MetricsRegistry:
+    """Thread-safe in-process store of counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        # Histograms of exited threads; live threads record into their own store
+        self._histograms = {}
+        self._thread_stores = []  # (thread, its histograms)
+        self._local = threading.local()
+        self._last_flush = 0.0
+
+    def inc(self, name, labels, value=1.0):
+        """Increment a counter"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name, labels, value):
+        """Record a value in a histogram"""
+        self.observe_key(name, _label_key(labels), value)
+
+    def observe_key(self, name, key, value):
+        """Record a value in a histogram, with labels already made into a key by _label_key"""
+        store = getattr(self._local, "histograms", None)
+        if store is None:
+            store = self._local.histograms = {}
+            with self._lock:
+                self._thread_stores.append((threading.current_thread(), store))
+        series = store.get(name)
+        if series is None:
+            series = store[name] = {}
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = {"buckets": [0] * len(METRICS[name][2]), "sum": 0.0, "count": 0}
+        # Index of the first bound the value is at or under
+        i = bisect_left(METRICS[name][2], value)
+        if i < len(hist["buckets"]):
+            hist["buckets"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of all metrics"""
+        with self._lock:
+            # Exited threads' stores won't change any more, so they are folded in and dropped
+            live = []
+            for thread, store in self._thread_stores:
+                if thread.is_alive():
+                    live.append((thread, store))
+                else:
+                    _merge_histograms(self._histograms, store)
+            self._thread_stores = live
+            histograms = {}
+            _merge_histograms(histograms, self._histograms)
+            for _, store in live:
+                _merge_histograms(histograms, store)
+            return {
+                "counters": {name: dict(series) for name, series in self._counters.items()},
+                "histograms": histograms,
+            }
+
+    def flush(self, force=False):
+        """Write this process's snapshot to METRICS_DIR (at most once per FLUSH_INTERVAL)"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f"metrics_{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {str(e)}")
+
+
+registry = MetricsRegistry()
+
+
+def _label_key(labels):
+    """Stable string key for a label dict"""
+    return json.dumps(sorted(labels.items()))
+
+
+def _merge_histograms(target, source):
+    """Add the histograms of a snapshot's "histograms" (or a thread's store) to target"""
+    for name, series in list(source.items()):
+        target_series = target.setdefault(name, {})
+        for key, hist in list(series.items()):
+            # Copied first, as the thread owning source may be recording into it
+            buckets, total, count = list(hist["buckets"]), hist["sum"], hist["count"]
+            existing = target_series.get(key)
+            if existing is None:
+                target_series[key] = {"buckets": buckets, "sum": total, "count": count}
+            else:
+                existing["buckets"] = [a + b for a, b in zip(existing["buckets"], buckets)]
+                existing["sum"] += total
+                existing["count"] += count
+
+
+def timed(function_name):
+    """Decorator recording the wrapped function's duration in function_duration_seconds"""
+    def decorator(func):
+        key = _label_key({"function": function_name})
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe_key("function_duration_seconds", key, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _end_query(conn):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    if has_request_context() and "metrics_start" in g:
+        g.metrics_sql_queries += 1
+        g.metrics_sql_time += elapsed
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _end_query(conn)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for a failed statement, which would
+    # otherwise leave its start time on the pooled connection
+    if exception_context.connection is not None and exception_context.execution_context is not None:
+        _end_query(exception_context.connection)
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql_queries = 0
+    g.metrics_sql_time = 0.0
+
+
+def _after_request(response):
+    if "metrics_start" not in g:
+        return response
+    endpoint = request.endpoint or "unmatched"
+    elapsed = time.perf_counter() - g.metrics_start
+    registry.observe("http_request_duration_seconds", {
+        "endpoint": endpoint,
+        "method": request.method,
+        "status": str(response.status_code),
+    }, elapsed)
+    registry.observe("http_request_sql_queries", {"endpoint": endpoint}, g.metrics_sql_queries)
+    registry.inc("sql_queries_total", {"endpoint": endpoint}, g.metrics_sql_queries)
+    registry.inc("sql_duration_seconds_total", {"endpoint": endpoint}, g.metrics_sql_time)
+    registry.flush()
+    return response
+
+
+def init_metrics(app):
+    """Register request timing middleware and SQL query listeners"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_snapshot(merged, snapshot):
+    for name, series in snapshot.get("counters", {}).items():
+        target = merged["counters"].setdefault(name, {})
+        for key, value in series.items():
+            target[key] = target.get(key, 0.0) + value
+    _merge_histograms(merged["histograms"], snapshot.get("histograms", {}))
+
+
+def retire_exited_snapshots():
+    """Fold the snapshots of exited processes into metrics_retired.json, returning how many"""
+    exited = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics_*.json")):
+        pid = os.path.basename(path)[len("metrics_"):-len(".json")]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            exited.append(path)
+    if not exited:
+        return 0
+
+    retired_path = os.path.join(METRICS_DIR, RETIRED_SNAPSHOT)
+    with open(os.path.join(METRICS_DIR, "metrics.lock"), "a") as lock:
+        # Exclusive, so a concurrent collect_metrics never counts a snapshot both in its file and retired
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retired = _read_snapshot(retired_path) or {"counters": {}, "histograms": {}}
+        folded = []
+        for path in exited:
+            snapshot = _read_snapshot(path)
+            if snapshot is not None:
+                _merge_snapshot(retired, snapshot)
+                folded.append(path)
+        tmp_path = f"{retired_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(retired, f)
+        os.replace(tmp_path, retired_path)
+        for path in folded:
+            os.remove(path)
+    return len(folded)
+
+
+def collect_metrics():
+    """Merge the snapshots of all worker processes"""
+    registry.flush(force=True)
+    try:
+        retire_exited_snapshots()
+    except OSError as e:
+        logger.warning(f"Could not retire metrics snapshots: {str(e)}")
+    merged = {"counters": {}, "histograms": {}}
+    try:
+        lock = open(os.path.join(METRICS_DIR, "metrics.lock"), "a")
+    except OSError:
+        lock = None
+    try:
+        if lock is not None:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+        for path in glob.glob(os.path.join(METRICS_DIR, "metrics_*.json")):
+            snapshot = _read_snapshot(path)
+            if snapshot is not None:
+                _merge_snapshot(merged, snapshot)
+    finally:
+        if lock is not None:
+            lock.close()
+    return merged
+
+
+def _format_labels(key, extra=None):
+    pairs = [tuple(pair) for pair in json.loads(key)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def render_prometheus(merged=None):
+    """Render merged metrics in Prometheus text exposition format"""
+    if merged is None:
+        merged = collect_metrics()
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        if metric_type == "counter":
+            for key, value in sorted(merged["counters"].get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        else:
+            for key, hist in sorted(merged["histograms"].get(name, {}).items()):
+                cumulative = 0
+                for bound, count in zip(buckets, hist["buckets"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {hist['sum']}")
+                lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,67 @@
+"""
+Bounded Password Hashing
+
+Password hashes are deliberately expensive to compute. Hashing runs in a small
+dedicated thread pool (hashlib releases the GIL while hashing), so the number
+of hashes computed at once per process is capped at PASSWORD_HASH_WORKERS.
+
+A login storm can't queue unbounded work either. Once
+PASSWORD_HASH_MAX_PENDING hashes are running or queued, further attempts fail
+immediately with PasswordHashingBusy. Attempts that wait longer than
+PASSWORD_HASH_TIMEOUT seconds also fail that way. The API turns
+PasswordHashingBusy into a 503 with Retry-After instead of tying up workers.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from backend.metrics import registry, timed
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "8"))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", "5"))
+PASSWORD_HASH_RETRY_AFTER = 1
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many password hashes are already pending"""
+
+    def __init__(self, message="Too many concurrent authentication attempts"):
+        super().__init__(message)
+        self.retry_after = PASSWORD_HASH_RETRY_AFTER
+
+
+def _run_bounded(func, *args):
+    if not _pending.acquire(blocking=False):
+        registry.inc("password_hash_rejected_total", {"reason": "queue_full"})
+        raise PasswordHashingBusy()
+    try:
+        future = _executor.submit(func, *args)
+    except RuntimeError:
+        _pending.release()
+        raise
+    # Release the slot when the hash finishes, even if the caller timed out
+    future.add_done_callback(lambda _: _pending.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+    except TimeoutError:
+        registry.inc("password_hash_rejected_total", {"reason": "timeout"})
+        raise PasswordHashingBusy()
+
+
+@timed("hash_password")
+def hash_password(password):
+    """Hash a password in the bounded hashing pool"""
+    return _run_bounded(generate_password_hash, password)
+
+
+@timed("verify_password")
+def verify_password(password_hash, password):
+    """Check a password against its hash in the bounded hashing pool"""
+    return _run_bounded(check_password_hash, password_hash, password)
@@ -0,0 +1,205 @@
+"""
+Personalized Recommendations
+
+Recommends products for a user from the products they saved
+(UserSavedProduct). The scoring is that of rank_recommendations in
+backend/recommendations.py, averaged over the saved products. For a single
+saved product the ranking is the same as that product's recommendations.
+
+- sentiment: 5 x (positive_score + 0.5 x neutral_score)
+- category: 3 for the same category, 1.5 for a similar one (see
+  backend/categories.py)
+- price: 2 within 20% of a saved product's price, 1 within 50%
+- features: 0.5 per feature word shared with a saved product
+
+Instead of a Python loop per candidate, every candidate is scored in one
+vectorized pass over a ProductFeatureIndex: catalog-wide NumPy arrays of the
+sentiment, category, price and review feature words of all products. The
+index is built with one query per table and reused for
+RECOMMENDATION_INDEX_TTL seconds.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from backend.categories import category_name_similarity, current_category_taxonomy
+from backend.metrics import timed
+from backend.price_index import PRICE_BANDS
+from backend.recommendations import features_from_reviews, positive_reviews_by_product
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATION_INDEX_TTL = float(os.environ.get("RECOMMENDATION_INDEX_TTL", "300"))
+
+SENTIMENT_WEIGHT = 5
+FEATURE_SCORE = 0.5
+# Scores are compared at this precision when ranking
+SCORE_DECIMALS = 9
+# Each band lies inside the wider ones, so being inside it adds its points minus the next band's
+PRICE_BAND_INCREMENTS = tuple(
+    (band, points - next_points)
+    for (band, points), (_, next_points) in zip(PRICE_BANDS, PRICE_BANDS[1:] + ((None, 0),)))
+
+
+class ProductFeatureIndex:
+    """
+    Recommendation features of every product, as arrays ordered by product ID
+
+    - product_ids        int64    one row per product
+    - sentiment          float64  positive_score + 0.5 x neutral_score
+    - price              float64  NaN when missing or zero
+    - category_code      int32    row/column of category_scores
+    - category_scores    float64  category points, base category x candidate category
+                                  (by category ID, or by name for products outside the taxonomy)
+    - feature_rows, feature_codes  int32  one entry per (product row, feature word)
+    """
+
+    def __init__(self, products, features_by_id, taxonomy=None):
+        products = sorted(products, key=lambda product: product.id)
+        self.product_ids = np.array([product.id for product in products], dtype=np.int64)
+        self.sentiment = np.array(
+            [(product.positive_score or 0) * 1.0 + (product.neutral_score or 0) * 0.5 for product in products],
+            dtype=np.float64)
+        self.price = np.array([product.price or np.nan for product in products], dtype=np.float64)
+
+        # (category ID, name) with the ID None outside the taxonomy, scored like category_points does
+        def category_of(product):
+            known = taxonomy is not None and product.category_id in taxonomy
+            return (product.category_id if known else None, product.category)
+
+        def pair_score(a, b):
+            if a[0] is not None and b[0] is not None:
+                return taxonomy.score(a[0], b[0])
+            return category_name_similarity(a[1], b[1])
+
+        categories = sorted({category_of(product) for product in products},
+                            key=lambda c: (c[0] is None, c[0] or 0, c[1] is None, c[1] or ""))
+        codes = {category: i for i, category in enumerate(categories)}
+        self.category_code = np.array([codes[category_of(product)] for product in products], dtype=np.int32)
+        self.category_scores = np.array(
+            [[pair_score(a, b) for b in categories] for a in categories], dtype=np.float64
+        ).reshape(len(categories), len(categories))
+
+        vocabulary = {}
+        rows, feature_codes = [], []
+        for row, product in enumerate(products):
+            for feature in set(features_by_id.get(product.id, [])):
+                rows.append(row)
+                feature_codes.append(vocabulary.setdefault(feature, len(vocabulary)))
+        self.feature_rows = np.array(rows, dtype=np.int32)
+        self.feature_codes = np.array(feature_codes, dtype=np.int32)
+        self.vocabulary_size = len(vocabulary)
+        self.created_at = time.time()
+
+    @classmethod
+    def from_database(cls, session):
+        from models import Product
+
+        products = session.scalars(select(Product)).all()
+        reviews_by_product = positive_reviews_by_product()
+        features_by_id = {
+            product.id: features_from_reviews(product.description, reviews_by_product.get(product.id, []))
+            for product in products
+        }
+        return cls(products, features_by_id, current_category_taxonomy(session))
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def rows(self, product_ids):
+        """Rows of the given product IDs that are in the index"""
+        return np.flatnonzero(np.isin(self.product_ids, np.asarray(product_ids, dtype=np.int64)))
+
+    def scores(self, base_rows):
+        """Mean rank_recommendations score of every product against the base products"""
+        count = len(base_rows)
+        scores = self.sentiment * SENTIMENT_WEIGHT
+
+        base_categories = np.bincount(self.category_code[base_rows], minlength=len(self.category_scores))
+        scores += (base_categories @ self.category_scores)[self.category_code] / count
+
+        # How many base prices each candidate price is within a band of: the open intervals
+        # (base - width, base + width) starting below the price minus those ending at or below it
+        price_points = np.zeros(len(self.product_ids))
+        base_prices = self.price[base_rows]
+        base_prices = base_prices[~np.isnan(base_prices)]
+        has_price = ~np.isnan(self.price)
+        prices = self.price[has_price]
+        for band, points in PRICE_BAND_INCREMENTS:
+            widths = band * np.maximum(base_prices, 1)
+            starts, ends = np.sort(base_prices - widths), np.sort(base_prices + widths)
+            inside = np.searchsorted(starts, prices, side="left") - np.searchsorted(ends, prices, side="right")
+            price_points[has_price] += inside * points
+        scores += price_points / count
+
+        base_features = np.bincount(
+            self.feature_codes[np.isin(self.feature_rows, base_rows)], minlength=self.vocabulary_size)
+        overlap = np.bincount(self.feature_rows, weights=base_features[self.feature_codes],
+                              minlength=len(self.product_ids))
+        scores += overlap * FEATURE_SCORE / count
+        return scores
+
+    def recommend(self, saved_product_ids, limit):
+        """IDs of the best products for someone who saved saved_product_ids, excluding those"""
+        base_rows = self.rows(saved_product_ids)
+        if len(base_rows) == 0 or limit <= 0:
+            return []
+        # Means summed in a different order than a per-product loop differ in the last bits;
+        # rounding keeps tied products tied so they stay in product ID order
+        scores = np.round(self.scores(base_rows), SCORE_DECIMALS)
+        scores[base_rows] = -np.inf
+        limit = min(limit, len(self.product_ids) - len(base_rows))
+        if limit <= 0:
+            return []
+        # Highest scores first; ties keep product ID order, as in rank_recommendations
+        kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        top = np.flatnonzero(scores >= kth)
+        top = top[np.lexsort((top, -scores[top]))][:limit]
+        return self.product_ids[top].tolist()
+
+
+_cached_index = None
+_index_lock = threading.Lock()
+
+
+def current_feature_index(session):
+    """Feature index for request handlers, rebuilt every RECOMMENDATION_INDEX_TTL seconds"""
+    global _cached_index
+    with _index_lock:
+        if _cached_index is None or time.time() - _cached_index.created_at > RECOMMENDATION_INDEX_TTL:
+            _cached_index = ProductFeatureIndex.from_database(session)
+        return _cached_index
+
+
+def invalidate_feature_index():
+    """Drop the cached index so the next request rebuilds it"""
+    global _cached_index
+    with _index_lock:
+        _cached_index = None
+
+
+def saved_product_ids(session, user_id):
+    """IDs of the products a user saved, most recent first"""
+    from models import UserSavedProduct
+
+    return session.scalars(
+        select(UserSavedProduct.product_id)
+        .where(UserSavedProduct.user_id == user_id)
+        .order_by(UserSavedProduct.created_at.desc(), UserSavedProduct.id.desc())
+    ).all()
+
+
+@timed("personalized_recommendations")
+def get_personalized_recommendations(session, saved_ids, limit=5):
+    """Products recommended for someone who saved saved_ids, best first"""
+    from models import Product
+
+    product_ids = current_feature_index(session).recommend(saved_ids, limit)
+    products = {product.id: product for product in
+                session.scalars(select(Product).where(Product.id.in_(product_ids)))}
+    return [products[product_id] for product_id in product_ids if product_id in products]
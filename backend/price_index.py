@@ -0,0 +1,189 @@
+"""
+Sorted Price Index
+
+Product prices kept sorted per canonical category, so the products within a
+price band of a base product (±20% and ±50% in rank_recommendations) are
+found with two bisections per category instead of comparing every product's
+price. Recommendations use it to score candidates without their review
+features first (see get_recommendations_for_product).
+
+The index is built from the product table once per process and then
+refreshed incrementally: at most every PRICE_INDEX_REFRESH seconds it reads
+the products whose updated_at is at or after the newest one it has seen, so
+products created or re-priced by an import show up without a rebuild. Rows
+written up to PRICE_INDEX_OVERLAP seconds before that are read again, as a
+long import transaction may commit rows older than ones already seen. The
+whole index is rebuilt every PRICE_INDEX_TTL seconds.
+
+Refreshes read the database without holding the index lock: a rebuild fills
+new structures and swaps them in, and an incremental refresh only takes the
+lock to apply the changed prices. One thread refreshes at a time while the
+others keep using the current index; only the first build makes them wait.
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import select
+
+logger = logging.getLogger(__name__)
+
+PRICE_INDEX_REFRESH = float(os.environ.get("PRICE_INDEX_REFRESH", "5"))
+PRICE_INDEX_OVERLAP = float(os.environ.get("PRICE_INDEX_OVERLAP", "300"))
+PRICE_INDEX_TTL = float(os.environ.get("PRICE_INDEX_TTL", "3600"))
+
+# (relative price difference, points), checked in order like rank_recommendations
+PRICE_BANDS = ((0.2, 2), (0.5, 1))
+# Bisection bounds are widened by this much, then the exact band test is applied
+_BOUND_SLACK = 1e-9
+
+
+def price_band_points(base_price, price):
+    """Price points rank_recommendations gives a product at price for a base product at base_price"""
+    if not base_price or not price:
+        return 0
+    price_diff_pct = abs(price - base_price) / max(base_price, 1)
+    for band, points in PRICE_BANDS:
+        if price_diff_pct < band:
+            return points
+    return 0
+
+
+class PriceIndex:
+    """Product IDs sorted by price, one pair of parallel lists per category ID"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._entries = {}  # product ID -> (category ID, price)
+        self._prices = {}  # category ID -> sorted prices (ties by product ID)
+        self._ids = {}  # category ID -> product IDs in the order of the prices
+        self.watermark = None
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def price_of(self, product_id):
+        """Indexed price of a product, or None for products without a price"""
+        entry = self._entries.get(product_id)
+        return entry[1] if entry else None
+
+    def set_price(self, product_id, category_id, price):
+        """Add, move or (for a missing or zero price) remove a product"""
+        with self._lock:
+            old = self._entries.pop(product_id, None)
+            if old is not None:
+                prices, ids = self._prices[old[0]], self._ids[old[0]]
+                i = bisect_left(prices, old[1])
+                while ids[i] != product_id:
+                    i += 1
+                del prices[i], ids[i]
+            if not price:
+                return
+            prices, ids = self._prices.setdefault(category_id, []), self._ids.setdefault(category_id, [])
+            i = bisect_right(prices, price)
+            while i > 0 and prices[i - 1] == price and ids[i - 1] > product_id:
+                i -= 1
+            prices.insert(i, price)
+            ids.insert(i, product_id)
+            self._entries[product_id] = (category_id, price)
+
+    def within(self, price, band, category_ids=None):
+        """
+        IDs of the products whose price differs from price by less than band
+        (relative to max(price, 1)), in the given categories or all of them
+        """
+        width = band * max(price, 1)
+        low, high = price - width, price + width
+        low -= abs(low) * _BOUND_SLACK + _BOUND_SLACK
+        high += abs(high) * _BOUND_SLACK + _BOUND_SLACK
+        found = []
+        with self._lock:
+            for category_id in (self._prices if category_ids is None else category_ids):
+                prices = self._prices.get(category_id)
+                if not prices:
+                    continue
+                ids = self._ids[category_id]
+                for i in range(bisect_left(prices, low), bisect_right(prices, high)):
+                    if abs(prices[i] - price) / max(price, 1) < band:
+                        found.append(ids[i])
+        return found
+
+    def price_points(self, base_price, category_ids=None):
+        """Product ID -> price points for a base product at base_price, for products with any"""
+        if not base_price:
+            return {}
+        points = {}
+        # Narrower bands give more points, so they are applied last
+        for band, band_points in reversed(PRICE_BANDS):
+            for product_id in self.within(base_price, band, category_ids):
+                points[product_id] = band_points
+        return points
+
+    def _swap(self, rows, now):
+        """Replace the whole index with one built from (product ID, category ID, price, updated_at) rows"""
+        entries = {product_id: (category_id, price) for product_id, category_id, price, _ in rows if price}
+        by_category = defaultdict(list)
+        for product_id, (category_id, price) in entries.items():
+            by_category[category_id].append((price, product_id))
+        prices, ids = {}, {}
+        for category_id, pairs in by_category.items():
+            pairs.sort()
+            prices[category_id] = [price for price, _ in pairs]
+            ids[category_id] = [product_id for _, product_id in pairs]
+        watermark = max((updated_at for *_, updated_at in rows if updated_at is not None), default=None)
+        with self._lock:
+            self._entries, self._prices, self._ids = entries, prices, ids
+            self.watermark = watermark
+            self.built_at = now
+
+    def refresh(self, session, force=False):
+        """Rebuild the index when it expired, otherwise read the products changed since the last refresh"""
+        from models import Product
+
+        now = time.time()
+        if not force and now - self.built_at <= PRICE_INDEX_TTL and now - self.refreshed_at < PRICE_INDEX_REFRESH:
+            return self
+        # Callers only wait for another thread's refresh when there is no index yet
+        if not self._refresh_lock.acquire(blocking=force or not self.built_at):
+            return self
+        try:
+            now = time.time()
+            rebuild = force or now - self.built_at > PRICE_INDEX_TTL
+            if not rebuild and now - self.refreshed_at < PRICE_INDEX_REFRESH:
+                return self
+            query = select(Product.id, Product.category_id, Product.price, Product.updated_at)
+            if not rebuild and self.watermark is not None:
+                query = query.where(Product.updated_at >= self.watermark - timedelta(seconds=PRICE_INDEX_OVERLAP))
+            rows = session.execute(query).all()
+            if rebuild:
+                self._swap(rows, now)
+                logger.info(f"Built price index of {len(self)} products")
+            else:
+                changed = [(product_id, category_id, price) for product_id, category_id, price, _ in rows
+                           if self._entries.get(product_id) != ((category_id, price) if price else None)]
+                newest = max((updated_at for *_, updated_at in rows if updated_at is not None), default=None)
+                with self._lock:
+                    for product_id, category_id, price in changed:
+                        self.set_price(product_id, category_id, price)
+                    if newest is not None and (self.watermark is None or newest > self.watermark):
+                        self.watermark = newest
+            self.refreshed_at = now
+            return self
+        finally:
+            self._refresh_lock.release()
+
+
+price_index = PriceIndex()
+
+
+def current_price_index(session):
+    """The process's price index, refreshed as needed"""
+    return price_index.refresh(session)
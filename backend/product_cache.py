@@ -0,0 +1,150 @@
+"""
+Product Response Cache
+
+Product detail, recommendation and personalized recommendation responses are
+cached per process for PRODUCT_CACHE_TTL seconds (default 300, 0 disables
+it), so a popular product is not recomputed on every request. Misses go through the single-flight
+groups, so concurrent misses for the same product are computed once. Reviews
+added or re-scored in the meantime show up when the entry expires.
+
+Product detail views are also counted per process (ProductTraffic) and
+written to METRICS_DIR like the metrics snapshots, so the startup warm-up
+(backend/warmup.py) can warm the products visitors actually request.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from backend.metrics import FLUSH_INTERVAL, METRICS_DIR, registry
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CACHE_TTL = float(os.environ.get("PRODUCT_CACHE_TTL", "300"))
+PRODUCT_CACHE_SIZE = int(os.environ.get("PRODUCT_CACHE_SIZE", "1000"))
+
+_MISSING = object()
+
+
+class ProductCache:
+    """Thread-safe TTL cache of response payloads keyed by (kind, product ID, ...)"""
+
+    def __init__(self, ttl=PRODUCT_CACHE_TTL, max_size=PRODUCT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, default=None):
+        """Cached payload for the key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size and key not in self._entries:
+                # Evict the entry closest to expiry
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_compute(self, key, flight, func, *args):
+        """
+        Cached payload for the key, computing it with func(*args) on a miss
+
+        Concurrent misses share one computation through the SingleFlight
+        group. None results (e.g. product not found) are not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            registry.inc("product_cache_requests_total", {"kind": key[0], "result": "hit"})
+            return value
+        registry.inc("product_cache_requests_total", {"kind": key[0], "result": "miss"})
+        return flight.do(key, self._compute, key, func, args)
+
+    def _compute(self, key, func, args):
+        value = func(*args)
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, prefix):
+        """Drop the entries whose keys start with the prefix tuple"""
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ProductTraffic:
+    """Per-process product view counts, shared with other processes through METRICS_DIR"""
+
+    def __init__(self, directory=METRICS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._views = Counter()
+        self._last_flush = 0.0
+
+    def record(self, product_id):
+        with self._lock:
+            self._views[product_id] += 1
+        self.flush()
+
+    def flush(self, force=False):
+        """Write this process's view counts (at most once per FLUSH_INTERVAL)"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        with self._lock:
+            views = dict(self._views)
+        if not views:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"product_views_{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(views, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write product views: {str(e)}")
+
+    def top(self, limit, max_age):
+        """The most viewed product IDs across processes whose counts were written in the last max_age seconds"""
+        self.flush(force=True)
+        merged = Counter()
+        cutoff = time.time() - max_age
+        for path in glob.glob(os.path.join(self.directory, "product_views_*.json")):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    continue
+                with open(path) as f:
+                    merged.update({int(product_id): count for product_id, count in json.load(f).items()})
+            except (OSError, ValueError):
+                continue
+        return [product_id for product_id, _ in merged.most_common(limit)]
+
+
+product_cache = ProductCache()
+product_traffic = ProductTraffic()
@@ -164,47 +164,113 @@ products = [
     }
 ]
 
+def product_list_dict(product, reviews):
+    """
+    Convert a product and a sample of its reviews to the product list format
+    """
+    product_dict = {
+        "id": product.id,
+        "asin": product.asin,
+        "name": product.name,
+        "price": product.price,
+        "category": product.category,
+        "description": product.description,
+        "image_url": product.image_url,
+        "sentiment_score": (product.positive_score * 1.0) + (product.neutral_score * 0.5),
+        "reviews": []
+    }
+
+    for review in reviews:
+        review_dict = {
+            "author": review.author,
+            "date": review.date.strftime("%Y-%m-%d") if review.date else None,
+            "text": review.text,
+            "rating": review.rating
+        }
+        product_dict["reviews"].append(review_dict)
+
+    return product_dict
+
+def review_detail_query(product_id):
+    """
+    A product's reviews with the columns product_detail_dict reads, oldest
+    first. Rows are much cheaper to load than Review objects for products with
+    many reviews.
+    """
+    from sqlalchemy import select
+    from models import Review
+
+    return (
+        select(Review.author, Review.date, Review.text, Review.rating, Review.sentiment_score,
+               Review.sentiment_class, Review.sentiment_keywords)
+        .where(Review.product_id == product_id)
+        .order_by(Review.id)
+    )
+
+def product_detail_dict(product, reviews, sentiment_counts=None):
+    """
+    Convert a product and all of its reviews to the product detail format
+
+    sentiment_counts (review counts by sentiment class) are counted from the
+    reviews when not given
+    """
+    if sentiment_counts is None:
+        sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
+        for review in reviews:
+            if review.sentiment_class in sentiment_counts:
+                sentiment_counts[review.sentiment_class] += 1
+
+    product_data = {
+        "id": product.id,
+        "asin": product.asin,
+        "name": product.name,
+        "price": product.price if product.price is not None else 0.0,
+        "category": product.category,
+        "description": product.description,
+        "image_url": product.image_url,
+        "reviews": [],
+        "sentiment_counts": sentiment_counts,
+        "sentiment_score": (product.positive_score * 1.0) + (product.neutral_score * 0.5)
+    }
+
+    # Add all reviews with sentiment analysis
+    for review in reviews:
+        review_dict = {
+            "author": review.author,
+            "date": review.date.strftime("%Y-%m-%d") if review.date else None,
+            "text": review.text,
+            "rating": review.rating,
+            "sentiment": review.sentiment_score,
+            "sentiment_class": review.sentiment_class,
+        }
+
+        # Keywords come parsed from the JSON column
+        if review.sentiment_keywords is not None:
+            review_dict["keywords"] = review.sentiment_keywords
+
+        product_data["reviews"].append(review_dict)
+
+    # "Hype vs Reality" is added by the API layer, which has the final review list
+    return product_data
+
 def get_products():
     """
     Return all products with basic sentiment analysis from database
     """
     try:
         # Try to query products from database
-        from models import Product
+        from models import Product, Review
 
         try:
             # Query products from database
-            products_db = Product.query.all()
+            products_db = Product.query.order_by(Product.id).all()
 
             if products_db:
                 # Database has products, return them
                 result = []
                 for product in products_db:
-                    # Convert product to dictionary
-                    product_dict = {
-                        "id": product.id,
-                        "asin": product.asin,
-                        "name": product.name,
-                        "price": product.price,
-                        "category": product.category,
-                        "description": product.description,
-                        "image_url": product.image_url,
-                        "sentiment_score": (product.positive_score * 1.0) + (product.neutral_score * 0.5),
-                        "reviews": []
-                    }
-
-                    # Add sample of reviews (limit to 3 for performance)
-                    reviews = product.reviews.limit(3).all()
-                    for review in reviews:
-                        review_dict = {
-                            "author": review.author,
-                            "date": review.date.strftime("%Y-%m-%d") if review.date else None,
-                            "text": review.text,
-                            "rating": review.rating
-                        }
-                        product_dict["reviews"].append(review_dict)
-
-                    result.append(product_dict)
+                    # Add sample of reviews (the first 3, for performance)
+                    result.append(product_list_dict(product, product.reviews.order_by(Review.id).limit(3).all()))
 
                 return result
 
@@ -225,61 +291,19 @@ def get_product_by_id(product_id):
     """
     try:
         # Try to query from database first
-        from models import Product, Review
+        from app import db
+        from models import Product
+        from backend.aspect_summary import get_aspect_summary
 
         try:
             # Query product from database
             product = Product.query.get(product_id)
 
             if product:
-                # Convert product to dictionary
-                product_data = {
-                    "id": product.id,
-                    "asin": product.asin,
-                    "name": product.name,
-                    "price": product.price if product.price is not None else 0.0,
-                    "category": product.category,
-                    "description": product.description,
-                    "image_url": product.image_url,
-                    "reviews": [],
-                    "sentiment_counts": {
-                        "positive": product.positive_score,
-                        "neutral": product.neutral_score,
-                        "negative": product.negative_score
-                    },
-                    "sentiment_score": (product.positive_score * 1.0) + (product.neutral_score * 0.5)
-                }
-
-                # Add all reviews with sentiment analysis
-                reviews = product.reviews.all()
-                for review in reviews:
-                    review_dict = {
-                        "author": review.author,
-                        "date": review.date.strftime("%Y-%m-%d") if review.date else None,
-                        "text": review.text,
-                        "rating": review.rating,
-                        "sentiment": review.sentiment_score,
-                        "sentiment_class": review.sentiment_class,
-                    }
-
-                    # Parse keywords from JSON if available
-                    if review.sentiment_keywords:
-                        try:
-                            import json as json_module
-                            review_dict["keywords"] = json_module.loads(review.sentiment_keywords)
-                        except json_module.JSONDecodeError:
-                            review_dict["keywords"] = []
-
-                    product_data["reviews"].append(review_dict)
-
-                # Add "Hype vs Reality" analysis if available
-                if product.description and product_data["reviews"]:
-                    from backend.sentiment_analyzer import analyze_hype_vs_reality
-                    product_data["hype_vs_reality"] = analyze_hype_vs_reality(
-                        product.description,
-                        [r["text"] for r in product_data["reviews"]]
-                    )
-
+                # Sentiment counts come from the same rows as the review list, so they always agree
+                reviews = db.session.execute(review_detail_query(product.id)).all()
+                product_data = product_detail_dict(product, reviews)
+                product_data["key_aspects"] = get_aspect_summary(db.session, product.id)
                 return product_data
 
         except Exception as db_error:
@@ -3,19 +3,32 @@ Product Recommendation Engine based on Sentiment Analysis
 
 This module provides functions to recommend products based on:
 1. Sentiment scores - recommending products with high positive sentiment
-2. Category similarity - products in the same category
+2. Category similarity - products in the same or a related category
+   (canonical category IDs, see backend/categories.py)
 3. Keyword similarity - products that share similar positive keywords
-4. User preferences - based on previously viewed or favorited products
+4. User preferences - based on saved products (see backend/personalization.py)
 """
 
 import logging
 import re
-from collections import Counter
+from collections import Counter, defaultdict
+from sqlalchemy import or_, select
 from models import Product, Review
 from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment
+from backend.categories import category_filter, category_points, current_category_taxonomy
+from backend.metrics import registry, timed
+from backend.price_index import current_price_index, price_band_points
 
 logger = logging.getLogger(__name__)
 
+# Candidates given features, and products read by sentiment, per round of candidate generation
+CANDIDATE_BATCH_SIZE = 100
+# Product IDs per query when loading the candidates that can get category or price points
+CANDIDATE_LOAD_SIZE = 500
+# Added to the sentiment bound of unread products, as SQL may round the sort key differently
+_SCORE_SLACK = 1e-9
+
+@timed("recommendation_scoring")
 def get_recommendations_for_product(product_id, limit=3):
     """
     Get product recommendations based on the specified product
@@ -35,76 +48,24 @@ def get_recommendations_for_product(product_id, limit=3):
             logger.warning(f"Cannot recommend products: Product {product_id} not found")
             return []
             
-        # Get all other products (excluding the current one)
-        all_other_products = Product.query.filter(Product.id != product_id).all()
+        # Get features from reviews (only positive reviews contribute, loaded as plain rows
+        # rather than one Review query per product)
+        base_product_features = features_from_reviews(
+            base_product.description, positive_reviews_by_product([base_product.id]).get(base_product.id, []))
+        
+        # Only candidates that can still make the top `limit` are loaded and get their features extracted
+        session = Product.query.session
+        taxonomy = current_category_taxonomy(session)
+        candidates, features_by_id = generate_candidates(
+            session, base_product, base_product_features, limit, taxonomy, current_price_index(session))
         
-        if not all_other_products:
+        if not candidates:
             logger.warning("No other products available for recommendations")
             return []
-            
-        # Initialize scoring for each product
-        product_scores = {}
-        for product in all_other_products:
-            # Base score is 0
-            product_scores[product.id] = 0
-            
-        # 1. Score based on sentiment (products with high positive sentiment scores)
-        for product in all_other_products:
-            # Sentiment score 0-1, where 1 is most positive
-            sentiment_score = (product.positive_score * 1.0) + (product.neutral_score * 0.5)
-            
-            # Scale the sentiment score to have more impact (0-5 range)
-            product_scores[product.id] += sentiment_score * 5
-            
-        # 2. Score based on category match
-        for product in all_other_products:
-            # Same category gets a bonus
-            if product.category == base_product.category:
-                product_scores[product.id] += 3
-            # Similar category (e.g., "Electronics" matches "Electronic Devices")
-            elif base_product.category and product.category and \
-                 (base_product.category.lower() in product.category.lower() or 
-                  product.category.lower() in base_product.category.lower()):
-                product_scores[product.id] += 1.5
-                
-        # 3. Score based on price similarity
-        if base_product.price:
-            for product in all_other_products:
-                if product.price:
-                    # Similar price range (within 20% difference)
-                    price_diff_pct = abs(product.price - base_product.price) / max(base_product.price, 1)
-                    if price_diff_pct < 0.2:
-                        product_scores[product.id] += 2
-                    elif price_diff_pct < 0.5:
-                        product_scores[product.id] += 1
         
-        # 4. Get features from reviews
-        base_product_features = extract_product_features(base_product)
-        
-        # Score based on feature similarity
-        for product in all_other_products:
-            product_features = extract_product_features(product)
-            
-            # Get common features
-            common_features = set(base_product_features).intersection(set(product_features))
-            
-            # Score based on feature overlap (each common feature adds 1 point)
-            feature_score = len(common_features) * 0.5
-            product_scores[product.id] += feature_score
-        
-        # Sort products by score (highest to lowest)
-        sorted_product_ids = sorted(
-            product_scores.keys(), 
-            key=lambda pid: product_scores[pid], 
-            reverse=True
+        recommended_products = rank_recommendations(
+            base_product, candidates, base_product_features, features_by_id, limit, taxonomy=taxonomy
         )
-        
-        # Get the top N recommended products
-        recommended_products = []
-        for pid in sorted_product_ids[:limit]:
-            product = Product.query.get(pid)
-            if product:
-                recommended_products.append(product)
                 
         logger.info(f"Generated {len(recommended_products)} recommendations for product {product_id}")
         return recommended_products
@@ -113,6 +74,216 @@ def get_recommendations_for_product(product_id, limit=3):
         logger.error(f"Error generating recommendations: {str(e)}")
         return []
 
+def _partial_score(base_product, product, category_score, price_points, price_index):
+    """A candidate's rank_recommendations score without features"""
+    # Summed in rank_recommendations' order, so adding a feature score gives its exact total
+    score = 0 + ((product.positive_score * 1.0) + (product.neutral_score * 0.5)) * 5
+    score += category_score(product)
+    if base_product.price and product.price:
+        if price_index.price_of(product.id) == product.price:
+            score += price_points.get(product.id, 0)
+        else:
+            # Changed since the index was last refreshed
+            score += price_band_points(base_product.price, product.price)
+    return score
+
+def _category_candidates(base_product, taxonomy):
+    """
+    SQL condition for the products that may get category points, or None if
+    any product may (the base product is scored by category name)
+    """
+    base_id = getattr(base_product, "category_id", None)
+    if base_id not in taxonomy:
+        return None
+    # Products without a category ID, or in a category created since the taxonomy
+    # was loaded, are scored by name
+    return or_(Product.category_id.in_(list(taxonomy.similar_to(base_id))),
+               Product.category_id.is_(None),
+               Product.category_id > max(taxonomy.names))
+
+def generate_candidates(session, base_product, base_product_features, limit, taxonomy, price_index):
+    """
+    The products that can make the top `limit` for base_product, with their features
+    
+    Only products that can get category or price points are loaded up front:
+    the base product's similar categories and the price index's bands. Every
+    other product scores its sentiment only, so the rest are read best
+    sentiment first, in pages of CANDIDATE_BATCH_SIZE. Features can add at
+    most 0.5 per feature of the base product, so loaded candidates are given
+    features best score first, in batches of CANDIDATE_BATCH_SIZE, until the
+    limit-th best full score is higher than any other product could reach.
+    rank_recommendations over the returned candidates gives the same result as
+    over all products (a product re-priced into a price band since the index's
+    last refresh can be missed).
+    
+    Returns:
+        (candidates to rank, by product ID; candidate ID -> features)
+    """
+    category_score = category_points(base_product, taxonomy)
+    price_points = price_index.price_points(base_product.price)
+    
+    category_condition = _category_candidates(base_product, taxonomy)
+    if category_condition is None:
+        bonus_ids = None
+    else:
+        bonus_ids = set(price_points) | set(session.scalars(select(Product.id).where(category_condition)))
+        bonus_ids.discard(base_product.id)
+    
+    pool = {}  # loaded products not given features yet -> score without features
+    loaded = {}
+    
+    def add(products):
+        for product in products:
+            if product.id not in loaded:
+                loaded[product.id] = product
+                pool[product] = _partial_score(base_product, product, category_score, price_points, price_index)
+    
+    if bonus_ids is None:
+        add(session.scalars(select(Product).where(Product.id != base_product.id)))
+        stream = None
+    else:
+        bonus_ids = sorted(bonus_ids)
+        for i in range(0, len(bonus_ids), CANDIDATE_LOAD_SIZE):
+            add(session.scalars(select(Product).where(Product.id.in_(bonus_ids[i:i + CANDIDATE_LOAD_SIZE]))))
+        sentiment = Product.positive_score + Product.neutral_score * 0.5
+        stream = session.scalars(
+            select(Product).where(Product.id != base_product.id)
+            .order_by(sentiment.desc(), Product.id)
+            .execution_options(yield_per=CANDIDATE_BATCH_SIZE)
+        )
+    # Highest score without features any product not loaded yet can have
+    frontier = float("-inf")
+    
+    base_features = set(base_product_features)
+    max_feature_score = len(base_features) * 0.5
+    features_by_id, best = {}, []
+    while True:
+        if stream is not None and (not pool or max(pool.values()) < frontier):
+            page = stream.fetchmany(CANDIDATE_BATCH_SIZE)
+            if page:
+                # Not a bonus product, so sentiment is all it scores (plus slack for float rounding in SQL)
+                last = page[-1]
+                frontier = ((last.positive_score * 1.0) + (last.neutral_score * 0.5)) * 5 + _SCORE_SLACK
+                add(page)
+            else:
+                stream, frontier = None, float("-inf")
+            continue
+        if not pool:
+            break
+        remaining = max(max(pool.values()), frontier)
+        if 0 < limit <= len(best) and best[-limit] > remaining + max_feature_score:
+            break
+        batch = sorted(pool, key=pool.get, reverse=True)[:CANDIDATE_BATCH_SIZE]
+        reviews_by_product = positive_reviews_by_product([product.id for product in batch])
+        for product in batch:
+            features = features_from_reviews(product.description, reviews_by_product.get(product.id, []))
+            features_by_id[product.id] = features
+            best.append(pool.pop(product) + len(base_features.intersection(features)) * 0.5)
+        best.sort()
+    if stream is not None:
+        stream.close()
+    
+    registry.inc("recommendation_candidates_total", {"result": "scored"}, len(features_by_id))
+    registry.inc("recommendation_candidates_total", {"result": "pruned"}, len(loaded) - len(features_by_id))
+    candidates = sorted((loaded[product_id] for product_id in features_by_id), key=lambda product: product.id)
+    return candidates, features_by_id
+
+def rank_recommendations(base_product, candidates, base_product_features, features_by_id, limit=3,
+                         taxonomy=None):
+    """
+    Score candidate products against the base product and return the best ones
+    
+    Works on any objects with id, category, price, positive_score and
+    neutral_score attributes (and optionally category_id), so it can run
+    without database access.
+    
+    Args:
+        base_product: The product to find recommendations for
+        candidates: Other products to score
+        base_product_features: Features of the base product
+        features_by_id: Mapping of candidate product ID to its features
+        limit: Maximum number of recommendations to return
+        taxonomy: CategoryTaxonomy to score categories by ID (by name if None)
+        
+    Returns:
+        List of recommended candidates, best first
+    """
+    # Initialize scoring for each product
+    product_scores = {}
+    for product in candidates:
+        # Base score is 0
+        product_scores[product.id] = 0
+
+    # 1. Score based on sentiment (products with high positive sentiment scores)
+    for product in candidates:
+        # Sentiment score 0-1, where 1 is most positive
+        sentiment_score = (product.positive_score * 1.0) + (product.neutral_score * 0.5)
+
+        # Scale the sentiment score to have more impact (0-5 range)
+        product_scores[product.id] += sentiment_score * 5
+
+    # 2. Score based on category match: same category gets a bonus, a similar one
+    # (parent/child, or e.g. "Electronics" / "Electronic Devices") half of it
+    category_score = category_points(base_product, taxonomy)
+    for product in candidates:
+        product_scores[product.id] += category_score(product)
+
+    # 3. Score based on price similarity
+    if base_product.price:
+        for product in candidates:
+            if product.price:
+                # Similar price range (within 20% difference)
+                price_diff_pct = abs(product.price - base_product.price) / max(base_product.price, 1)
+                if price_diff_pct < 0.2:
+                    product_scores[product.id] += 2
+                elif price_diff_pct < 0.5:
+                    product_scores[product.id] += 1
+
+    # Score based on feature similarity
+    for product in candidates:
+        product_features = features_by_id.get(product.id, [])
+
+        # Get common features
+        common_features = set(base_product_features).intersection(set(product_features))
+
+        # Score based on feature overlap (each common feature adds 1 point)
+        feature_score = len(common_features) * 0.5
+        product_scores[product.id] += feature_score
+
+    # Sort products by score (highest to lowest)
+    candidates_by_id = {product.id: product for product in candidates}
+    sorted_product_ids = sorted(
+        product_scores.keys(), 
+        key=lambda pid: product_scores[pid], 
+        reverse=True
+    )
+    
+    return [candidates_by_id[pid] for pid in sorted_product_ids[:limit]]
+
+def positive_reviews_by_product(product_ids=None):
+    """
+    Load the columns feature extraction needs from all positive reviews
+
+    Args:
+        product_ids: Only load the reviews of these products (all if None)
+
+    Returns:
+        Dictionary of product ID to rows with sentiment_class, text and sentiment_keywords
+    """
+    from app import db
+    # Feature ties are broken by review order, so loading some products' reviews
+    # (through the product index) must give them in the same order as loading all
+    query = (select(Review.product_id, Review.sentiment_class, Review.text, Review.sentiment_keywords)
+             .where(Review.sentiment_class == 'positive')
+             .order_by(Review.id))
+    if product_ids is not None:
+        query = query.where(Review.product_id.in_(product_ids))
+    rows = db.session.execute(query)
+    reviews_by_product = defaultdict(list)
+    for row in rows:
+        reviews_by_product[row.product_id].append(row)
+    return reviews_by_product
+
 def extract_product_features(product):
     """
     Extract product features from reviews and description
@@ -120,21 +291,33 @@ def extract_product_features(product):
     Args:
         product: Product object with reviews
         
+    Returns:
+        List of extracted features
+    """
+    reviews = Review.query.filter_by(product_id=product.id).all()
+    return features_from_reviews(product.description, reviews)
+
+def features_from_reviews(description, reviews):
+    """
+    Extract product features from a description and review objects
+    
+    Args:
+        description: Product description text
+        reviews: Objects with sentiment_class, text and sentiment_keywords
+        
     Returns:
         List of extracted features
     """
     features = []
     
     # Extract features from product description
-    if product.description:
+    if description:
         # Extract adjectives and nouns using simple pattern matching
         # In a real implementation, you might use NLP tools like spaCy
-        desc_words = re.findall(r'\b\w+\b', product.description.lower())
+        desc_words = re.findall(r'\b\w+\b', description.lower())
         features.extend(desc_words)
     
     # Extract features from positive reviews
-    reviews = Review.query.filter_by(product_id=product.id).all()
-    
     for review in reviews:
         if review.sentiment_class == 'positive':
             # Extract words from positive reviews
@@ -143,15 +326,9 @@ def extract_product_features(product):
                 features.extend(review_words)
             
             # Extract keywords from sentiment analysis
-            if review.sentiment_keywords:
-                try:
-                    import json
-                    keywords = json.loads(review.sentiment_keywords)
-                    for kw in keywords:
-                        if isinstance(kw, dict) and 'keyword' in kw:
-                            features.append(kw['keyword'].lower())
-                except Exception:
-                    pass
+            for kw in review.sentiment_keywords or []:
+                if isinstance(kw, dict) and 'keyword' in kw:
+                    features.append(kw['keyword'].lower())
     
     # Count frequency and keep top features
     counter = Counter(features)
@@ -178,9 +355,9 @@ def get_top_rated_products(category=None, limit=5):
         # Query base
         query = Product.query
         
-        # Apply category filter if specified
+        # Apply category filter if specified (the category and its subcategories)
         if category:
-            query = query.filter_by(category=category)
+            query = query.filter(category_filter(Product.query.session, category))
         
         # Order by positive sentiment
         query = query.order_by(Product.positive_score.desc())
@@ -0,0 +1,248 @@
+"""
+Incremental Review Re-scoring
+
+Every review stores the ANALYZER_VERSION that produced its sentiment score,
+class and keywords. After the scorer changes (and ANALYZER_VERSION is bumped),
+rescore_stale_reviews re-scores only reviews with an older or missing version:
+
+- Stale reviews are read in ID order, one chunk at a time (keyset pagination,
+  so each query is a short index range scan however far the job has got).
+- Chunks are scored in a pool of low-priority worker processes while the
+  previous chunk is written, so CPU-bound scoring never runs in the app
+  processes and never holds a database transaction open.
+- Each chunk's results are written in one short transaction: the bulk review
+  update, the timeline rollup and aspect summary deltas, the affected
+  products' cached sentiment scores and the job checkpoint commit together.
+  Aggregates are therefore consistent after every chunk, and an interrupted
+  run resumes after the last committed chunk.
+- An optional pause between chunks leaves room for the app's own writes
+  (SQLite allows one writer at a time).
+
+A review whose text changed while its chunk was being scored is skipped; the
+code path that changed it re-scored it with the current version.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import func, or_, select, update
+
+from backend.aspect_summary import apply_aspect_deltas, aspect_deltas
+from backend.checkpoints import get_checkpoint
+from backend.review_store import ReviewSnapshot, apply_sentiment_distribution, refresh_snapshot
+from backend.sentiment_analyzer import (
+    ANALYZER_VERSION, analyze_sentiment, classify_sentiment, get_sentiment_keywords
+)
+from backend.sentiment_rollup import record_review_change
+from backend.text_normalization import normalize_text
+
+logger = logging.getLogger(__name__)
+
+RESCORE_JOB = "rescore_reviews"
+
+# Reviews scored and written per transaction
+CHUNK_SIZE = int(os.environ.get("RESCORE_CHUNK_SIZE", "500"))
+# Scoring processes (0 scores in the calling process)
+WORKERS = int(os.environ.get("RESCORE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Seconds to sleep after each chunk is committed
+PAUSE = float(os.environ.get("RESCORE_PAUSE", "0"))
+# Scheduling priority increment for the scoring processes
+WORKER_NICENESS = 10
+
+
+def score_texts(items):
+    """
+    Score a chunk of reviews (runs in a worker process)
+
+    Args:
+        items: List of (review_id, text)
+
+    Returns:
+        List of (review_id, text, sentiment_score, sentiment_class, sentiment_keywords)
+    """
+    results = []
+    for review_id, text in items:
+        cleaned_text, analysis_text = normalize_text(text or "")
+        sentiment_score = analyze_sentiment(analysis_text, preprocessed=True)
+        sentiment_class = classify_sentiment(sentiment_score)
+        results.append((review_id, text, sentiment_score, sentiment_class,
+                        get_sentiment_keywords(cleaned_text, sentiment_class)))
+    return results
+
+
+def _lower_priority():
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def stale_filter():
+    """Reviews scored by another analyzer version, or never versioned"""
+    from models import Review
+
+    return or_(Review.analyzer_version.is_(None), Review.analyzer_version != ANALYZER_VERSION)
+
+
+def count_stale_reviews(session):
+    from models import Review
+
+    return session.scalar(select(func.count(Review.id)).where(stale_filter()))
+
+
+def _fetch_chunk(session, after_id, chunk_size):
+    from models import Review
+
+    return session.execute(
+        select(Review.id, Review.text)
+        .where(stale_filter(), Review.id > after_id)
+        .order_by(Review.id)
+        .limit(chunk_size)
+    ).all()
+
+
+def apply_scores(session, results, checkpoint, position):
+    """
+    Write one scored chunk and its aggregate changes, then commit with the checkpoint
+
+    Returns:
+        Tuple of (reviews updated, set of affected product IDs)
+    """
+    from models import Review
+
+    scored = {review_id: rest for review_id, *rest in results}
+    current = session.execute(
+        select(Review.id, Review.product_id, Review.date, Review.text, Review.sentiment_score,
+               Review.sentiment_class, Review.sentiment_keywords)
+        .where(Review.id.in_(scored), stale_filter())
+    ).all()
+
+    updates = []
+    aspect_rows = []
+    affected = set()
+    for row in current:
+        text, sentiment_score, sentiment_class, sentiment_keywords = scored[row.id]
+        if row.text != text:
+            continue
+        record_review_change(session, row.product_id, row.date,
+                             old=(row.sentiment_score, row.sentiment_class),
+                             new=(sentiment_score, sentiment_class))
+        aspect_rows.extend(aspect_deltas(row.product_id,
+                                         old=(row.sentiment_score, row.sentiment_keywords),
+                                         new=(sentiment_score, sentiment_keywords)))
+        updates.append({
+            "id": row.id,
+            "sentiment_score": sentiment_score,
+            "sentiment_class": sentiment_class,
+            "sentiment_keywords": sentiment_keywords,
+            "analyzer_version": ANALYZER_VERSION,
+        })
+        affected.add(row.product_id)
+
+    if updates:
+        session.execute(update(Review), updates)
+        apply_aspect_deltas(session, aspect_rows)
+        apply_sentiment_distribution(session, ReviewSnapshot.from_database(session, affected))
+
+    checkpoint.position = str(position)
+    checkpoint.processed += len(updates)
+    session.commit()
+    return len(updates), affected
+
+
+class _Scored:
+    """Already computed result with the Future interface, for in-process scoring"""
+
+    def __init__(self, results):
+        self._results = results
+
+    def result(self):
+        return self._results
+
+
+def rescore_stale_reviews(session, chunk_size=CHUNK_SIZE, workers=WORKERS, pause=PAUSE,
+                          reset=False, limit=None, job_name=RESCORE_JOB, progress=None):
+    """
+    Re-score reviews not scored by the current ANALYZER_VERSION
+
+    Args:
+        session: Database session (committed after every chunk)
+        chunk_size: Reviews scored and written per transaction
+        workers: Scoring processes; 0 scores in this process
+        pause: Seconds to sleep after each committed chunk
+        reset: Start from the first review instead of resuming an interrupted run
+        limit: Stop after roughly this many reviews (for trial runs)
+        job_name: Checkpoint name
+        progress: Optional callable(done, total) called after each committed chunk; it may
+            raise to stop the run (the checkpoint keeps the work done so far)
+
+    Returns:
+        Dict of job statistics
+    """
+    checkpoint = get_checkpoint(session, job_name)
+    if reset or checkpoint.position is None or checkpoint.completed_at is not None:
+        # A finished run's checkpoint is only a record; the next run starts over
+        checkpoint.position = "0"
+        checkpoint.processed = 0
+    checkpoint.completed_at = None
+    session.commit()
+
+    after_id = int(checkpoint.position)
+    stats = {"analyzer_version": ANALYZER_VERSION, "resumed_after_id": after_id,
+             "chunks": 0, "reviews_rescored": 0, "reviews_skipped": 0, "products_affected": 0}
+    affected = set()
+    fetched = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_lower_priority) if workers > 0 else None
+    # Keep every worker busy while the oldest chunk is being written
+    in_flight = max(1, workers) * 2
+    pending = deque()
+    exhausted = False
+    start = time.perf_counter()
+    try:
+        while True:
+            while not exhausted and len(pending) < in_flight:
+                items = _fetch_chunk(session, after_id, chunk_size)
+                session.rollback()  # end the read transaction before scoring
+                if not items or (limit is not None and fetched >= limit):
+                    exhausted = True
+                    break
+                after_id = items[-1].id
+                fetched += len(items)
+                items = [tuple(item) for item in items]
+                if executor is not None:
+                    pending.append((after_id, len(items), executor.submit(score_texts, items)))
+                else:
+                    pending.append((after_id, len(items), _Scored(score_texts(items))))
+            if not pending:
+                break
+
+            position, size, future = pending.popleft()
+            updated, chunk_products = apply_scores(session, future.result(), checkpoint, position)
+            affected |= chunk_products
+            stats["chunks"] += 1
+            stats["reviews_rescored"] += updated
+            stats["reviews_skipped"] += size - updated
+            logger.info(f"Re-scored {stats['reviews_rescored']} reviews (checkpoint at review {position})")
+            if progress is not None:
+                progress(stats["reviews_rescored"], None)
+            if pause:
+                time.sleep(pause)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if limit is None:
+        checkpoint.completed_at = datetime.utcnow()
+        session.commit()
+    if affected:
+        refresh_snapshot(session)
+
+    stats["products_affected"] = len(affected)
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"Re-scoring finished. Stats: {stats}")
+    return stats
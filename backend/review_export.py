@@ -0,0 +1,220 @@
+"""
+Streaming Review Export
+
+Streams reviews (with sentiment) and per-product aggregates out of the
+database in fixed-size chunks and writes them as Parquet or Arrow IPC, so
+offline analytics never load the production tables wholesale. Rows are read
+with yield_per (a server-side cursor on PostgreSQL) and converted to Arrow
+record batches one chunk at a time, keeping memory constant regardless of
+table size.
+
+Used by export_reviews.py (files) and /api/export/<table> (Arrow IPC stream).
+Requires pyarrow (pip install pyarrow).
+"""
+
+import logging
+from datetime import datetime, time
+
+from sqlalchemy import Text, cast, func, select
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+# Rows per database fetch and per Arrow record batch
+CHUNK_SIZE = 10000
+
+EXPORT_TABLES = ("reviews", "products")
+EXPORT_FORMATS = ("parquet", "arrow")
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Exporting requires pyarrow. Install it with: pip install pyarrow")
+
+
+def review_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("review_id", pa.int64()),
+        ("product_id", pa.int32()),
+        ("asin", pa.string()),
+        ("author", pa.string()),
+        ("text", pa.string()),
+        ("rating", pa.float32()),
+        ("date", pa.timestamp("s")),
+        ("sentiment_score", pa.float32()),
+        ("sentiment_class", pa.string()),
+        ("sentiment_keywords", pa.string()),
+    ])
+
+
+def product_schema():
+    require_pyarrow()
+    return pa.schema([
+        ("product_id", pa.int32()),
+        ("asin", pa.string()),
+        ("name", pa.string()),
+        ("category", pa.string()),
+        ("price", pa.float64()),
+        ("positive_score", pa.float64()),
+        ("neutral_score", pa.float64()),
+        ("negative_score", pa.float64()),
+        ("review_count", pa.int64()),
+        ("mean_rating", pa.float64()),
+        ("mean_sentiment", pa.float64()),
+        ("first_review_date", pa.timestamp("s")),
+        ("last_review_date", pa.timestamp("s")),
+    ])
+
+
+def parse_date_filter(value, end=False):
+    """Datetime for a YYYY-MM-DD (or ISO datetime) filter value; None passes through"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) <= 10:
+        # A plain end date includes the whole day
+        parsed = datetime.combine(parsed.date(), time.max)
+    return parsed
+
+
+def _review_filters(start_date=None, end_date=None, product_ids=None):
+    from models import Review
+
+    filters = []
+    if start_date is not None:
+        filters.append(Review.date >= start_date)
+    if end_date is not None:
+        filters.append(Review.date <= end_date)
+    if product_ids:
+        filters.append(Review.product_id.in_(product_ids))
+    return filters
+
+
+def _batches(session, query, schema, chunk_size):
+    """Arrow record batches from a query, one database chunk at a time"""
+    result = session.execute(query.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+def review_batches(session, start_date=None, end_date=None, product_ids=None, chunk_size=CHUNK_SIZE):
+    """Record batches of reviews matching the filters, in review ID order"""
+    from models import Product, Review
+
+    query = (
+        select(
+            Review.id, Review.product_id, Product.asin, Review.author, Review.text, Review.rating,
+            Review.date, Review.sentiment_score, Review.sentiment_class,
+            # Exported as the stored JSON text, without parsing it
+            cast(Review.sentiment_keywords, Text),
+        )
+        .join(Product, Product.id == Review.product_id)
+        .where(*_review_filters(start_date, end_date, product_ids))
+        .order_by(Review.id)
+    )
+    return _batches(session, query, review_schema(), chunk_size)
+
+
+def product_batches(session, start_date=None, end_date=None, product_ids=None, chunk_size=CHUNK_SIZE):
+    """Record batches of products with aggregates over their reviews matching the filters"""
+    from models import Product, Review
+
+    aggregates = (
+        select(
+            Review.product_id,
+            func.count(Review.id).label("review_count"),
+            func.avg(Review.rating).label("mean_rating"),
+            func.avg(Review.sentiment_score).label("mean_sentiment"),
+            func.min(Review.date).label("first_review_date"),
+            func.max(Review.date).label("last_review_date"),
+        )
+        .where(*_review_filters(start_date, end_date, product_ids))
+        .group_by(Review.product_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Product.id, Product.asin, Product.name, Product.category, Product.price,
+            Product.positive_score, Product.neutral_score, Product.negative_score,
+            func.coalesce(aggregates.c.review_count, 0),
+            aggregates.c.mean_rating, aggregates.c.mean_sentiment,
+            aggregates.c.first_review_date, aggregates.c.last_review_date,
+        )
+        .outerjoin(aggregates, aggregates.c.product_id == Product.id)
+        .order_by(Product.id)
+    )
+    if product_ids:
+        query = query.where(Product.id.in_(product_ids))
+    return _batches(session, query, product_schema(), chunk_size)
+
+
+TABLES = {
+    "reviews": (review_batches, review_schema),
+    "products": (product_batches, product_schema),
+}
+
+
+def export_table(session, table, path, file_format="parquet", **filters):
+    """Write one table to a Parquet or Arrow IPC file, returning the number of rows written"""
+    batch_func, schema_func = TABLES[table]
+    schema = schema_func()
+    rows = 0
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    try:
+        for batch in batch_func(session, **filters):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    logger.info(f"Exported {rows} {table} rows to {path}")
+    return rows
+
+
+class _ChunkSink:
+    """Minimal writable file collecting bytes between reads"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_stream(session, table, **filters):
+    """Generator of Arrow IPC stream bytes for a table, one record batch at a time"""
+    batch_func, schema_func = TABLES[table]
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema_func())
+    yield sink.take()
+    for batch in batch_func(session, **filters):
+        writer.write_batch(batch)
+        yield sink.take()
+    writer.close()
+    yield sink.take()
@@ -0,0 +1,246 @@
+"""
+Columnar Review Snapshot
+
+A compact, read-only copy of review metadata (no text) for aggregate
+computations, held as NumPy arrays sorted by product:
+
+- product_id        int32    one entry per review
+- sentiment_score   float32  NaN when missing
+- sentiment_class   uint8    see CLASS_CODES
+- rating            float32  NaN when missing
+- date              int64    seconds since the epoch, NO_DATE when missing
+
+plus `products` (int32, distinct product IDs) and `offsets` (int64), so the
+reviews of products[i] are rows offsets[i]:offsets[i + 1].
+
+A snapshot is loaded with a single query, or saved as one .npy file per column
+and memory-mapped back, so several worker processes share the same pages.
+
+A saved snapshot directory holds one subdirectory per version and a CURRENT
+file naming the latest one. A version is written completely under a temporary
+name, renamed into place, and then published by replacing CURRENT, so a
+reader never sees columns of two versions or a partly written meta.json.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import timezone
+
+import numpy as np
+from sqlalchemy import select, update
+
+logger = logging.getLogger(__name__)
+
+CLASS_CODES = {"negative": 0, "neutral": 1, "positive": 2}
+CLASS_NAMES = ("negative", "neutral", "positive")
+UNKNOWN_CLASS = 3
+NO_DATE = np.iinfo(np.int64).min
+
+COLUMNS = {
+    "product_id": np.int32,
+    "sentiment_score": np.float32,
+    "sentiment_class": np.uint8,
+    "rating": np.float32,
+    "date": np.int64,
+}
+
+# Rows fetched per round trip when loading from the database
+FETCH_SIZE = 50000
+
+# Saved versions kept besides the current one, for readers still opening them
+KEEP_VERSIONS = 1
+
+CURRENT_FILE = "CURRENT"
+
+REVIEW_SNAPSHOT_PATH = os.environ.get("REVIEW_SNAPSHOT_PATH")
+
+
+def _epoch_seconds(value):
+    if value is None:
+        return NO_DATE
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+class ReviewSnapshot:
+    """Columnar review metadata sorted by product ID"""
+
+    def __init__(self, columns):
+        self.product_id = columns["product_id"]
+        self.sentiment_score = columns["sentiment_score"]
+        self.sentiment_class = columns["sentiment_class"]
+        self.rating = columns["rating"]
+        self.date = columns["date"]
+        self.products, self.offsets = self._build_index(self.product_id)
+        self.created_at = time.time()
+
+    @staticmethod
+    def _build_index(product_id):
+        if len(product_id) == 0:
+            return np.empty(0, dtype=np.int32), np.zeros(1, dtype=np.int64)
+        starts = np.flatnonzero(np.diff(product_id)) + 1
+        products = product_id[np.concatenate(([0], starts))]
+        offsets = np.concatenate(([0], starts, [len(product_id)])).astype(np.int64)
+        return products, offsets
+
+    def __len__(self):
+        return len(self.product_id)
+
+    @classmethod
+    def from_database(cls, session, product_ids=None):
+        """Load review metadata for all reviews (or those of product_ids) with one query"""
+        from models import Review
+
+        query = select(
+            Review.product_id, Review.sentiment_score, Review.sentiment_class, Review.rating, Review.date
+        ).order_by(Review.product_id, Review.id)
+        if product_ids is not None:
+            query = query.where(Review.product_id.in_(product_ids))
+        result = session.execute(query.execution_options(yield_per=FETCH_SIZE))
+
+        chunks = {name: [] for name in COLUMNS}
+        for rows in result.partitions():
+            product_ids, scores, classes, ratings, dates = zip(*rows)
+            chunks["product_id"].append(np.array(product_ids, dtype=np.int32))
+            chunks["sentiment_score"].append(np.array(
+                [np.nan if s is None else s for s in scores], dtype=np.float32))
+            chunks["sentiment_class"].append(np.array(
+                [CLASS_CODES.get(c, UNKNOWN_CLASS) for c in classes], dtype=np.uint8))
+            chunks["rating"].append(np.array(
+                [np.nan if r is None else r for r in ratings], dtype=np.float32))
+            chunks["date"].append(np.array([_epoch_seconds(d) for d in dates], dtype=np.int64))
+
+        columns = {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=COLUMNS[name])
+            for name, parts in chunks.items()
+        }
+        return cls(columns)
+
+    def save(self, path):
+        """Write the snapshot as a new version in the directory at path and make it current"""
+        os.makedirs(path, exist_ok=True)
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        tmp_dir = os.path.join(path, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            for name in COLUMNS:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+            _write_atomically(os.path.join(tmp_dir, "meta.json"),
+                              json.dumps({"reviews": len(self), "created_at": self.created_at}))
+            os.rename(tmp_dir, os.path.join(path, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        _write_atomically(os.path.join(path, CURRENT_FILE), version)
+        _remove_old_versions(path, version)
+
+    @classmethod
+    def open(cls, path, mmap=True):
+        """Load the current saved version, memory-mapping the columns by default"""
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            version = f.read().strip()
+        version_dir = os.path.join(path, version)
+        mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode=mode) for name in COLUMNS}
+        snapshot = cls(columns)
+        snapshot.version = version
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            snapshot.created_at = json.load(f)["created_at"]
+        return snapshot
+
+    def rows_for(self, product_id):
+        """Row slice holding the reviews of a product"""
+        i = np.searchsorted(self.products, product_id)
+        if i == len(self.products) or self.products[i] != product_id:
+            return slice(0, 0)
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def class_counts(self):
+        """(num_products, 4) array of negative/neutral/positive/unknown counts per product"""
+        group = np.repeat(np.arange(len(self.products)), np.diff(self.offsets))
+        counts = np.bincount(group * 4 + self.sentiment_class, minlength=len(self.products) * 4)
+        return counts.reshape(len(self.products), 4)
+
+    def sentiment_counts(self, product_id):
+        """Review counts by sentiment class for one product"""
+        counts = np.bincount(self.sentiment_class[self.rows_for(product_id)], minlength=4)
+        return {name: int(counts[code]) for name, code in CLASS_CODES.items()}
+
+    def sentiment_distribution(self):
+        """Share of positive, neutral and negative reviews for every product with reviews
+
+        Returns a dict of product ID -> (positive, neutral, negative)
+        """
+        counts = self.class_counts()
+        totals = np.diff(self.offsets).astype(np.float64)
+        shares = counts[:, :3] / totals[:, None]
+        return {
+            int(pid): (float(share[2]), float(share[1]), float(share[0]))
+            for pid, share in zip(self.products, shares)
+        }
+
+    def product_stats(self):
+        """Per-product review count, mean sentiment score and mean rating (NaN when none)"""
+        return {
+            "products": self.products,
+            "review_count": np.diff(self.offsets),
+            "mean_sentiment": self._group_nanmean(self.sentiment_score),
+            "mean_rating": self._group_nanmean(self.rating),
+        }
+
+    def _group_nanmean(self, values):
+        if len(values) == 0:
+            return np.empty(0, dtype=np.float64)
+        starts = self.offsets[:-1]
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0).astype(np.float64), starts)
+        valid_counts = np.add.reduceat(valid.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / valid_counts
+
+
+def _write_atomically(path, text):
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _remove_old_versions(path, current):
+    versions = sorted(
+        (name for name in os.listdir(path) if name.startswith("v") and name != current),
+        key=lambda name: int(name[1:].split("-")[0]),
+    )
+    for name in versions[:max(len(versions) - KEEP_VERSIONS, 0)]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def apply_sentiment_distribution(session, snapshot):
+    """Bulk-update the cached product sentiment scores from a snapshot (not committed)
+
+    Products without reviews in the snapshot keep their current scores.
+    Returns the number of products updated.
+    """
+    from models import Product
+
+    updates = [
+        {"id": product_id, "positive_score": positive, "neutral_score": neutral, "negative_score": negative}
+        for product_id, (positive, neutral, negative) in snapshot.sentiment_distribution().items()
+    ]
+    if updates:
+        session.execute(update(Product), updates)
+    return len(updates)
+
+
+def refresh_snapshot(session):
+    """Rebuild the snapshot from the database, writing it to REVIEW_SNAPSHOT_PATH if set"""
+    snapshot = ReviewSnapshot.from_database(session)
+    if REVIEW_SNAPSHOT_PATH:
+        snapshot.save(REVIEW_SNAPSHOT_PATH)
+        logger.info(f"Wrote review snapshot of {len(snapshot)} reviews to {REVIEW_SNAPSHOT_PATH}")
+    return snapshot
@@ -0,0 +1,200 @@
+"""
+Additive Schema Upgrades
+
+db.create_all() creates missing tables but never alters existing ones. Columns
+added to existing models are listed here and added (with their indexes) to
+databases created before them. Upgrades are additive and idempotent.
+
+At startup, check_schema() only adds missing columns, which is a quick change
+to the table definition, so queries of the models don't fail. Indexes,
+backfills and column conversions read or rewrite whole tables and are run by
+upgrade_schema() from init_db.py; startup logs a warning while any are pending.
+
+Products get the canonical category of their category name when
+product.category_id is added (see backend/categories.py).
+
+Columns that hold JSON in TEXT are converted to native JSON columns once
+(JSONB on PostgreSQL), after clearing values that are not valid JSON.
+"""
+
+import json
+import logging
+
+from sqlalchemy import JSON, inspect, text
+
+logger = logging.getLogger(__name__)
+
+# (table, column, column DDL, index name or None), in the order they were introduced
+ADDED_COLUMNS = [
+    ("review", "analyzer_version", "INTEGER", "ix_review_analyzer_version"),
+    ("job_checkpoint", "state", "TEXT", None),
+    ("review", "dedupe_key", "VARCHAR(40)", None),
+    ("product", "category_id", "INTEGER REFERENCES category(id)", "ix_product_category_id"),
+]
+
+# (table, column) of columns changed from TEXT holding JSON to a native JSON type
+JSON_COLUMNS = [
+    ("review", "sentiment_keywords"),
+]
+
+# Rows read and updated per round trip when backfilling
+BACKFILL_BATCH_SIZE = 5000
+
+
+def add_missing_columns(engine):
+    """Add the columns in ADDED_COLUMNS that are missing, without their indexes, returning the columns added"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table, column, ddl, _ in ADDED_COLUMNS:
+            if table not in tables:
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column in existing:
+                continue
+            conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+            added.append(f"{table}.{column}")
+            logger.info(f"Added column {table}.{column}")
+    return added
+
+
+def pending_upgrades(engine):
+    """Descriptions of the upgrades upgrade_schema() would still make, from the schema alone"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    pending = []
+    indexes = {table: {i["name"] for i in inspector.get_indexes(table)} for table in tables}
+    for table, column, _, index in ADDED_COLUMNS:
+        if table not in tables:
+            continue
+        if column not in {c["name"] for c in inspector.get_columns(table)}:
+            pending.append(f"add column {table}.{column}")
+        elif index and index not in indexes[table]:
+            pending.append(f"create index {index}")
+    if "review" in tables and "uq_review_dedupe" not in indexes["review"]:
+        pending.append("backfill review dedupe keys")
+    for table, column in JSON_COLUMNS:
+        if table in tables and not isinstance(_column_type(inspector, table, column), JSON):
+            pending.append(f"convert {table}.{column} to JSON")
+    return pending
+
+
+def check_schema(engine):
+    """Add missing columns and warn about the slower upgrades still pending, returning them"""
+    add_missing_columns(engine)
+    pending = pending_upgrades(engine)
+    if pending:
+        logger.warning(f"Database schema upgrades pending ({'; '.join(pending)}). Run python init_db.py")
+    return pending
+
+
+def upgrade_schema(engine):
+    """Add missing columns and indexes, run the backfills and convert JSON_COLUMNS, returning the columns added"""
+    added = add_missing_columns(engine)
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    created = []
+    with engine.begin() as conn:
+        for table, column, _, index in ADDED_COLUMNS:
+            if table in tables and index and index not in {i["name"] for i in inspector.get_indexes(table)}:
+                conn.execute(text(f'CREATE INDEX IF NOT EXISTS {index} ON "{table}" ({column})'))
+                created.append(index)
+                logger.info(f"Created index {index}")
+
+    if "review" in tables and "uq_review_dedupe" not in {i["name"] for i in inspector.get_indexes("review")}:
+        backfill_review_dedupe_keys(engine)
+        with engine.begin() as conn:
+            conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS uq_review_dedupe ON review (product_id, dedupe_key)'))
+        logger.info("Created unique index uq_review_dedupe")
+
+    # The index is created with the backfill, so it marks a column added at startup as not backfilled yet
+    if "ix_product_category_id" in created:
+        backfill_product_categories(engine)
+
+    for table, column in JSON_COLUMNS:
+        if table in tables and not isinstance(_column_type(inspector, table, column), JSON):
+            convert_json_column(engine, table, column)
+    return added
+
+
+def _column_type(inspector, table, column):
+    for info in inspector.get_columns(table):
+        if info["name"] == column:
+            return info["type"]
+    return None
+
+
+def _is_json(value):
+    try:
+        json.loads(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def convert_json_column(engine, table, column):
+    """
+    Convert a TEXT column holding JSON to a native JSON column, returning how
+    many values were cleared because they were not valid JSON
+    """
+    with engine.connect() as conn:
+        rows = conn.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(text(
+            f'SELECT id, {column} FROM "{table}" WHERE {column} IS NOT NULL'))
+        invalid = [{"id": row_id} for row_id, value in rows if not _is_json(value)]
+
+    with engine.begin() as conn:
+        for i in range(0, len(invalid), BACKFILL_BATCH_SIZE):
+            conn.execute(text(f'UPDATE "{table}" SET {column} = NULL WHERE id = :id'),
+                         invalid[i:i + BACKFILL_BATCH_SIZE])
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb'))
+        else:
+            # SQLite stores JSON as text either way; only the declared type changes
+            conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column}_json JSON'))
+            conn.execute(text(f'UPDATE "{table}" SET {column}_json = {column}'))
+            conn.execute(text(f'ALTER TABLE "{table}" DROP COLUMN {column}'))
+            conn.execute(text(f'ALTER TABLE "{table}" RENAME COLUMN {column}_json TO {column}'))
+    logger.info(f"Converted {table}.{column} to JSON ({len(invalid)} invalid values cleared)")
+    return len(invalid)
+
+
+def backfill_review_dedupe_keys(engine):
+    """
+    Set dedupe_key on reviews that have none, returning how many were set
+
+    Only the oldest of several identical reviews of a product gets the key, so
+    the unique index can be created over existing duplicates.
+    """
+    from backend.text_normalization import review_dedupe_key
+
+    with engine.connect() as conn:
+        seen = set(conn.execute(text(
+            "SELECT product_id, dedupe_key FROM review WHERE dedupe_key IS NOT NULL")).all())
+        rows = conn.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(text(
+            "SELECT id, product_id, author, text FROM review WHERE dedupe_key IS NULL ORDER BY id"))
+        updates = []
+        for review_id, product_id, author, review_text in rows:
+            key = review_dedupe_key(author, review_text)
+            if (product_id, key) in seen:
+                continue
+            seen.add((product_id, key))
+            updates.append({"id": review_id, "key": key})
+
+    with engine.begin() as conn:
+        for i in range(0, len(updates), BACKFILL_BATCH_SIZE):
+            conn.execute(text("UPDATE review SET dedupe_key = :key WHERE id = :id"),
+                         updates[i:i + BACKFILL_BATCH_SIZE])
+    logger.info(f"Backfilled dedupe keys for {len(updates)} reviews")
+    return len(updates)
+
+
+def backfill_product_categories(engine):
+    """Create the canonical categories of existing products and set their category_id"""
+    from sqlalchemy.orm import Session
+
+    from backend.categories import assign_product_categories
+
+    with Session(engine) as session:
+        return assign_product_categories(session)
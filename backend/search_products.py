@@ -1,5 +1,6 @@
 import logging
 from models import Product
+from backend.categories import category_filter
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,8 @@ def search_products(query=None, category=None, min_sentiment=None, max_sentiment
             )
         
         if category:
-            product_query = product_query.filter(Product.category == category)
+            # The category and its subcategories, by indexed category ID
+            product_query = product_query.filter(category_filter(product_query.session, category))
         
         if min_sentiment is not None:
             # For min sentiment, we want products with positive + (neutral * 0.5) >= min_sentiment
@@ -1,8 +1,9 @@
 import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import logging
-import re
 import os
+from backend.text_normalization import preprocess_text
+from backend.metrics import timed
 
 # Set NLTK data path to current directory to ensure write permissions
 nltk_data_dir = os.path.join(os.getcwd(), 'nltk_data')
@@ -21,46 +22,89 @@ except LookupError:
 # Initialize the sentiment analyzer
 sia = SentimentIntensityAnalyzer()
 
-def preprocess_text(text):
-    """
-    Preprocess text for sentiment analysis
-    - Convert to lowercase
-    - Remove special characters
-    """
-    if not text:
-        return ""
-    
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove extra spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    
-    # Remove HTML tags
-    text = re.sub(r'<.*?>', '', text)
-    
-    return text.strip()
+# Optionally score with the optimized in-project VADER implementation, which
+# produces identical scores to NLTK's analyzer (see backend/vader_scorer.py)
+USE_FAST_VADER = os.environ.get("USE_FAST_VADER", "false").lower() in ("1", "true", "yes")
+fast_sia = None
+if USE_FAST_VADER:
+    from backend.vader_scorer import FastSentimentIntensityAnalyzer
+    fast_sia = FastSentimentIntensityAnalyzer(lexicon=sia.lexicon)
+
+# Version of the scoring pipeline stored with each review's scores. Bump it whenever
+# preprocess_text, the lexicon, the scorer or the classify_sentiment thresholds change;
+# rescore_reviews.py then re-scores only reviews with an older version.
+ANALYZER_VERSION = 1
+
+# Common Amazon review sentiment keywords (extended for better coverage)
+POSITIVE_KEYWORDS = {
+    # Product quality
+    "quality": ["high quality", "well made", "durable", "sturdy", "solid", "premium"],
+
+    # Performance
+    "performance": ["fast", "smooth", "efficient", "effective", "powerful", "responsive"],
+
+    # Value
+    "value": ["worth", "value", "bargain", "affordable", "reasonable price"],
+
+    # User experience
+    "experience": ["easy to use", "user friendly", "intuitive", "convenient", "comfortable"],
+
+    # Satisfaction
+    "satisfaction": ["love", "perfect", "excellent", "amazing", "awesome", "great", "fantastic",
+                     "outstanding", "happy", "satisfied", "impressed", "recommend"]
+}
+
+NEGATIVE_KEYWORDS = {
+    # Product quality
+    "quality": ["poor quality", "cheaply made", "flimsy", "fragile", "broke", "low quality"],
+
+    # Performance
+    "performance": ["slow", "sluggish", "lags", "underperforms", "weak", "unresponsive"],
+
+    # Value
+    "value": ["overpriced", "expensive", "not worth", "waste of money", "pricey"],
+
+    # User experience
+    "experience": ["difficult to use", "complicated", "confusing", "inconvenient", "uncomfortable"],
 
-def analyze_sentiment(text):
+    # Dissatisfaction
+    "dissatisfaction": ["disappointed", "frustrating", "terrible", "horrible", "awful", "bad",
+                        "poor", "worst", "hate", "annoying", "regret", "avoid", "return"]
+}
+
+# Common marketing claim patterns
+MARKETING_PHRASES = [
+    "best", "perfect", "ultimate", "revolutionary", "game-changing",
+    "innovative", "premium", "high-quality", "top-rated", "professional",
+    "durable", "long-lasting", "easy to use", "maintenance-free", "efficient",
+    "highest rated", "best-selling", "unmatched", "incomparable", "superior",
+    "advanced", "state-of-the-art", "cutting-edge", "next-generation",
+    "breakthrough", "world-class", "top-of-the-line", "industry-leading",
+    "reliable", "exceptional", "outstanding", "excellent"
+]
+
+@timed("analyze_sentiment")
+def analyze_sentiment(text, preprocessed=False):
     """
     Analyze sentiment of text using NLTK's VADER
     Returns a score between 0 and 1, where:
     - 0-0.3: Negative
     - 0.3-0.5: Neutral
     - 0.5-1.0: Positive
+
+    Pass preprocessed=True when text is already in analysis form
+    (e.g. from backend.text_normalization.normalize_text)
     """
     try:
         # Preprocess text
-        cleaned_text = preprocess_text(text)
+        cleaned_text = text if preprocessed else preprocess_text(text)
         
         if not cleaned_text:
             return 0.5  # Neutral score for empty text
         
         # Get sentiment scores
-        sentiment_scores = sia.polarity_scores(cleaned_text)
+        scorer = fast_sia if fast_sia is not None else sia
+        sentiment_scores = scorer.polarity_scores(cleaned_text)
         
         # Convert the compound score from [-1, 1] to [0, 1]
         normalized_score = (sentiment_scores['compound'] + 1) / 2
@@ -81,6 +125,7 @@ def classify_sentiment(score):
     else:
         return "negative"
 
+@timed("get_sentiment_keywords")
 def get_sentiment_keywords(text, sentiment_class):
     """
     Identify keywords contributing to sentiment - Amazon review style analysis
@@ -88,50 +133,13 @@ def get_sentiment_keywords(text, sentiment_class):
     # Improved keyword extraction based on Amazon review analysis patterns
     words = text.lower().split()
     
-    # Common Amazon review sentiment keywords (extended for better coverage)
-    positive_keywords = {
-        # Product quality
-        "quality": ["high quality", "well made", "durable", "sturdy", "solid", "premium"],
-        
-        # Performance
-        "performance": ["fast", "smooth", "efficient", "effective", "powerful", "responsive"],
-        
-        # Value
-        "value": ["worth", "value", "bargain", "affordable", "reasonable price"],
-        
-        # User experience
-        "experience": ["easy to use", "user friendly", "intuitive", "convenient", "comfortable"],
-        
-        # Satisfaction
-        "satisfaction": ["love", "perfect", "excellent", "amazing", "awesome", "great", "fantastic", 
-                         "outstanding", "happy", "satisfied", "impressed", "recommend"]
-    }
-    
-    negative_keywords = {
-        # Product quality
-        "quality": ["poor quality", "cheaply made", "flimsy", "fragile", "broke", "low quality"],
-        
-        # Performance
-        "performance": ["slow", "sluggish", "lags", "underperforms", "weak", "unresponsive"],
-        
-        # Value
-        "value": ["overpriced", "expensive", "not worth", "waste of money", "pricey"],
-        
-        # User experience
-        "experience": ["difficult to use", "complicated", "confusing", "inconvenient", "uncomfortable"],
-        
-        # Dissatisfaction
-        "dissatisfaction": ["disappointed", "frustrating", "terrible", "horrible", "awful", "bad", 
-                            "poor", "worst", "hate", "annoying", "regret", "avoid", "return"]
-    }
-    
     # Extract phrases, not just individual words
     text_lower = text.lower()
     
     extracted_keywords = []
     
     if sentiment_class == "positive":
-        for category, keywords in positive_keywords.items():
+        for category, keywords in POSITIVE_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in text_lower:
                     # Find the context (5 words around the keyword)
@@ -147,7 +155,7 @@ def get_sentiment_keywords(text, sentiment_class):
                         extracted_keywords.append({"keyword": keyword, "category": category})
     
     elif sentiment_class == "negative":
-        for category, keywords in negative_keywords.items():
+        for category, keywords in NEGATIVE_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in text_lower:
                     # Find the context (5 words around the keyword)
@@ -172,6 +180,7 @@ def get_sentiment_keywords(text, sentiment_class):
     
     return unique_keywords
 
+@timed("analyze_hype_vs_reality")
 def analyze_hype_vs_reality(product_description, reviews):
     """
     Compare marketing claims in product description against actual user experiences
@@ -184,22 +193,11 @@ def analyze_hype_vs_reality(product_description, reviews):
             "marketing_claims": []
         }
     
-    # Common marketing claim patterns
-    marketing_phrases = [
-        "best", "perfect", "ultimate", "revolutionary", "game-changing",
-        "innovative", "premium", "high-quality", "top-rated", "professional",
-        "durable", "long-lasting", "easy to use", "maintenance-free", "efficient",
-        "highest rated", "best-selling", "unmatched", "incomparable", "superior",
-        "advanced", "state-of-the-art", "cutting-edge", "next-generation",
-        "breakthrough", "world-class", "top-of-the-line", "industry-leading",
-        "reliable", "exceptional", "outstanding", "excellent"
-    ]
-    
     # Extract marketing claims from product description
     description_lower = product_description.lower()
     marketing_claims = []
     
-    for phrase in marketing_phrases:
+    for phrase in MARKETING_PHRASES:
         if phrase in description_lower:
             # Find the context (10 words around the marketing phrase)
             words = description_lower.split()
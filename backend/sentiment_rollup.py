@@ -0,0 +1,185 @@
+"""
+Sentiment Timeline Rollups
+
+Per-product, per-period (week or month) review counts by sentiment class and
+sentiment score sums, stored in ProductSentimentRollup. The sentiment timeline
+endpoint reads these rows instead of scanning a product's reviews.
+
+Rollups are maintained incrementally: whenever a review is added or its
+sentiment changes, record_review_change applies the difference in the same
+transaction, with INSERT ... ON CONFLICT DO UPDATE increments. rebuild_sentiment_rollups recomputes every row from the review
+snapshot (backfill, or repair after bulk edits outside these code paths).
+
+A review is counted when it has a date, a sentiment class and a sentiment score.
+"""
+
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import delete, insert
+
+from backend.review_store import CLASS_CODES, NO_DATE, ReviewSnapshot
+from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment
+from backend.upsert import insert_or_increment
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_BUCKETS = ("week", "month")
+
+CLASS_COLUMNS = {
+    "positive": "positive_count",
+    "neutral": "neutral_count",
+    "negative": "negative_count",
+}
+
+EPOCH = date(1970, 1, 1)
+
+# Rows inserted per statement when rebuilding
+INSERT_BATCH_SIZE = 5000
+
+
+def period_start(value, bucket):
+    """First day of the week (Monday) or month containing a date or datetime"""
+    day = value.date() if hasattr(value, "date") else value
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown timeline bucket: {bucket}")
+
+
+def _counted(review_date, score, sentiment_class):
+    return review_date is not None and score is not None and sentiment_class in CLASS_COLUMNS
+
+
+def record_review_change(session, product_id, review_date, old=None, new=None):
+    """
+    Apply a review's sentiment change to its rollups
+
+    Args:
+        session: Session to update the rollups in (not committed)
+        product_id: The review's product
+        review_date: The review's date
+        old: (sentiment_score, sentiment_class) before the change, None for a new review
+        new: (sentiment_score, sentiment_class) after the change, None for a deleted review
+    """
+    from models import ProductSentimentRollup
+
+    deltas = []
+    if old is not None and _counted(review_date, *old):
+        deltas.append((old[1], -1, -old[0]))
+    if new is not None and _counted(review_date, *new):
+        deltas.append((new[1], 1, new[0]))
+    if not deltas:
+        return
+
+    # Applied as increments in one statement, so concurrent writers (imports,
+    # re-scoring) never overwrite each other's counts
+    rows = []
+    for bucket in TIMELINE_BUCKETS:
+        row = {"product_id": product_id, "bucket": bucket, "period_start": period_start(review_date, bucket),
+               "positive_count": 0, "neutral_count": 0, "negative_count": 0, "score_sum": 0.0}
+        for sentiment_class, count, score in deltas:
+            row[CLASS_COLUMNS[sentiment_class]] += count
+            row["score_sum"] += score
+        rows.append(row)
+    insert_or_increment(session, ProductSentimentRollup, rows, ["product_id", "bucket", "period_start"],
+                        [*CLASS_COLUMNS.values(), "score_sum"])
+
+
+def _period_days(days, bucket):
+    """Period start (days since the epoch) for an array of days since the epoch"""
+    if bucket == "week":
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+        return days - (days + 3) % 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]")
+    return months.astype("datetime64[D]").astype(np.int64)
+
+
+def rebuild_sentiment_rollups(session):
+    """Recompute all rollups from the review snapshot, returning the number of rows written"""
+    from models import ProductSentimentRollup
+
+    snapshot = ReviewSnapshot.from_database(session)
+    counted = (
+        (snapshot.date != NO_DATE)
+        & (snapshot.sentiment_class < len(CLASS_CODES))
+        & ~np.isnan(snapshot.sentiment_score)
+    )
+    product_ids = snapshot.product_id[counted].astype(np.int64)
+    classes = snapshot.sentiment_class[counted].astype(np.int64)
+    scores = snapshot.sentiment_score[counted].astype(np.float64)
+    days = snapshot.date[counted] // 86400
+
+    session.execute(delete(ProductSentimentRollup))
+    rows = []
+    for bucket in TIMELINE_BUCKETS:
+        periods = _period_days(days, bucket)
+        keys = np.stack([product_ids, periods], axis=1)
+        unique_keys, group = np.unique(keys, axis=0, return_inverse=True)
+        group = group.reshape(-1)
+        counts = np.bincount(group * 3 + classes, minlength=len(unique_keys) * 3).reshape(-1, 3)
+        score_sums = np.bincount(group, weights=scores, minlength=len(unique_keys))
+
+        for (product_id, period), class_counts, score_sum in zip(unique_keys, counts, score_sums):
+            rows.append({
+                "product_id": int(product_id),
+                "bucket": bucket,
+                "period_start": EPOCH + timedelta(days=int(period)),
+                "negative_count": int(class_counts[CLASS_CODES["negative"]]),
+                "neutral_count": int(class_counts[CLASS_CODES["neutral"]]),
+                "positive_count": int(class_counts[CLASS_CODES["positive"]]),
+                "score_sum": float(score_sum),
+            })
+
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        session.execute(insert(ProductSentimentRollup), rows[i:i + INSERT_BATCH_SIZE])
+    session.commit()
+    logger.info(f"Rebuilt {len(rows)} sentiment rollup rows")
+    return len(rows)
+
+
+def timeline_entry(period, positive, neutral, negative, score_sum):
+    total = positive + neutral + negative
+    return {
+        "period": period.isoformat(),
+        "positive": positive,
+        "neutral": neutral,
+        "negative": negative,
+        "total": total,
+        "mean_score": round(score_sum / total, 4) if total else None,
+    }
+
+
+def get_sentiment_timeline(product_id, bucket):
+    """Sentiment timeline of a product from its rollups, oldest period first"""
+    from models import ProductSentimentRollup
+
+    rollups = ProductSentimentRollup.query.filter_by(
+        product_id=product_id, bucket=bucket
+    ).order_by(ProductSentimentRollup.period_start).all()
+    return [
+        timeline_entry(r.period_start, r.positive_count, r.neutral_count, r.negative_count, r.score_sum)
+        for r in rollups
+        if r.positive_count + r.neutral_count + r.negative_count > 0
+    ]
+
+
+def timeline_from_reviews(reviews, bucket):
+    """Sentiment timeline computed directly from review dicts (sample data fallback)"""
+    periods = {}
+    for review in reviews:
+        if not review.get("date"):
+            continue
+        score = review.get("sentiment")
+        if score is None:
+            score = analyze_sentiment(review["text"])
+        start = period_start(date.fromisoformat(review["date"][:10]), bucket)
+        entry = periods.setdefault(start, {"positive": 0, "neutral": 0, "negative": 0, "score_sum": 0.0})
+        entry[classify_sentiment(score)] += 1
+        entry["score_sum"] += score
+    return [
+        timeline_entry(start, e["positive"], e["neutral"], e["negative"], e["score_sum"])
+        for start, e in sorted(periods.items())
+    ]
@@ -0,0 +1,76 @@
+"""
+Single-Flight Request Coalescing
+
+When many requests for the same hot product arrive at once, each of them would
+recompute the same detail or recommendations. A SingleFlight group lets only
+the first caller for a key (the leader) run the computation; callers arriving
+while it is in flight wait for it and get the same result, or the same
+exception. Nothing is kept once the computation finishes, so this is not a
+cache. Put it behind any cache, so only cache misses are coalesced.
+
+Coalescing is per process, across the threads of a worker. Results are shared
+between requests, so they must be plain data that callers don't modify (not
+ORM objects bound to the leader's session). Set SINGLE_FLIGHT=0 to disable it.
+"""
+
+import os
+import threading
+
+from backend.metrics import registry
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT", "1") != "0"
+
+
+class _Call:
+    """One in-flight computation"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-safe group of in-flight computations keyed by request"""
+
+    def __init__(self, name, enabled=SINGLE_FLIGHT_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Return func(*args, **kwargs), sharing the result with concurrent calls for the same key"""
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            registry.inc("single_flight_requests_total", {"group": self.name, "result": "coalesced"})
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        registry.inc("single_flight_requests_total", {"group": self.name, "result": "leader"})
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later callers start a new computation instead of reusing this one
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,153 @@
+"""
+Precompressed Static Assets
+
+The frontend files (frontend/public) are read once at startup into an
+in-memory manifest, so serving one needs no filesystem access:
+
+- Text assets are compressed ahead of time with gzip (and brotli when
+  installed) at the maximum levels; each request gets the best variant the
+  client accepts.
+- Every asset is also served under a content-hashed name (demo.3f2a9c1b.js)
+  with `Cache-Control: public, max-age=31536000, immutable`. HTML files are
+  rewritten to reference the hashed names.
+- Unhashed paths (index.html and anything linked from outside) are served with
+  `Cache-Control: no-cache` and an ETag, so browsers revalidate them with a
+  cheap 304.
+
+Unknown paths fall back to index.html for client-side routing. In debug mode
+the manifest is rebuilt when a file changes.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, request
+
+from backend.compression import available_encodings, compress, negotiate_encoding
+
+# Hex digits of the content hash in hashed file names
+HASH_LENGTH = 8
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_MIMETYPES = {"application/javascript", "text/javascript", "application/json",
+                          "application/manifest+json", "image/svg+xml"}
+# Keep a compressed variant only if it saves at least this fraction of the size
+MIN_COMPRESSION_SAVING = 0.1
+MAX_LEVELS = {"br": 11, "gzip": 9}
+
+
+def _is_compressible(mimetype):
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def hashed_name(path, digest):
+    """demo.js -> demo.<digest>.js"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+class StaticAsset:
+    """One file's content, precompressed variants and validators"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.variants = {"identity": data}
+        if _is_compressible(self.mimetype):
+            for encoding in available_encodings():
+                compressed = compress(data, encoding, MAX_LEVELS[encoding])
+                if len(compressed) <= len(data) * (1 - MIN_COMPRESSION_SAVING):
+                    self.variants[encoding] = compressed
+
+    def etag(self, encoding):
+        # Strong ETags must differ between encodings of the same content
+        tag = self.digest[:2 * HASH_LENGTH]
+        return tag if encoding == "identity" else f"{tag}-{encoding}"
+
+    def response(self, immutable):
+        """Response with the best variant for the current request"""
+        encodings = [encoding for encoding in self.variants if encoding != "identity"]
+        encoding = negotiate_encoding(request.accept_encodings, encodings) or "identity"
+
+        response = Response(self.variants[encoding], mimetype=self.mimetype)
+        response.set_etag(self.etag(encoding))
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        if encodings:
+            response.vary.add("Accept-Encoding")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        return response.make_conditional(request)
+
+
+class StaticManifest:
+    """In-memory index of a static directory: request path -> (asset, immutable)"""
+
+    def __init__(self, root, fallback="index.html"):
+        self.root = root
+        self.fallback = fallback
+        self.entries = {}
+        self.hashed_names = {}
+        self._signature = None
+        self.build()
+
+    def _scan(self):
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                full_path = os.path.join(directory, name)
+                stat = os.stat(full_path)
+                files.append((os.path.relpath(full_path, self.root).replace(os.sep, "/"),
+                              stat.st_mtime_ns, stat.st_size))
+        return sorted(files)
+
+    def build(self):
+        """Read, hash and compress every file under the root"""
+        files = self._scan()
+        contents = {}
+        for path, _, _ in files:
+            with open(os.path.join(self.root, path), "rb") as f:
+                contents[path] = f.read()
+
+        # Hash the non-HTML assets first, so HTML can reference their hashed names
+        assets = {path: StaticAsset(path, data) for path, data in contents.items() if not path.endswith(".html")}
+        hashed_names = {path: hashed_name(path, asset.digest) for path, asset in assets.items()}
+        for path, data in contents.items():
+            if path.endswith(".html"):
+                assets[path] = StaticAsset(path, self._rewrite_references(data, hashed_names))
+
+        entries = {}
+        for path, asset in assets.items():
+            entries[path] = (asset, False)
+            if path in hashed_names:
+                entries[hashed_names[path]] = (asset, True)
+        self.entries = entries
+        self.hashed_names = hashed_names
+        self._signature = files
+
+    @staticmethod
+    def _rewrite_references(html, hashed_names):
+        """Point src/href attributes at the hashed names of local assets"""
+        if not hashed_names:
+            return html
+        pattern = re.compile(
+            rb'((?:src|href)=["\'])(/?)(' + b"|".join(re.escape(p.encode()) for p in hashed_names) + rb')(["\'])')
+        return pattern.sub(
+            lambda m: m.group(1) + m.group(2) + hashed_names[m.group(3).decode()].encode() + m.group(4), html)
+
+    def reload_if_changed(self):
+        """Rebuild the manifest if files were added, removed or modified"""
+        if self._scan() != self._signature:
+            self.build()
+
+    def response(self, path):
+        """Response for a request path, falling back to index.html; None if neither exists"""
+        entry = self.entries.get(path) or self.entries.get(self.fallback)
+        if entry is None:
+            return None
+        asset, immutable = entry
+        return asset.response(immutable)
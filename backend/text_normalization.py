@@ -0,0 +1,115 @@
+"""
+Shared Text Normalization
+
+Single source for cleaning review and product text before it is stored, and for
+preprocessing it before sentiment analysis. All patterns are compiled once and
+character-level fixes are done with a single str.translate table.
+
+Two forms are produced:
+1. Stored form - HTML entities decoded, tags removed, control characters,
+   BOM and non-breaking spaces dropped, whitespace collapsed
+2. Analysis form - stored form lowercased with URLs removed, as fed to VADER
+"""
+
+import hashlib
+import html
+import re
+
+# Tags and any surrounding whitespace collapse into a single space
+_TAG_OR_WHITESPACE_RE = re.compile(r'(?:<[^>]+>|\s)+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_ANALYSIS_TAG_RE = re.compile(r'<.*?>')
+_URL_OR_TAG_RE = re.compile(r'https?://\S+|www\.\S+|<.*?>')
+
+# Control characters become spaces, BOM is removed, NBSP becomes a space
+_CHAR_TABLE = {i: ' ' for i in range(32)}
+_CHAR_TABLE[0xfeff] = None
+_CHAR_TABLE[0xa0] = ' '
+_CHAR_TABLE = str.maketrans(_CHAR_TABLE)
+
+# Joins the author and text hashed into a review's dedupe key
+DEDUPE_SEPARATOR = "\x1f"
+
+
+def _as_text(text):
+    """Coerce a raw field value to str, returning "" for empty or unconvertible values"""
+    if not text:
+        return ""
+    if not isinstance(text, str):
+        try:
+            text = str(text)
+        except Exception:
+            return ""
+    return text
+
+
+def clean_text(text):
+    """Clean text data from common issues in Amazon reviews datasets (stored form)"""
+    text = _as_text(text)
+    if not text:
+        return ""
+
+    # Decode HTML entities
+    if '&' in text:
+        text = html.unescape(text)
+
+    # Drop control characters, BOM and non-breaking spaces
+    text = text.translate(_CHAR_TABLE)
+
+    # Remove HTML tags and collapse whitespace in one pass
+    text = _TAG_OR_WHITESPACE_RE.sub(' ', text).strip()
+
+    # Replace escaped quotes
+    if '\\"' in text:
+        text = text.replace('\\"', '"')
+
+    return text
+
+
+def preprocess_text(text):
+    """
+    Preprocess text for sentiment analysis (analysis form)
+    - Convert to lowercase
+    - Remove URLs and HTML tags
+    """
+    if not text:
+        return ""
+
+    text = _WHITESPACE_RE.sub(' ', text.lower())
+    text = _URL_RE.sub('', text)
+    text = _ANALYSIS_TAG_RE.sub('', text)
+    return text.strip()
+
+
+def normalize_text(text):
+    """
+    Clean and preprocess text in one pass
+
+    Args:
+        text: Raw field value from a dataset or the database
+
+    Returns:
+        Tuple of (stored form, analysis form)
+    """
+    stored = clean_text(text)
+    if not stored:
+        return "", ""
+
+    # Whitespace is already collapsed and tags with content are gone, so a
+    # single substitution over the lowercased text gives the analysis form
+    return stored, _URL_OR_TAG_RE.sub('', stored.lower()).strip()
+
+
+def review_dedupe_key(author, text):
+    """
+    Identity of a review within its product: a hash of the stored forms of its
+    author and text. Stored forms are stable under re-cleaning, so normalizing
+    a review's text in place does not change its key.
+    """
+    return dedupe_hash(f"{clean_text(author)}{DEDUPE_SEPARATOR}{clean_text(text)}")
+
+
+def dedupe_hash(identity):
+    """Hex digest stored as a review's dedupe_key"""
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()
@@ -0,0 +1,88 @@
+"""
+Dialect-aware Inserts That Skip or Update Existing Rows
+
+INSERT ... ON CONFLICT DO NOTHING for PostgreSQL and SQLite (3.24+), so bulk
+writers can insert rows that may already exist in one statement, instead of
+checking each row first or catching IntegrityError after a failed commit.
+
+INSERT ... ON CONFLICT DO UPDATE adding to counter columns, so concurrent
+writers can apply increments without reading the row first and overwriting
+each other's changes.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _dialect_insert(session, model):
+    dialect = session.get_bind(model).dialect.name
+    insert_func = DIALECT_INSERTS.get(dialect)
+    if insert_func is None:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+    return insert_func(model)
+
+
+def insert_ignoring_conflicts(session, model, rows, conflict_columns, returning=()):
+    """
+    Insert rows, skipping those that conflict with an existing row
+
+    Args:
+        session: Database session (not committed)
+        model: Mapped class to insert into
+        rows: List of column dicts
+        conflict_columns: Columns of the unique index that identifies existing rows
+        returning: Columns to return for the rows actually inserted
+
+    Returns:
+        List of returned rows (empty when returning is empty)
+    """
+    if not rows:
+        return []
+    statement = _dialect_insert(session, model).on_conflict_do_nothing(index_elements=conflict_columns)
+    if returning:
+        return session.execute(statement.returning(*returning), rows).all()
+    session.execute(statement, rows)
+    return []
+
+
+def insert_or_increment(session, model, rows, conflict_columns, increment_columns, fill_columns=()):
+    """
+    Insert rows, adding their increment columns to those of the existing row
+    where one conflicts
+
+    Rows with the same conflict key are summed first, as PostgreSQL can't
+    update one row twice in a statement.
+
+    Args:
+        session: Database session (not committed)
+        model: Mapped class to insert into
+        rows: List of column dicts, each with every conflict and increment column
+        conflict_columns: Columns of the unique index that identifies existing rows
+        increment_columns: Columns added to the existing row's values on a conflict
+        fill_columns: Columns set from the row only where the existing row's are NULL
+    """
+    merged = {}
+    for row in rows:
+        key = tuple(row[column] for column in conflict_columns)
+        if key in merged:
+            for column in increment_columns:
+                merged[key][column] += row[column]
+            for column in fill_columns:
+                if merged[key][column] is None:
+                    merged[key][column] = row[column]
+        else:
+            merged[key] = dict(row)
+    if not merged:
+        return
+
+    statement = _dialect_insert(session, model)
+    table = model.__table__
+    updates = {column: table.c[column] + statement.excluded[column] for column in increment_columns}
+    updates.update({column: func.coalesce(table.c[column], statement.excluded[column]) for column in fill_columns})
+    statement = statement.on_conflict_do_update(index_elements=conflict_columns, set_=updates)
+    session.execute(statement, list(merged.values()))
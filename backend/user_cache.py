@@ -0,0 +1,97 @@
+"""
+Cached User Loader
+
+Flask-Login calls the user loader on every authenticated request. This cache
+keeps a snapshot of each user's columns for USER_CACHE_TTL seconds so those
+requests don't query the user table. A cache hit is turned back into a User
+attached to the request's session without emitting SQL.
+
+Entries are dropped on logout and whenever a User row is updated or deleted
+through the ORM. The cache is per process, so another gunicorn worker may
+serve a changed user for at most USER_CACHE_TTL seconds. Set USER_CACHE_TTL=0
+to disable it.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from backend.metrics import registry
+
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+
+
+class UserCache:
+    """Thread-safe TTL cache of user column values keyed by user ID"""
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_size=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, user_id):
+        """Cached column values for the user, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return values
+
+    def set(self, user_id, values):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size and user_id not in self._entries:
+                # Evict the entry closest to expiry
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def load_cached_user(db, user_model, user_id):
+    """Return the user for Flask-Login, from the cache when possible"""
+    values = user_cache.get(user_id)
+    if values is not None:
+        registry.inc("user_cache_requests_total", {"result": "hit"})
+        user = user_model(**values)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    registry.inc("user_cache_requests_total", {"result": "miss"})
+    user = db.session.get(user_model, user_id)
+    if user is not None:
+        user_cache.set(user_id, {
+            attr.key: getattr(user, attr.key) for attr in inspect(user_model).column_attrs
+        })
+    return user
+
+
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+
+def register_invalidation(user_model):
+    """Drop cached entries whenever a user is updated or deleted"""
+    if not event.contains(user_model, "after_update", _invalidate_user):
+        event.listen(user_model, "after_update", _invalidate_user)
+        event.listen(user_model, "after_delete", _invalidate_user)
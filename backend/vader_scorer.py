@@ -0,0 +1,312 @@
+"""
+Optimized VADER Sentiment Scorer
+
+Drop-in replacement for NLTK's SentimentIntensityAnalyzer.polarity_scores that
+produces identical results on the bundled vader_lexicon, but avoids most of the
+per-call work NLTK does:
+1. Punctuation stripping is resolved per token instead of building the full
+   punctuation x word lookup dictionary for every text
+2. Per-token attributes (lowercase form, lexicon valence, booster value,
+   negation, ALL CAPS) are computed once and cached across calls
+3. Repeated tokens reuse the valence of their first occurrence, which is what
+   NLTK computes for them anyway
+"""
+
+import logging
+import math
+import string
+import sys
+
+import nltk
+from nltk.sentiment.vader import VaderConstants
+
+logger = logging.getLogger(__name__)
+
+VADER_LEXICON_FILE = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+# Precompiled tables taken from NLTK so both scorers always share constants
+_C = VaderConstants
+B_INCR = _C.B_INCR
+B_DECR = _C.B_DECR
+C_INCR = _C.C_INCR
+N_SCALAR = _C.N_SCALAR
+NEGATE = frozenset(_C.NEGATE)
+BOOSTER_DICT = dict(_C.BOOSTER_DICT)
+PUNCTUATION = frozenset(string.punctuation)
+PUNC_SET = frozenset(_C.PUNC_LIST)
+
+# Multi-word idioms and boosters are matched as token tuples. Tokens never
+# contain whitespace, so this is equivalent to NLTK's joined-string lookup.
+SPECIAL_CASE_IDIOMS = {tuple(k.split()): v for k, v in _C.SPECIAL_CASE_IDIOMS.items()}
+BOOSTER_BIGRAMS = frozenset(tuple(k.split()) for k in BOOSTER_DICT if " " in k)
+IDIOM_TOKENS = frozenset(w for k in SPECIAL_CASE_IDIOMS for w in k)
+BOOSTER_BIGRAM_TOKENS = frozenset(w for k in BOOSTER_BIGRAMS for w in k)
+SO_THIS = ("so", "this")
+
+# Token info tuple layout
+_TOKEN, _LOWER, _VALENCE, _UPPER, _NEGATED, _BOOSTER = range(6)
+
+
+def load_vader_lexicon(lexicon_file=VADER_LEXICON_FILE):
+    """
+    Load the VADER lexicon the same way NLTK does
+
+    Args:
+        lexicon_file: NLTK resource path of the lexicon
+
+    Returns:
+        Dictionary mapping token to valence
+    """
+    lex_dict = {}
+    for line in nltk.data.load(lexicon_file).split("\n"):
+        (word, measure) = line.strip().split("\t")[0:2]
+        lex_dict[word] = float(measure)
+    return lex_dict
+
+
+def _strip_punctuation(word):
+    """
+    Strip a single leading or trailing punctuation run, following NLTK's
+    SentiText._words_plus_punc mapping rules
+    """
+    if word[0] in PUNCTUATION:
+        if word[-1] in PUNCTUATION:
+            return word
+        k = 1
+        while word[k] in PUNCTUATION:
+            k += 1
+        stripped = word[k:]
+        if word[:k] in PUNC_SET and len(stripped) > 1 and PUNCTUATION.isdisjoint(stripped):
+            return stripped
+    elif word[-1] in PUNCTUATION:
+        k = len(word) - 1
+        while word[k - 1] in PUNCTUATION:
+            k -= 1
+        stripped = word[:k]
+        if word[k:] in PUNC_SET and len(stripped) > 1 and PUNCTUATION.isdisjoint(stripped):
+            return stripped
+    return word
+
+
+class FastSentimentIntensityAnalyzer:
+    """
+    VADER sentiment scorer with precompiled tables and token-level caching
+    """
+
+    def __init__(self, lexicon=None, cache_size=100000):
+        self.lexicon = lexicon if lexicon is not None else load_vader_lexicon()
+        self.cache_size = cache_size
+        self._token_cache = {}
+
+    def _token_info(self, raw_token):
+        """Return the cached attribute tuple for a raw whitespace-split token"""
+        info = self._token_cache.get(raw_token)
+        if info is None:
+            token = sys.intern(_strip_punctuation(raw_token))
+            lower = token.lower()
+            info = (
+                token,
+                lower,
+                self.lexicon.get(lower),
+                token.isupper(),
+                lower in NEGATE or "n't" in lower,
+                BOOSTER_DICT.get(lower),
+            )
+            if len(self._token_cache) >= self.cache_size:
+                self._token_cache.clear()
+            self._token_cache[sys.intern(raw_token)] = info
+        return info
+
+    def polarity_scores(self, text):
+        """
+        Return VADER neg/neu/pos/compound scores for the text, identical to
+        nltk's SentimentIntensityAnalyzer.polarity_scores
+        """
+        if not isinstance(text, str):
+            text = str(text.encode("utf-8"))
+
+        token_info = self._token_info
+        infos = [token_info(w) for w in text.split() if len(w) > 1]
+        tokens = [info[_TOKEN] for info in infos]
+        n = len(tokens)
+
+        allcap_words = sum(1 for info in infos if info[_UPPER])
+        is_cap_diff = 0 < n - allcap_words < n
+
+        sentiments = []
+        first_index = {}
+        for idx, info in enumerate(infos):
+            # NLTK scores every occurrence of a token at its first position
+            i = first_index.setdefault(info[_TOKEN], idx)
+            if i != idx:
+                sentiments.append(sentiments[i])
+                continue
+            lower = info[_LOWER]
+            if (
+                i < n - 1 and lower == "kind" and infos[i + 1][_LOWER] == "of"
+            ) or info[_BOOSTER] is not None:
+                sentiments.append(0)
+                continue
+            if info[_VALENCE] is None:
+                sentiments.append(0)
+                continue
+            sentiments.append(self._sentiment_valence(infos, tokens, i, is_cap_diff))
+
+        lowers = [info[_LOWER] for info in infos]
+        if "but" in lowers:
+            bi = lowers.index("but")
+            for sidx, sentiment in enumerate(sentiments):
+                if sidx < bi:
+                    sentiments[sidx] = sentiment * 0.5
+                elif sidx > bi:
+                    sentiments[sidx] = sentiment * 1.5
+
+        return self._score_valence(sentiments, text)
+
+    def _sentiment_valence(self, infos, tokens, i, is_cap_diff):
+        """Valence of the lexicon token at position i after all modifiers"""
+        info = infos[i]
+        valence = info[_VALENCE]
+
+        # check if sentiment laden word is in ALL CAPS (while others aren't)
+        if info[_UPPER] and is_cap_diff:
+            if valence > 0:
+                valence += C_INCR
+            else:
+                valence -= C_INCR
+
+        for start_i in range(0, 3):
+            if i <= start_i:
+                break
+            prev = infos[i - (start_i + 1)]
+            if prev[_VALENCE] is not None:
+                continue
+
+            # booster/dampener scalar of the preceding word
+            s = 0.0
+            if prev[_BOOSTER] is not None:
+                s = prev[_BOOSTER]
+                if valence < 0:
+                    s *= -1
+                if prev[_UPPER] and is_cap_diff:
+                    if valence > 0:
+                        s += C_INCR
+                    else:
+                        s -= C_INCR
+            if start_i == 1 and s != 0:
+                s = s * 0.95
+            if start_i == 2 and s != 0:
+                s = s * 0.9
+            valence = valence + s
+
+            # negation checks
+            if start_i == 0:
+                if prev[_NEGATED]:
+                    valence = valence * N_SCALAR
+            elif start_i == 1:
+                if tokens[i - 2] == "never" and tokens[i - 1] in SO_THIS:
+                    valence = valence * 1.5
+                elif prev[_NEGATED]:
+                    valence = valence * N_SCALAR
+            else:
+                if (
+                    tokens[i - 3] == "never" and tokens[i - 2] in SO_THIS
+                ) or tokens[i - 1] in SO_THIS:
+                    valence = valence * 1.25
+                elif prev[_NEGATED]:
+                    valence = valence * N_SCALAR
+                valence = self._idioms_check(valence, tokens, i)
+
+        # check for negation case using "least"
+        if i > 1 and infos[i - 1][_VALENCE] is None and infos[i - 1][_LOWER] == "least":
+            if infos[i - 2][_LOWER] != "at" and infos[i - 2][_LOWER] != "very":
+                valence = valence * N_SCALAR
+        elif i > 0 and infos[i - 1][_VALENCE] is None and infos[i - 1][_LOWER] == "least":
+            valence = valence * N_SCALAR
+
+        return valence
+
+    def _idioms_check(self, valence, tokens, i):
+        """Special case idioms and booster bi-grams (only called for i >= 3)"""
+        n = len(tokens)
+        window = tokens[i - 3:i + 3]
+        if not IDIOM_TOKENS.isdisjoint(window):
+            sequences = (
+                (tokens[i - 1], tokens[i]),
+                (tokens[i - 2], tokens[i - 1], tokens[i]),
+                (tokens[i - 2], tokens[i - 1]),
+                (tokens[i - 3], tokens[i - 2], tokens[i - 1]),
+                (tokens[i - 3], tokens[i - 2]),
+            )
+            for seq in sequences:
+                if seq in SPECIAL_CASE_IDIOMS:
+                    valence = SPECIAL_CASE_IDIOMS[seq]
+                    break
+            if n - 1 > i:
+                zeroone = (tokens[i], tokens[i + 1])
+                if zeroone in SPECIAL_CASE_IDIOMS:
+                    valence = SPECIAL_CASE_IDIOMS[zeroone]
+            if n - 1 > i + 1:
+                zeroonetwo = (tokens[i], tokens[i + 1], tokens[i + 2])
+                if zeroonetwo in SPECIAL_CASE_IDIOMS:
+                    valence = SPECIAL_CASE_IDIOMS[zeroonetwo]
+
+        if tokens[i - 2] in BOOSTER_BIGRAM_TOKENS and (
+            (tokens[i - 3], tokens[i - 2]) in BOOSTER_BIGRAMS
+            or (tokens[i - 2], tokens[i - 1]) in BOOSTER_BIGRAMS
+        ):
+            valence = valence + B_DECR
+        return valence
+
+    def _score_valence(self, sentiments, text):
+        """Combine token valences into the final neg/neu/pos/compound scores"""
+        if sentiments:
+            sum_s = float(sum(sentiments))
+
+            # add emphasis from exclamation points and question marks
+            ep_count = min(text.count("!"), 4)
+            qm_count = text.count("?")
+            qm_amplifier = 0
+            if qm_count > 1:
+                qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+            punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+            if sum_s > 0:
+                sum_s += punct_emph_amplifier
+            elif sum_s < 0:
+                sum_s -= punct_emph_amplifier
+
+            compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+            pos_sum = 0.0
+            neg_sum = 0.0
+            neu_count = 0
+            for sentiment_score in sentiments:
+                if sentiment_score > 0:
+                    pos_sum += float(sentiment_score) + 1
+                if sentiment_score < 0:
+                    neg_sum += float(sentiment_score) - 1
+                if sentiment_score == 0:
+                    neu_count += 1
+
+            if pos_sum > math.fabs(neg_sum):
+                pos_sum += punct_emph_amplifier
+            elif pos_sum < math.fabs(neg_sum):
+                neg_sum -= punct_emph_amplifier
+
+            total = pos_sum + math.fabs(neg_sum) + neu_count
+            pos = math.fabs(pos_sum / total)
+            neg = math.fabs(neg_sum / total)
+            neu = math.fabs(neu_count / total)
+        else:
+            compound = 0.0
+            pos = 0.0
+            neg = 0.0
+            neu = 0.0
+
+        return {
+            "neg": round(neg, 3),
+            "neu": round(neu, 3),
+            "pos": round(pos, 3),
+            "compound": round(compound, 4),
+        }
@@ -0,0 +1,99 @@
+"""
+Startup Cache Warming
+
+After a deploy every worker starts with an empty product cache, and the first
+visitors to popular products pay for the full detail, hype analysis and
+recommendation computation. warm_product_cache() computes those responses for
+the top WARMUP_PRODUCTS products before traffic arrives and stops once
+WARMUP_BUDGET seconds have passed. Products are picked by:
+
+- "traffic": the most viewed products recorded by running workers in the last
+  WARMUP_TRAFFIC_WINDOW seconds, topped up by positive_score
+- "score": the highest positive_score
+
+main.py runs it at startup when WARMUP_PRODUCTS > 0. Under `gunicorn
+--preload` that happens once in the master before it forks, and the workers
+inherit the warm cache. Database connections opened while warming are
+disposed of so workers don't share them. Without --preload each worker warms
+its own cache.
+"""
+
+import logging
+import os
+import time
+
+from backend.product_cache import product_cache, product_traffic
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PRODUCTS = int(os.environ.get("WARMUP_PRODUCTS", "0"))
+WARMUP_BUDGET = float(os.environ.get("WARMUP_BUDGET", "10"))
+WARMUP_SOURCE = os.environ.get("WARMUP_SOURCE", "traffic")
+WARMUP_TRAFFIC_WINDOW = float(os.environ.get("WARMUP_TRAFFIC_WINDOW", str(24 * 3600)))
+# Recommendations warmed per product, matching the endpoint's default limit
+WARMUP_RECOMMENDATION_LIMIT = 3
+
+
+def warmup_product_ids(db, limit, source=WARMUP_SOURCE):
+    """IDs of the products to warm, most important first"""
+    from models import Product
+
+    product_ids = product_traffic.top(limit, WARMUP_TRAFFIC_WINDOW) if source == "traffic" else []
+    if len(product_ids) < limit:
+        by_score = db.session.scalars(
+            db.select(Product.id).order_by(Product.positive_score.desc(), Product.id).limit(limit)).all()
+        seen = set(product_ids)
+        product_ids += [product_id for product_id in by_score if product_id not in seen]
+    return product_ids[:limit]
+
+
+def warm_product_cache(app, db, limit=WARMUP_PRODUCTS, budget=WARMUP_BUDGET, source=WARMUP_SOURCE):
+    """
+    Cache the detail and recommendations of the top products within a time budget
+
+    The budget is checked before each product, so warming can overrun it by
+    one product's computation. Returns a summary of what was warmed.
+    """
+    from backend.app import (
+        load_product_detail, load_recommendations, product_detail_flight, recommendations_flight
+    )
+
+    start = time.monotonic()
+    warmed, failed = 0, 0
+    with app.app_context():
+        try:
+            product_ids = warmup_product_ids(db, limit, source)
+            for product_id in product_ids:
+                if time.monotonic() - start >= budget:
+                    break
+                try:
+                    product_cache.get_or_compute(
+                        ("detail", product_id), product_detail_flight, load_product_detail, product_id)
+                    product_cache.get_or_compute(
+                        ("recommendations", product_id, WARMUP_RECOMMENDATION_LIMIT), recommendations_flight,
+                        load_recommendations, product_id, WARMUP_RECOMMENDATION_LIMIT)
+                    warmed += 1
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Could not warm product {product_id}: {str(e)}")
+                finally:
+                    # As after a request, so loaded objects don't pile up in the session
+                    db.session.remove()
+        except Exception as e:
+            product_ids = []
+            logger.error(f"Cache warm-up failed: {str(e)}")
+        finally:
+            db.session.remove()
+            # Connections must not be shared with workers forked after this
+            for engine in db.engines.values():
+                engine.dispose()
+
+    summary = {
+        "candidates": len(product_ids),
+        "warmed": warmed,
+        "failed": failed,
+        "seconds": round(time.monotonic() - start, 3),
+        "budget_exhausted": warmed + failed < len(product_ids),
+    }
+    logger.info(f"Warmed {warmed} of {len(product_ids)} products in {summary['seconds']}s")
+    return summary
@@ -0,0 +1,166 @@
+"""
+Admission Control Benchmark
+
+Runs the app in a threaded server and floods POST /api/analyze with long texts
+from many threads while a single client keeps requesting a cheap endpoint
+(/api/recommendations/top-rated by default). Reports, with admission control
+off and on:
+
+- latency of the cheap endpoint during the flood
+- status codes of the flood (200, 429 rate limited, 503 overloaded) and how
+  quickly rejections were returned
+
+Also reports the cost of one token bucket check for the memory and local
+(shared SQLite file) backends.
+
+Usage:
+    python benchmarks/bench_admission.py [--threads 32] [--seconds 5] [--text-kb 100]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark admission control under a flood of CPU-heavy requests')
+    parser.add_argument('--products', type=int, default=100, help='Number of products to seed')
+    parser.add_argument('--threads', type=int, default=32, help='Threads flooding /api/analyze')
+    parser.add_argument('--seconds', type=float, default=5, help='Duration of each flood')
+    parser.add_argument('--text-kb', type=int, default=100, help='Size of each analyzed text in KB')
+    parser.add_argument('--probe-path', type=str, default='/api/recommendations/top-rated',
+                        help='Cheap endpoint timed during the flood')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def request(url, data=None):
+    """(status, seconds) of one request"""
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def percentiles(durations):
+    if not durations:
+        return {}
+    ms = sorted(d * 1000 for d in durations)
+    return {
+        "count": len(ms),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(ms[int(len(ms) * 0.95) - 1 if len(ms) > 1 else 0], 2),
+        "max_ms": round(ms[-1], 2),
+    }
+
+
+def flood(base_url, args, body):
+    """Flood /api/analyze and probe the cheap endpoint until the time is up"""
+    stop = time.perf_counter() + args.seconds
+    lock = threading.Lock()
+    heavy = []
+
+    def heavy_client():
+        while time.perf_counter() < stop:
+            result = request(base_url + "/api/analyze", body)
+            with lock:
+                heavy.append(result)
+
+    threads = [threading.Thread(target=heavy_client) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    probes = []
+    while time.perf_counter() < stop:
+        status, seconds = request(base_url + args.probe_path)
+        if status == 200:
+            probes.append(seconds)
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+
+    statuses = Counter(status for status, _ in heavy)
+    return {
+        "probe": percentiles(probes),
+        "analyze_statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "analyze_completed_per_second": round(statuses[200] / args.seconds, 2),
+        "analyze_ok": percentiles([s for status, s in heavy if status == 200]),
+        "analyze_rejected": percentiles([s for status, s in heavy if status in (429, 503)]),
+    }
+
+
+def bucket_check_us(buckets, count=5000):
+    start = time.perf_counter()
+    for i in range(count):
+        buckets.take(f"analyze:ip:10.0.{i % 250}.{i % 7}", 1000.0, 1000)
+    return round((time.perf_counter() - start) / count * 1e6, 2)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_admission_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    from werkzeug.serving import make_server
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend import admission
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, 3)
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    sentence = "The battery life is great but the screen scratches far too easily. "
+    text = sentence * (args.text_kb * 1024 // len(sentence))
+    body = json.dumps({"text": text}).encode()
+
+    results = {"meta": {"threads": args.threads, "seconds": args.seconds, "text_kb": args.text_kb,
+                        "probe_path": args.probe_path, "policies": {
+                            name: vars(policy) for name, policy in admission.POLICIES.items()}}}
+    try:
+        for mode, enabled in (("off", False), ("on", True)):
+            app.config["ADMISSION_CONTROL"] = enabled
+            results[mode] = flood(base_url, args, body)
+    finally:
+        server.shutdown()
+
+    results["bucket_check_us"] = {
+        "memory": bucket_check_us(admission.MemoryTokenBuckets()),
+        "local": bucket_check_us(admission.LocalTokenBuckets(os.path.join(workdir, "admission"))),
+    }
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
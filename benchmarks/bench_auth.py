@@ -0,0 +1,139 @@
+"""
+Authenticated Request Overhead Benchmark
+
+Measures the per-request cost of an authenticated request (GET /api/auth/user)
+with the user loader cache disabled (the previous behaviour, one user query per
+request) and enabled, including the SQL queries issued per request.
+
+Also simulates a login storm: many threads verify passwords at once, and the
+benchmark reports how many completed and how many the bounded hashing pool
+rejected.
+
+Usage:
+    python benchmarks/bench_auth.py [--requests 2000] [--storm-threads 64]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark authenticated request overhead and login storms')
+    parser.add_argument('--requests', type=int, default=2000, help='Authenticated requests per mode')
+    parser.add_argument('--storm-threads', type=int, default=64, help='Concurrent password checks in the storm')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def time_authenticated_requests(client, engine, count):
+    """Latency and SQL queries per request for GET /api/auth/user"""
+    from sqlalchemy import event
+
+    queries = [0]
+
+    def count_query(*args):
+        queries[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    durations = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get("/api/auth/user")
+            durations.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET /api/auth/user returned {response.status_code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+
+    ms = sorted(d * 1000 for d in durations)
+    return {
+        "requests": count,
+        "mean_ms": round(statistics.mean(ms), 4),
+        "p50_ms": round(ms[len(ms) // 2], 4),
+        "p99_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+        "sql_queries_per_request": round(queries[0] / count, 3),
+    }
+
+
+def login_storm(password_hash, threads):
+    """Verify a password from many threads at once"""
+    from backend.password_hashing import PasswordHashingBusy, verify_password
+
+    outcomes = {"verified": 0, "rejected": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def attempt():
+        barrier.wait()
+        try:
+            verify_password(password_hash, "benchmark-password")
+            result = "verified"
+        except PasswordHashingBusy:
+            result = "rejected"
+        with lock:
+            outcomes[result] += 1
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=attempt) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {"threads": threads, **outcomes, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main():
+    args = parse_args()
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="bench_metrics_"))
+    logging.basicConfig(level=logging.ERROR)
+
+    from app import app, db
+    from backend import password_hashing
+    from backend.user_cache import user_cache
+    from models import User
+
+    client = app.test_client()
+    response = client.post("/api/auth/register", json={
+        "username": "benchmark", "email": "benchmark@example.com", "password": "benchmark-password",
+    })
+    if response.status_code != 201:
+        raise RuntimeError(f"Registration failed with {response.status_code}")
+
+    results = {"meta": {
+        "password_hash_workers": password_hashing.PASSWORD_HASH_WORKERS,
+        "password_hash_max_pending": password_hashing.PASSWORD_HASH_MAX_PENDING,
+    }}
+    with app.app_context():
+        engine = db.engine
+        password_hash = User.query.filter_by(username="benchmark").first().password_hash
+
+    ttl = user_cache.ttl
+    user_cache.ttl = 0
+    user_cache.clear()
+    results["uncached_user_loader"] = time_authenticated_requests(client, engine, args.requests)
+    user_cache.ttl = ttl or 30
+    results["cached_user_loader"] = time_authenticated_requests(client, engine, args.requests)
+    results["login_storm"] = login_storm(password_hash, args.storm_threads)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
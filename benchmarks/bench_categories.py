@@ -0,0 +1,164 @@
+"""
+Canonical Category Benchmark
+
+Reports:
+
+- parity: on a seeded catalog (no category hierarchy), recommendations scored
+  by category ID match those scored by category name
+- scoring: category points for every candidate of a base product, by name
+  (lowercase substring checks per pair) vs by ID (CategoryTaxonomy lookup),
+  over synthetic products spread across a generated category hierarchy
+- filters: GET /api/recommendations/top-rated?category=... latency and
+  query plan with the old Product.category equality (no index) vs the
+  category_id filter (indexed, category plus subcategories)
+
+Usage:
+    python benchmarks/bench_categories.py [--products 20000] [--categories 500]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark canonical category scoring and filters')
+    parser.add_argument('--products', type=int, default=20000, help='Products to seed and score')
+    parser.add_argument('--categories', type=int, default=500, help='Categories in the synthetic hierarchy')
+    parser.add_argument('--parity-products', type=int, default=50, help='Products checked for parity')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (the median is reported)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def synthetic_taxonomy(count):
+    """CategoryTaxonomy of departments, each with a chain of subcategories, and the rows it was built from"""
+    from backend.categories import CategoryTaxonomy, SIMILAR_CATEGORY_SCORE, category_key
+
+    rows, parent = [], None
+    for category_id in range(1, count + 1):
+        # A new department every 10 categories; the rest nest under the previous one
+        parent = None if category_id % 10 == 1 else parent
+        name = f"Department {category_id}" if parent is None else f"Section {category_id}"
+        rows.append((category_id, category_key(name), name, parent))
+        parent = category_id
+    parents = {category_id: parent_id for category_id, _, _, parent_id in rows}
+    similarities = []
+    for category_id in parents:
+        ancestor = parents[category_id]
+        while ancestor is not None:
+            similarities += [(category_id, ancestor, SIMILAR_CATEGORY_SCORE),
+                             (ancestor, category_id, SIMILAR_CATEGORY_SCORE)]
+            ancestor = parents[ancestor]
+    return CategoryTaxonomy(rows, similarities), rows
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_categories_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    os.environ["PRODUCT_CACHE_TTL"] = "0"
+    logging.basicConfig(level=logging.ERROR)
+
+    from sqlalchemy import text
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.categories import category_points, current_category_taxonomy
+    from backend.recommendations import (
+        features_from_reviews, positive_reviews_by_product, rank_recommendations
+    )
+    from models import Product
+
+    rng = random.Random(42)
+    results = {"meta": {"products": args.products, "categories": args.categories}}
+
+    # Scoring: the category step of rank_recommendations for one base product
+    taxonomy, rows = synthetic_taxonomy(args.categories)
+    products = []
+    for product_id in range(1, args.products + 1):
+        category_id, _, name, _ = rows[rng.randrange(len(rows))]
+        products.append(SimpleNamespace(id=product_id, category=name, category_id=category_id))
+    base = products[0]
+    by_name, by_id = category_points(base), category_points(base, taxonomy)
+    results["scoring"] = {
+        "by_name_ms": median_ms(lambda: [by_name(product) for product in products], args.repeat),
+        "by_id_ms": median_ms(lambda: [by_id(product) for product in products], args.repeat),
+    }
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, 1)
+
+        catalog = db.session.scalars(db.select(Product)).all()
+        reviews_by_product = positive_reviews_by_product()
+        features_by_id = {product.id: features_from_reviews(product.description,
+                                                            reviews_by_product.get(product.id, []))
+                          for product in catalog}
+        taxonomy = current_category_taxonomy(db.session)
+        mismatches = 0
+        for base in rng.sample(catalog, min(args.parity_products, len(catalog))):
+            candidates = [product for product in catalog if product.id != base.id]
+            expected = rank_recommendations(base, candidates, features_by_id[base.id], features_by_id, 5)
+            actual = rank_recommendations(base, candidates, features_by_id[base.id], features_by_id, 5,
+                                          taxonomy=taxonomy)
+            mismatches += [p.id for p in expected] != [p.id for p in actual]
+        results["parity"] = {"checked": min(args.parity_products, len(catalog)), "mismatches": mismatches}
+
+        category = catalog[0].category
+        category_id = taxonomy.id_for(category)
+        plans = {}
+        for label, condition in (("by_name", "category = :value"), ("by_id", "category_id = :value")):
+            value = category if label == "by_name" else category_id
+            plan = db.session.execute(text(
+                f"EXPLAIN QUERY PLAN SELECT * FROM product WHERE {condition} "
+                "ORDER BY positive_score DESC LIMIT 5"), {"value": value}).all()
+            plans[label] = [row[-1] for row in plan]
+
+            def query():
+                db.session.execute(text(
+                    f"SELECT * FROM product WHERE {condition} ORDER BY positive_score DESC LIMIT 5"),
+                    {"value": value}).all()
+
+            plans[f"{label}_query_ms"] = median_ms(query, args.repeat)
+        results["filters"] = plans
+
+    client = app.test_client()
+
+    def top_rated():
+        response = client.get(f'/api/recommendations/top-rated?category={category}')
+        if response.status_code != 200:
+            raise RuntimeError(f"top-rated returned {response.status_code}")
+
+    results["filters"]["top_rated_endpoint_ms"] = median_ms(top_rated, args.repeat)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
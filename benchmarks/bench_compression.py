@@ -0,0 +1,129 @@
+"""
+Compression and Static Asset Benchmark
+
+Reports response sizes and request times for:
+
+- GET /api/products with and without Accept-Encoding (gzip, and brotli when
+  installed), on a generated catalog
+- frontend files served the previous way (os.path.exists + send_from_directory
+  per request) vs from the in-memory StaticManifest, plus the 304 revalidation
+
+Usage:
+    python benchmarks/bench_compression.py [--products 500] [--requests 200]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+STATIC_DIR = os.path.join(ROOT_DIR, 'frontend', 'public')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark response compression and static asset serving')
+    parser.add_argument('--products', type=int, default=500, help='Number of products to seed')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per static asset measurement')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def median_ms(client, path, count, headers=None):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        response.get_data()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_compression_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    logging.basicConfig(level=logging.ERROR)
+
+    from flask import Flask, send_from_directory
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.compression import available_encodings, compress
+    from backend.static_assets import StaticManifest
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, 3)
+
+    results = {"meta": {"products": args.products, "requests": args.requests,
+                        "encodings": list(available_encodings())}}
+    client = app.test_client()
+    body = client.get('/api/products').get_data()
+    api = {}
+    for encoding in ("identity",) + available_encodings():
+        headers = {"Accept-Encoding": encoding}
+        response = client.get('/api/products', headers=headers)
+        api[encoding] = {
+            "bytes": len(response.get_data()),
+            "content_encoding": response.headers.get("Content-Encoding"),
+            "median_ms": median_ms(client, '/api/products', 10, headers),
+        }
+        if encoding != "identity":
+            start = time.perf_counter()
+            compress(body, encoding)
+            api[encoding]["compress_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    results["api_products"] = api
+
+    # Previous serving code, on a bare app so only the static path is measured
+    previous_app = Flask("previous")
+
+    @previous_app.route('/<path:path>')
+    def previous_serve(path):
+        if path != "" and os.path.exists(os.path.join(STATIC_DIR, path)):
+            return send_from_directory(STATIC_DIR, path)
+        return send_from_directory(STATIC_DIR, 'index.html')
+
+    manifest_app = Flask("manifest")
+    start = time.perf_counter()
+    manifest = StaticManifest(STATIC_DIR)
+    build_seconds = round(time.perf_counter() - start, 4)
+
+    @manifest_app.route('/<path:path>')
+    def manifest_serve(path):
+        return manifest.response(path)
+
+    previous_client, manifest_client = previous_app.test_client(), manifest_app.test_client()
+    gzip_headers = {"Accept-Encoding": "gzip, br"}
+    static = {"manifest_build_seconds": build_seconds}
+    for path in sorted(manifest.hashed_names):
+        hashed = manifest.hashed_names[path]
+        response = manifest_client.get('/' + hashed, headers=gzip_headers)
+        revalidate = {**gzip_headers, "If-None-Match": response.headers["ETag"]}
+        static[path] = {
+            "bytes": os.path.getsize(os.path.join(STATIC_DIR, path)),
+            "served_bytes": len(response.get_data()),
+            "content_encoding": response.headers.get("Content-Encoding"),
+            "previous_median_ms": median_ms(previous_client, '/' + path, args.requests, gzip_headers),
+            "manifest_median_ms": median_ms(manifest_client, '/' + hashed, args.requests, gzip_headers),
+            "revalidation_median_ms": median_ms(manifest_client, '/' + path, args.requests, revalidate),
+        }
+    results["static"] = static
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
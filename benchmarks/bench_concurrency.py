@@ -0,0 +1,221 @@
+"""
+Sync vs Async Serving Concurrency Benchmark
+
+Seeds a SQLite catalog, then starts the same read endpoints in both serving
+modes as real servers:
+- sync:  gunicorn with sync workers running the Flask app (app:app)
+- async: uvicorn running the ASGI app (backend.async_app:app)
+
+Both modes get the same number of worker processes. A raw asyncio HTTP/1.1
+client with keep-alive drives each server at 10/100/1000 concurrent clients
+and reports requests/sec and latency percentiles as JSON.
+
+Requires gunicorn, uvicorn and the async dependencies (see backend/async_app.py).
+
+Usage:
+    python benchmarks/bench_concurrency.py [--products 200] [--reviews-per-product 10]
+        [--concurrency 10 100 1000] [--duration 10] [--workers 2]
+        [--path /api/products/1] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+SERVERS = {
+    "sync": lambda port, workers: [
+        sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--worker-class", "sync", "--backlog", "2048",
+        "--log-level", "warning", "app:app",
+    ],
+    "async": lambda port, workers: [
+        sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--backlog", "2048", "--log-level", "warning",
+        "--no-access-log", "backend.async_app:app",
+    ],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare requests/sec of the sync and async serving modes')
+    parser.add_argument('--products', type=int, default=200, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=10, help='Reviews per seeded product')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Concurrent client counts to test')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+    parser.add_argument('--path', type=str, default='/api/products/1', help='Endpoint to request')
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVERS), default=["sync", "async"],
+                        help='Serving modes to benchmark')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def seed_database(args):
+    """Create and seed a SQLite file shared by both servers, returning the server environment"""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_concurrency_"), "catalog.db")
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "FLASK_CONFIG": "development",
+        "METRICS_DIR": tempfile.mkdtemp(prefix="bench_metrics_"),
+        "TQDM_DISABLE": "1",
+        "PYTHONPATH": ROOT_DIR,
+    })
+    os.environ.update(env)
+    logging.basicConfig(level=logging.ERROR)
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews_per_product)
+        db.engine.dispose()
+    return env
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port, path, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1.0) as sock:
+                sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+                if sock.recv(12).startswith(b"HTTP/1.1 200"):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response, returning (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client(port, request, deadline, latencies, errors):
+    """Issue requests over a keep-alive connection until the deadline"""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            errors["connection"] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors["status"] += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(port, path, concurrency, duration):
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n".encode()
+    latencies = []
+    errors = {"connection": 0, "status": 0}
+    start = time.monotonic()
+    deadline = start + duration
+    await asyncio.gather(*(client(port, request, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    result = {
+        "concurrency": concurrency,
+        "requests": len(ms),
+        "requests_per_sec": round(len(ms) / elapsed, 1),
+        "connection_errors": errors["connection"],
+        "non_200": errors["status"],
+    }
+    if ms:
+        result.update({
+            "mean_ms": round(statistics.mean(ms), 2),
+            "p50_ms": round(ms[len(ms) // 2], 2),
+            "p99_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 2),
+        })
+    return result
+
+
+def benchmark_mode(mode, args, env):
+    port = free_port()
+    server = subprocess.Popen(SERVERS[mode](port, args.workers), cwd=ROOT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(port, args.path)
+        return [asyncio.run(run_level(port, args.path, concurrency, args.duration))
+                for concurrency in args.concurrency]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    args = parse_args()
+    env = seed_database(args)
+
+    results = {
+        "meta": {
+            "path": args.path,
+            "workers": args.workers,
+            "duration_seconds": args.duration,
+            "products": args.products,
+            "reviews_per_product": args.reviews_per_product,
+        },
+        "results": {mode: benchmark_mode(mode, args, env) for mode in args.modes},
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Import Cleaning Benchmark
+
+Times the importer's record cleaning done per record (prepare_review: clean_text,
+clean_number and parse_date per field) against the column-wise DataFrame stage
+(prepare_reviews) on synthetic datasets in the shapes the importer reads:
+
+- datafiniti: Datafiniti CSV rows (string prices and ratings, ISO 8601 dates)
+- amazon: Amazon JSON objects (numeric ratings, "Month D, YYYY" dates)
+- mixed: records mixing field spellings, price formats and date formats
+
+Also checks that both produce identical records and stats.
+
+Usage:
+    python benchmarks/bench_import_cleaning.py [--count 100000] [--chunk-size 500]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logging
+
+from benchmarks.catalog import BASE_DATE, sample_review_texts
+from backend.import_cleaning import prepare_review, prepare_reviews
+
+NOISE = [" &amp; ", " <br/> ", "<b>", "</b>", "\xa0", "\t\n", " https://example.com/r?id=1 ", "&quot;", ""]
+PRICES = ["$1,299.99", "24.99", "USD 15", "€ 9,99", "", "free"]
+DATE_STYLES = {
+    "iso": lambda d: d.strftime("%Y-%m-%d"),
+    "us": lambda d: d.strftime("%m/%d/%Y"),
+    "long": lambda d: d.strftime("%B %d, %Y"),
+    "day_first": lambda d: d.strftime("%d %B %Y"),
+    "timestamp": lambda d: d.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark per-record vs column-wise import cleaning')
+    parser.add_argument('--count', type=int, default=100000, help='Records per dataset')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Records per column-wise chunk')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def generate_records(style, count, seed=11):
+    rng = random.Random(seed)
+    texts = sample_review_texts()
+    records = []
+    for i in range(count):
+        text = f"{rng.choice(texts)}{rng.choice(NOISE)}{rng.choice(texts)}"
+        day = BASE_DATE - timedelta(days=rng.randint(0, 2000))
+        if style == "datafiniti":
+            records.append({
+                "asins": f"B{i // 5:09d},B{i:09d}",
+                "name": f"Product &amp; Co {i // 5}",
+                "price": rng.choice(PRICES),
+                "categories": "Electronics,Audio",
+                "reviews.text": text,
+                "reviews.username": f"user{i}",
+                "reviews.rating": str(rng.randint(1, 5)),
+                "reviews.date": DATE_STYLES["timestamp"](day),
+            })
+        elif style == "amazon":
+            records.append({
+                "asin": f"b{i // 5:09d}",
+                "product_title": f"Product {i // 5}",
+                "reviewText": text,
+                "reviewerName": f"User {i}",
+                "overall": float(rng.randint(1, 5)),
+                "reviewTime": DATE_STYLES["long"](day),
+            })
+        else:
+            record = {
+                rng.choice(["asin", "asins", "product_id"]): f" B{i // 5:09d} ",
+                rng.choice(["name", "title"]): rng.choice([f"Item {i // 5}", ""]),
+                "description": rng.choice(["<p>Great</p>", None]),
+                "price": rng.choice(PRICES + [19.5, 0, None]),
+                rng.choice(["text", "review_text"]): rng.choice([text, "ok", ""]),
+                "rating": rng.choice(["4 stars", 5, 0, None, "", "9"]),
+                "date": rng.choice([DATE_STYLES[s](day) for s in DATE_STYLES] + ["not a date", None]),
+            }
+            if rng.random() < 0.01:
+                record["rating"] = True  # unexpected type, cleaned per record
+            records.append(record)
+    return records
+
+
+def per_record(records):
+    stats = {"errors": 0, "cleaned_data": 0}
+    prepared = []
+    for record in records:
+        try:
+            prepared.append(prepare_review(record, stats))
+        except Exception:
+            stats["errors"] += 1
+            prepared.append(None)
+    return prepared, stats
+
+
+def column_wise(records, chunk_size):
+    stats = {"errors": 0, "cleaned_data": 0}
+    prepared = []
+    for start in range(0, len(records), chunk_size):
+        prepared.extend(prepare_reviews(records[start:start + chunk_size], stats))
+    return prepared, stats
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    logging.disable(logging.WARNING)
+
+    results = {"meta": {"count": args.count, "chunk_size": args.chunk_size}}
+    for style in ("datafiniti", "amazon", "mixed"):
+        records = generate_records(style, args.count)
+        (expected, expected_stats), row_seconds = timed(per_record, records)
+        (actual, actual_stats), column_seconds = timed(column_wise, records, args.chunk_size)
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        results[style] = {
+            "per_record_seconds": round(row_seconds, 3),
+            "column_wise_seconds": round(column_seconds, 3),
+            "per_record_us_per_row": round(row_seconds / args.count * 1e6, 2),
+            "column_wise_us_per_row": round(column_seconds / args.count * 1e6, 2),
+            "speedup": round(row_seconds / column_seconds, 2),
+            "mismatches": mismatches,
+            "stats_match": expected_stats == actual_stats,
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
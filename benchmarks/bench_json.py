@@ -0,0 +1,120 @@
+"""
+JSON Serialization Benchmark
+
+Times the product detail endpoint's JSON work for one product with many
+reviews (10,000 by default):
+
+- keyword decoding: review.sentiment_keywords parsed with json.loads vs the
+  JSON column's deserializer (orjson when installed)
+- review loading: Review objects vs the rows of review_detail_query
+- response serialization: Flask's default provider vs ORJSONProvider, checking
+  both produce the same JSON
+- the whole GET /api/products/<id> request
+
+Usage:
+    python benchmarks/bench_json.py [--reviews 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark JSON parsing and serialization of a product detail')
+    parser.add_argument('--reviews', type=int, default=10000, help='Reviews of the benchmarked product')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (the median is reported)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def median_seconds(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times), 4)
+
+
+def compare(baseline, optimized):
+    return {"baseline_seconds": baseline, "optimized_seconds": optimized,
+            "speedup": round(baseline / optimized, 2) if optimized else None}
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_json_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    # Time the computation, not the product response cache
+    os.environ["PRODUCT_CACHE_TTL"] = "0"
+    logging.basicConfig(level=logging.ERROR)
+
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy import Text, cast, select
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.app import build_product_detail
+    from backend.json_serialization import ORJSONProvider, loads, orjson
+    from backend.product_data import get_product_by_id, review_detail_query
+    from models import Product, Review
+
+    results = {"meta": {"reviews": args.reviews, "repeat": args.repeat, "orjson": orjson is not None}}
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, 1, args.reviews)
+
+        raw_keywords = db.session.scalars(select(cast(Review.sentiment_keywords, Text))).all()
+        results["keyword_decoding"] = compare(
+            median_seconds(lambda: [json.loads(text) for text in raw_keywords], args.repeat),
+            median_seconds(lambda: [loads(text) for text in raw_keywords], args.repeat),
+        )
+
+        def load_objects():
+            db.session.expunge_all()
+            return db.session.get(Product, 1).reviews.all()
+
+        results["review_loading"] = compare(
+            median_seconds(load_objects, args.repeat),
+            median_seconds(lambda: db.session.execute(review_detail_query(1)).all(), args.repeat),
+        )
+
+        detail = build_product_detail(get_product_by_id(1))
+        default_provider, orjson_provider = DefaultJSONProvider(app), ORJSONProvider(app)
+        with app.test_request_context():
+            default_body = default_provider.response(detail).get_data()
+            orjson_body = orjson_provider.response(detail).get_data()
+            results["serialization"] = compare(
+                median_seconds(lambda: default_provider.response(detail).get_data(), args.repeat),
+                median_seconds(lambda: orjson_provider.response(detail).get_data(), args.repeat),
+            )
+        results["serialization"].update({
+            "identical_json": json.loads(default_body) == json.loads(orjson_body),
+            "default_bytes": len(default_body),
+            "orjson_bytes": len(orjson_body),
+        })
+
+    client = app.test_client()
+    client.get('/api/products/1')
+    results["endpoint_seconds"] = median_seconds(lambda: client.get('/api/products/1'), args.repeat)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Personalized Recommendations Benchmark
+
+On a generated catalog, reports:
+
+- scoring time for users with 1, 10 and 100 saved products: the vectorized
+  pass vs scoring every candidate against each saved product with
+  rank_recommendations, one Python loop per saved product
+- GET /api/recommendations/for-me latency: first request (builds the index),
+  after a save (cache miss, index reused) and cached, next to an uncached
+  GET /api/products/<id>/recommendations
+
+Usage:
+    python benchmarks/bench_personalization.py [--products 2000] [--reviews-per-product 10]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark personalized recommendations')
+    parser.add_argument('--products', type=int, default=2000, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=10, help='Reviews per product')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (the median is reported)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def loop_score(products_by_id, features_by_id, saved_ids):
+    """Score every candidate against each saved product with rank_recommendations (timing only)"""
+    from backend.recommendations import rank_recommendations
+
+    saved = set(saved_ids)
+    candidates = [product for pid, product in products_by_id.items() if pid not in saved]
+    for saved_id in saved_ids:
+        rank_recommendations(products_by_id[saved_id], candidates, features_by_id[saved_id],
+                             features_by_id, len(candidates))
+
+
+def timed_get(client, path):
+    start = time.perf_counter()
+    response = client.get(path)
+    elapsed = round((time.perf_counter() - start) * 1000, 3)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} returned {response.status_code}")
+    return elapsed
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_personalization_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    logging.basicConfig(level=logging.ERROR)
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.personalization import ProductFeatureIndex, current_feature_index, invalidate_feature_index
+    from backend.product_cache import product_cache
+    from backend.recommendations import features_from_reviews, positive_reviews_by_product
+    from models import Product
+
+    rng = random.Random(42)
+    results = {"meta": {"products": args.products, "reviews_per_product": args.reviews_per_product}}
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews_per_product)
+
+        start = time.perf_counter()
+        index = ProductFeatureIndex.from_database(db.session)
+        results["index_build_seconds"] = round(time.perf_counter() - start, 3)
+
+        product_ids = index.product_ids.tolist()
+        products_by_id = {product.id: product for product in db.session.scalars(db.select(Product))}
+        reviews_by_product = positive_reviews_by_product()
+        features_by_id = {pid: features_from_reviews(product.description, reviews_by_product.get(pid, []))
+                          for pid, product in products_by_id.items()}
+        scoring = {}
+        for saved_count in (1, 10, 100):
+            saved = rng.sample(product_ids, min(saved_count, len(product_ids) - 1))
+            repeat = args.repeat if saved_count <= 10 else 1
+            scoring[str(saved_count)] = {
+                "vectorized_ms": median_ms(lambda: index.recommend(saved, 5), args.repeat),
+                "loop_ms": median_ms(lambda: loop_score(products_by_id, features_by_id, saved), repeat),
+            }
+        results["scoring"] = scoring
+
+    client = app.test_client()
+    client.post('/api/auth/register', json={"username": "bench", "email": "bench@example.com",
+                                            "password": "bench-password"})
+    saved = rng.sample(product_ids, 10)
+    for product_id in saved[:-1]:
+        client.post(f'/api/products/{product_id}/save')
+
+    invalidate_feature_index()
+    product_cache.clear()
+    endpoint = {"first_ms": timed_get(client, '/api/recommendations/for-me')}
+    client.post(f'/api/products/{saved[-1]}/save')
+    endpoint["after_save_ms"] = timed_get(client, '/api/recommendations/for-me')
+    endpoint["cached_ms"] = median_ms(lambda: timed_get(client, '/api/recommendations/for-me'), args.repeat)
+
+    def uncached_product_recommendations():
+        product_cache.clear()
+        timed_get(client, f'/api/products/{saved[0]}/recommendations')
+
+    endpoint["product_recommendations_uncached_ms"] = median_ms(uncached_product_recommendations, args.repeat)
+    results["endpoint"] = endpoint
+    with app.app_context():
+        results["index_products"] = len(current_feature_index(db.session))
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Price Index and Candidate Generation Benchmark
+
+On a generated catalog, reports:
+
+- parity: get_recommendations_for_product (candidate generation) matches
+  rank_recommendations over every product with every product's features
+- recommendation latency: scoring every candidate (all positive reviews
+  loaded, features extracted for every product) vs candidate generation,
+  with the share of other products it loaded and the share it gave features
+- price band lookups: PriceIndex.within vs a scan over every product
+- refresh: an incremental refresh after re-pricing some products (as an
+  import would) vs a full rebuild, and whether both give the same index
+  (PRICE_INDEX_OVERLAP is 0 here, so only the re-priced products are read)
+
+Usage:
+    python benchmarks/bench_price_index.py [--products 2000] [--reviews-per-product 10]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the price index and recommendation candidate generation')
+    parser.add_argument('--products', type=int, default=2000, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=10, help='Reviews per product')
+    parser.add_argument('--sample', type=int, default=30, help='Base products checked and timed')
+    parser.add_argument('--repriced', type=int, default=100, help='Products re-priced before the refresh')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (the median is reported)')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_price_index_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    # Seeding and re-pricing happen seconds apart; without this the refresh would re-read every product
+    os.environ["PRICE_INDEX_OVERLAP"] = "0"
+    logging.basicConfig(level=logging.ERROR)
+
+    from sqlalchemy import update
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.categories import current_category_taxonomy
+    from backend.metrics import registry
+    from backend.price_index import PriceIndex, price_index
+    from backend.recommendations import (
+        features_from_reviews, get_recommendations_for_product, positive_reviews_by_product, rank_recommendations
+    )
+    from models import Product
+
+    rng = random.Random(42)
+    results = {"meta": {"products": args.products, "reviews_per_product": args.reviews_per_product}}
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews_per_product)
+        taxonomy = current_category_taxonomy(db.session)
+        products = db.session.scalars(db.select(Product)).all()
+        base_ids = rng.sample([product.id for product in products], min(args.sample, len(products)))
+
+        def exhaustive(product_id):
+            """Every candidate scored, as before candidate generation"""
+            base = db.session.get(Product, product_id)
+            candidates = Product.query.filter(Product.id != product_id).all()
+            reviews_by_product = positive_reviews_by_product()
+            features_by_id = {product.id: features_from_reviews(product.description,
+                                                                reviews_by_product.get(product.id, []))
+                              for product in candidates + [base]}
+            return rank_recommendations(base, candidates, features_by_id[base.id], features_by_id, 3,
+                                        taxonomy=taxonomy)
+
+        mismatches, exhaustive_ms, generated_ms = 0, [], []
+        for product_id in base_ids:
+            start = time.perf_counter()
+            expected = [product.id for product in exhaustive(product_id)]
+            exhaustive_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            actual = [product.id for product in get_recommendations_for_product(product_id, 3)]
+            generated_ms.append((time.perf_counter() - start) * 1000)
+            mismatches += expected != actual
+        counters = registry._counters.get("recommendation_candidates_total", {})
+        scored = sum(value for key, value in counters.items() if "scored" in key)
+        pruned = sum(value for key, value in counters.items() if "pruned" in key)
+        results["parity"] = {"checked": len(base_ids), "mismatches": mismatches}
+        others = len(base_ids) * (len(products) - 1)
+        results["recommendations"] = {
+            "exhaustive_p50_ms": round(statistics.median(exhaustive_ms), 2),
+            "candidate_generation_p50_ms": round(statistics.median(generated_ms), 2),
+            "loaded_share": round((scored + pruned) / max(others, 1), 3),
+            "scored_share": round(scored / max(others, 1), 3),
+        }
+
+        prices = [(product.id, product.price) for product in products]
+        base_price = products[0].price
+        results["lookup"] = {
+            "index_within_ms": median_ms(lambda: price_index.within(base_price, 0.5), args.repeat),
+            "scan_ms": median_ms(lambda: [pid for pid, price in prices
+                                          if price and abs(price - base_price) / max(base_price, 1) < 0.5],
+                                 args.repeat),
+        }
+
+        repriced = rng.sample([product.id for product in products], min(args.repriced, len(products)))
+        for product_id in repriced:
+            db.session.execute(update(Product).where(Product.id == product_id)
+                               .values(price=round(rng.uniform(5, 500), 2)))
+        db.session.commit()
+
+        def incremental():
+            price_index.refreshed_at = 0.0
+            price_index.refresh(db.session)
+
+        refresh = {"incremental_ms": median_ms(incremental, 1)}
+        rebuilt = PriceIndex()
+        refresh["rebuild_ms"] = median_ms(lambda: rebuilt.refresh(db.session, force=True), args.repeat)
+        refresh["matches_rebuild"] = price_index._entries == rebuilt._entries and \
+            price_index._ids == rebuilt._ids
+        results["refresh"] = refresh
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
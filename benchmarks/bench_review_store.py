@@ -0,0 +1,110 @@
+"""
+Columnar Review Snapshot Benchmark
+
+Compares computing the per-product sentiment distribution the previous way
+(loading Review objects product by product) with the columnar snapshot in
+backend/review_store.py, and reports snapshot load, save and memory-map times
+and its size in memory.
+
+Usage:
+    python benchmarks/bench_review_store.py [--products 2000] [--reviews-per-product 50]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark ORM vs columnar review aggregation')
+    parser.add_argument('--products', type=int, default=2000, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=50, help='Reviews per seeded product')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def orm_distribution(products, review_model):
+    """Sentiment distribution as update_sentiment_scores used to compute it"""
+    distribution = {}
+    for product in products:
+        reviews = review_model.query.filter_by(product_id=product.id).all()
+        if not reviews:
+            continue
+        total = len(reviews)
+        distribution[product.id] = (
+            sum(1 for r in reviews if r.sentiment_class == 'positive') / total,
+            sum(1 for r in reviews if r.sentiment_class == 'neutral') / total,
+            sum(1 for r in reviews if r.sentiment_class == 'negative') / total,
+        )
+    return distribution
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round(time.perf_counter() - start, 4)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_review_store_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    logging.basicConfig(level=logging.ERROR)
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.review_store import ReviewSnapshot
+    from models import Product, Review
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews_per_product)
+
+        products = Product.query.all()
+        orm_result, orm_seconds = timed(orm_distribution, products, Review)
+        snapshot, load_seconds = timed(ReviewSnapshot.from_database, db.session)
+        columnar_result, aggregate_seconds = timed(snapshot.sentiment_distribution)
+
+    snapshot_path = os.path.join(workdir, "snapshot")
+    _, save_seconds = timed(snapshot.save, snapshot_path)
+    mapped, open_seconds = timed(ReviewSnapshot.open, snapshot_path)
+    _, mapped_aggregate_seconds = timed(mapped.sentiment_distribution)
+
+    mismatches = sum(
+        1 for pid, shares in orm_result.items()
+        if any(abs(a - b) > 1e-9 for a, b in zip(shares, columnar_result.get(pid, (None,) * 3)))
+    )
+    snapshot_bytes = sum(getattr(snapshot, name).nbytes for name in
+                         ("product_id", "sentiment_score", "sentiment_class", "rating", "date",
+                          "products", "offsets"))
+
+    results = {
+        "meta": {"products": args.products, "reviews": len(snapshot)},
+        "orm_distribution_seconds": orm_seconds,
+        "snapshot_load_seconds": load_seconds,
+        "snapshot_distribution_seconds": aggregate_seconds,
+        "snapshot_save_seconds": save_seconds,
+        "snapshot_mmap_open_seconds": open_seconds,
+        "mmap_distribution_seconds": mapped_aggregate_seconds,
+        "snapshot_bytes": snapshot_bytes,
+        "mismatches": mismatches,
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Single-Flight Benchmark
+
+Runs the app in a threaded server and sends bursts of concurrent requests for
+the same hot product, a product detail with many reviews (1,000 by default)
+and its recommendations among the other products, with single-flight coalescing off and on. Reports
+requests/sec, latency, how many times the response was actually computed and
+how many distinct response bodies were returned (1 unless requests failed;
+without coalescing, bursts larger than the connection pool time out waiting
+for connections).
+
+Usage:
+    python benchmarks/bench_single_flight.py [--clients 32] [--bursts 3] [--reviews 1000]
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark single-flight coalescing of hot product requests')
+    parser.add_argument('--products', type=int, default=20, help='Number of products to seed')
+    parser.add_argument('--reviews', type=int, default=1000, help='Reviews per product')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent requests per burst')
+    parser.add_argument('--bursts', type=int, default=3, help='Bursts per endpoint and mode')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def fetch(url):
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def burst(url, clients):
+    """Send `clients` simultaneous requests; return (latencies, bodies)"""
+    barrier = threading.Barrier(clients)
+    latencies, bodies = [None] * clients, [None] * clients
+
+    def client(i):
+        barrier.wait()
+        start = time.perf_counter()
+        bodies[i] = fetch(url)
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, bodies
+
+
+def run(url, args, counter):
+    counter[0] = 0
+    latencies, bodies = [], set()
+    start = time.perf_counter()
+    for _ in range(args.bursts):
+        burst_latencies, burst_bodies = burst(url, args.clients)
+        latencies.extend(burst_latencies)
+        bodies.update(burst_bodies)
+    elapsed = time.perf_counter() - start
+    ms = sorted(l * 1000 for l in latencies)
+    return {
+        "requests_per_second": round(len(ms) / elapsed, 1),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(ms[int(len(ms) * 0.95) - 1], 2),
+        "computations": counter[0],
+        "requests": len(ms),
+        "distinct_responses": len(bodies),
+    }, bodies
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_single_flight_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    # Time the computation, not the product response cache
+    os.environ["PRODUCT_CACHE_TTL"] = "0"
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    from werkzeug.serving import make_server
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend import app as api
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews)
+
+    # Count how often each response is actually computed
+    counters, lock = {}, threading.Lock()
+    for name in ("load_product_detail", "load_recommendations"):
+        counter = counters[name] = [0]
+
+        def counted(*call_args, _func=getattr(api, name), _counter=counter):
+            with lock:
+                _counter[0] += 1
+            return _func(*call_args)
+        setattr(api, name, functools.wraps(getattr(api, name))(counted))
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = {"meta": {"products": args.products, "reviews": args.reviews, "clients": args.clients, "bursts": args.bursts}}
+    endpoints = (
+        ("product_detail", "/api/products/1", api.product_detail_flight, counters["load_product_detail"]),
+        ("recommendations", "/api/products/1/recommendations", api.recommendations_flight,
+         counters["load_recommendations"]),
+    )
+    try:
+        for name, path, flight, counter in endpoints:
+            fetch(base_url + path)
+            results[name] = {}
+            for mode, enabled in (("off", False), ("on", True)):
+                flight.enabled = enabled
+                results[name][mode], bodies = run(base_url + path, args, counter)
+    finally:
+        server.shutdown()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
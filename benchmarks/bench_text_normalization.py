@@ -0,0 +1,115 @@
+"""
+Text Normalization Benchmark
+
+Times the shared single-pass normalizer in backend.text_normalization against
+the previous per-step clean_text + preprocess_text pipeline on synthetic noisy
+reviews (HTML entities, tags, URLs, BOMs, control characters) built from the
+sample reviews in backend/product_data.py.
+
+Also checks that both pipelines yield the same analysis tokens, so sentiment
+scores are unchanged.
+
+Usage:
+    python benchmarks/bench_text_normalization.py [--count 1000000]
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.text_normalization import normalize_text
+from backend.product_data import products
+
+BATCH_SIZE = 10000
+NOISE = [
+    " &amp; ", " <br/> ", "<b>", "</b>", " \ufeff", "\xa0", "\t\n", "\x00", " https://example.com/r?id=1 ",
+    " www.example.com ", "&quot;", '\\"', "!!!", " &lt;3 ", "  ",
+]
+
+
+def legacy_clean_text(text):
+    """clean_text as previously duplicated in the importer and cleanup scripts"""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('\ufeff', '')
+    text = text.replace('\xa0', ' ')
+    text = text.strip()
+    text = text.replace('\\"', '"')
+    text = re.sub(r'([!?.])\\1+', r'\1', text)
+    text = ''.join(c if ord(c) >= 32 else ' ' for c in text)
+    return text
+
+
+def legacy_preprocess_text(text):
+    """preprocess_text as previously defined in backend/sentiment_analyzer.py"""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'<.*?>', '', text)
+    return text.strip()
+
+
+def generate_batches(count, seed=42):
+    """Yield batches of noisy review texts"""
+    rng = random.Random(seed)
+    base = [review["text"] for product in products for review in product["reviews"]]
+    produced = 0
+    while produced < count:
+        size = min(BATCH_SIZE, count - produced)
+        batch = []
+        for _ in range(size):
+            words = rng.choice(base).split()
+            for _ in range(rng.randint(0, 4)):
+                words.insert(rng.randint(0, len(words)), rng.choice(NOISE))
+            batch.append(" ".join(words))
+        produced += size
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Text normalization benchmark')
+    parser.add_argument('--count', type=int, default=1000000, help='Number of synthetic reviews')
+    args = parser.parse_args()
+
+    legacy_seconds = 0.0
+    shared_seconds = 0.0
+    token_mismatches = 0
+
+    for batch in generate_batches(args.count):
+        start = time.perf_counter()
+        legacy = [legacy_preprocess_text(legacy_clean_text(t)) for t in batch]
+        legacy_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        shared = [normalize_text(t)[1] for t in batch]
+        shared_seconds += time.perf_counter() - start
+
+        token_mismatches += sum(1 for a, b in zip(legacy, shared) if a.split() != b.split())
+
+    result = {
+        "benchmark": "text_normalization",
+        "reviews": args.count,
+        "legacy_seconds": round(legacy_seconds, 3),
+        "shared_seconds": round(shared_seconds, 3),
+        "legacy_reviews_per_sec": round(args.count / legacy_seconds, 1),
+        "shared_reviews_per_sec": round(args.count / shared_seconds, 1),
+        "speedup": round(legacy_seconds / shared_seconds, 2),
+        "analysis_token_mismatches": token_mismatches,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+VADER Scorer Parity Check and Throughput Benchmark
+
+Compares backend.vader_scorer.FastSentimentIntensityAnalyzer against NLTK's
+SentimentIntensityAnalyzer:
+1. Parity - every score must be identical on the sample reviews (raw and
+   preprocessed), on hand-written edge cases and on seeded random sentences
+   built from negations, boosters, idioms, punctuation and ALL CAPS words
+2. Throughput - reviews scored per second by each implementation
+
+Usage:
+    python benchmarks/bench_vader.py [--repeat 200] [--fuzz 20000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.sentiment_analyzer import sia, preprocess_text
+from backend.vader_scorer import FastSentimentIntensityAnalyzer, BOOSTER_DICT, NEGATE, SPECIAL_CASE_IDIOMS
+from backend.product_data import products
+
+EDGE_CASES = [
+    "",
+    "!!!",
+    "GREAT product, but the battery is TERRIBLE!!",
+    "This is kind of good",
+    "it is not bad at all",
+    "at least it works, least good purchase ever",
+    "very least helpful",
+    "never so happy with a purchase",
+    "I was never this disappointed, this is the bomb",
+    "cut the mustard? yeah right??",
+    "The sound is the shit!!!!! Absolutely LOVE it",
+    "sort of nice, kind of great, just enough good",
+    "Not worth it. Not worth it. Not worth it.",
+    "good, good; good: 'good' \"good\" -good- good!!! good!?! good!!!!",
+    "don't,like ,don't isn't good it's not great",
+    "I HATE IT",
+    "Hardly satisfying, barely usable and slightly broken?",
+    "hand to mouth existence; kiss of death for this brand",
+]
+
+
+def build_corpus():
+    """Collect sample review texts and product descriptions"""
+    texts = []
+    for product in products:
+        texts.append(product.get("description", ""))
+        for review in product.get("reviews", []):
+            texts.append(review["text"])
+    return texts
+
+
+def build_fuzz_corpus(count, seed=42):
+    """Seeded random sentences exercising VADER's modifier rules"""
+    rng = random.Random(seed)
+    vocab = ["good", "bad", "great", "terrible", "love", "hate", "product", "works", "kind", "of",
+             "but", "least", "at", "very", "never", "so", "this", "the", "it", "was", "is", ":)", ":("]
+    vocab += list(BOOSTER_DICT)[:40] + sorted(NEGATE)[:30]
+    vocab += [w for key in SPECIAL_CASE_IDIOMS for w in key]
+    punctuation = ["", "", "", "!", "?", ",", ".", "!!", "???", "?!?", "'", "!!!!", "-"]
+    sentences = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(1, 25)):
+            word = rng.choice(vocab)
+            roll = rng.random()
+            if roll < 0.1:
+                word = word.upper()
+            elif roll < 0.15:
+                word = word.capitalize()
+            if rng.random() < 0.2:
+                word = rng.choice(punctuation) + word
+            if rng.random() < 0.3:
+                word = word + rng.choice(punctuation)
+            words.append(word)
+        sentences.append(" ".join(words))
+    return sentences
+
+
+def check_parity(fast, texts):
+    """Return the texts whose fast scores differ from NLTK's"""
+    mismatches = []
+    for text in texts:
+        expected = sia.polarity_scores(text)
+        actual = fast.polarity_scores(text)
+        if expected != actual:
+            mismatches.append({"text": text, "nltk": expected, "fast": actual})
+    return mismatches
+
+
+def time_scorer(scorer, texts, repeat):
+    """Return texts scored per second"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            scorer.polarity_scores(text)
+    elapsed = time.perf_counter() - start
+    return (len(texts) * repeat) / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='VADER scorer parity check and benchmark')
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over the sample corpus when timing')
+    parser.add_argument('--fuzz', type=int, default=20000, help='Number of random parity sentences')
+    args = parser.parse_args()
+
+    fast = FastSentimentIntensityAnalyzer(lexicon=sia.lexicon)
+
+    corpus = build_corpus()
+    parity_texts = corpus + [preprocess_text(t) for t in corpus] + [t.upper() for t in corpus]
+    parity_texts += EDGE_CASES + build_fuzz_corpus(args.fuzz)
+    mismatches = check_parity(fast, parity_texts)
+
+    timing_texts = [preprocess_text(t) for t in corpus]
+    nltk_rate = time_scorer(sia, timing_texts, args.repeat)
+    fast_rate = time_scorer(fast, timing_texts, args.repeat)
+
+    result = {
+        "benchmark": "vader_scorer",
+        "parity_checked": len(parity_texts),
+        "parity_mismatches": len(mismatches),
+        "nltk_reviews_per_sec": round(nltk_rate, 1),
+        "fast_reviews_per_sec": round(fast_rate, 1),
+        "speedup": round(fast_rate / nltk_rate, 2),
+    }
+    print(json.dumps(result, indent=2))
+
+    if mismatches:
+        for mismatch in mismatches[:10]:
+            print(json.dumps(mismatch), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
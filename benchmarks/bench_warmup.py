@@ -0,0 +1,92 @@
+"""
+Startup Cache Warming Benchmark
+
+Seeds a catalog and measures the first request for the detail and
+recommendations of each of the top products (by positive_score) on a cold
+product cache and after warm_product_cache(). Also reports how long warming
+took and how far it got with a generous and a tight time budget.
+
+Usage:
+    python benchmarks/bench_warmup.py [--products 300] [--reviews-per-product 200] [--top 20]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark first requests with and without cache warming')
+    parser.add_argument('--products', type=int, default=300, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=200, help='Reviews per product')
+    parser.add_argument('--top', type=int, default=20, help='Products to warm and request')
+    parser.add_argument('--tight-budget', type=float, default=0.5, help='Budget in seconds for the partial run')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def first_requests(client, product_ids):
+    """Latency of the first detail + recommendations request for each product"""
+    ms = []
+    for product_id in product_ids:
+        start = time.perf_counter()
+        for path in (f'/api/products/{product_id}', f'/api/products/{product_id}/recommendations'):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+        ms.append((time.perf_counter() - start) * 1000)
+    ms.sort()
+    return {"p50_ms": round(statistics.median(ms), 2), "max_ms": round(ms[-1], 2),
+            "total_ms": round(sum(ms), 2)}
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_warmup_")
+    os.environ["FLASK_CONFIG"] = "testing"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'catalog.db')}"
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir, "metrics"))
+    logging.basicConfig(level=logging.ERROR)
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog
+    from backend.product_cache import product_cache
+    from backend.warmup import warm_product_cache, warmup_product_ids
+
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, args.products, args.reviews_per_product)
+        product_ids = warmup_product_ids(db, args.top, source="score")
+
+    results = {"meta": {"products": args.products, "reviews_per_product": args.reviews_per_product,
+                        "top": args.top}}
+    client = app.test_client()
+
+    product_cache.clear()
+    results["cold"] = first_requests(client, product_ids)
+
+    product_cache.clear()
+    results["warmup"] = warm_product_cache(app, db, limit=args.top, budget=60, source="score")
+    results["warm"] = first_requests(client, product_ids)
+
+    product_cache.clear()
+    results["tight_budget"] = warm_product_cache(app, db, limit=args.top, budget=args.tight_budget, source="score")
+    results["tight_budget"]["budget"] = args.tight_budget
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
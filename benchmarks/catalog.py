@@ -0,0 +1,150 @@
+"""
+Synthetic Catalog Seeding for Benchmarks
+
+Fills the database with a generated catalog of products x reviews templated
+from the sample data in backend/product_data.py. Sentiment is computed once
+per distinct review text and rows are bulk inserted, so seeding large
+catalogs stays fast.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from backend.product_data import products as SAMPLE_PRODUCTS
+from backend.sentiment_analyzer import (
+    ANALYZER_VERSION, analyze_sentiment, classify_sentiment, get_sentiment_keywords
+)
+from backend.sentiment_rollup import rebuild_sentiment_rollups
+from backend.text_normalization import review_dedupe_key
+from backend.aspect_summary import rebuild_aspect_summaries
+from backend.categories import assign_product_categories
+
+BATCH_SIZE = 5000
+BASE_DATE = datetime(2023, 7, 1)
+
+
+def sample_review_texts():
+    """All review texts from the sample catalog"""
+    return [review["text"] for product in SAMPLE_PRODUCTS for review in product["reviews"]]
+
+
+def _analyze_templates(texts):
+    """Sentiment fields for each distinct template text"""
+    analyzed = {}
+    for text in texts:
+        if text not in analyzed:
+            score = analyze_sentiment(text)
+            sentiment_class = classify_sentiment(score)
+            analyzed[text] = (score, sentiment_class, get_sentiment_keywords(text, sentiment_class))
+    return analyzed
+
+
+def seed_catalog(db, num_products, reviews_per_product, seed=42):
+    """
+    Insert a generated catalog into the database
+
+    Args:
+        db: Flask-SQLAlchemy instance (an app context must be active)
+        num_products: Number of products to create
+        reviews_per_product: Number of reviews per product
+        seed: Random seed so catalogs are reproducible
+
+    Returns:
+        Dictionary with the number of products and reviews inserted
+    """
+    from models import Product, Review
+
+    rng = random.Random(seed)
+    texts = sample_review_texts()
+    analyzed = _analyze_templates(texts)
+    ratings = {"positive": (4.0, 5.0), "neutral": (3.0, 3.0), "negative": (1.0, 2.0)}
+
+    product_rows = []
+    review_rows = []
+    review_id = 1
+    for product_id in range(1, num_products + 1):
+        template = SAMPLE_PRODUCTS[(product_id - 1) % len(SAMPLE_PRODUCTS)]
+        counts = {"positive": 0, "neutral": 0, "negative": 0}
+        dedupe_keys = set()
+
+        for _ in range(reviews_per_product):
+            text = rng.choice(texts)
+            score, sentiment_class, keywords = analyzed[text]
+            counts[sentiment_class] += 1
+            author = f"Reviewer{rng.randint(1, 100000)}"
+            # Like backfilled data, only the first of identical reviews carries the key
+            dedupe_key = review_dedupe_key(author, text)
+            if dedupe_key in dedupe_keys:
+                dedupe_key = None
+            dedupe_keys.add(dedupe_key)
+            review_rows.append({
+                "id": review_id,
+                "product_id": product_id,
+                "author": author,
+                "text": text,
+                "rating": rng.choice(ratings[sentiment_class]),
+                "date": BASE_DATE - timedelta(days=rng.randint(0, 1000)),
+                "sentiment_score": score,
+                "sentiment_class": sentiment_class,
+                "sentiment_keywords": keywords,
+                "analyzer_version": ANALYZER_VERSION,
+                "dedupe_key": dedupe_key,
+            })
+            review_id += 1
+
+        total = reviews_per_product or 1
+        product_rows.append({
+            "id": product_id,
+            "asin": f"B{product_id:09d}",
+            "name": f"{template['name']} {product_id}",
+            "description": template["description"],
+            "price": round(template["price"] * rng.uniform(0.6, 1.4), 2),
+            "category": template["category"],
+            "positive_score": counts["positive"] / total,
+            "neutral_score": counts["neutral"] / total,
+            "negative_score": counts["negative"] / total,
+        })
+
+    for start in range(0, len(product_rows), BATCH_SIZE):
+        db.session.execute(insert(Product), product_rows[start:start + BATCH_SIZE])
+    for start in range(0, len(review_rows), BATCH_SIZE):
+        db.session.execute(insert(Review), review_rows[start:start + BATCH_SIZE])
+    db.session.commit()
+
+    # Bulk inserts bypass the importer, so build the timeline rollups, aspect summaries
+    # and canonical categories in one pass
+    rebuild_sentiment_rollups(db.session)
+    rebuild_aspect_summaries(db.session)
+    assign_product_categories(db.session)
+
+    return {"products": len(product_rows), "reviews": len(review_rows)}
+
+
+def generate_import_rows(count, num_existing_products, seed=7):
+    """
+    Datafiniti-style review dicts for import_reviews, mixing new products
+    with reviews of already seeded ones
+    """
+    rng = random.Random(seed)
+    texts = sample_review_texts()
+    rows = []
+    for i in range(count):
+        if num_existing_products and rng.random() < 0.5:
+            product_id = rng.randint(1, num_existing_products)
+        else:
+            product_id = num_existing_products + 1 + i // 5
+        template = SAMPLE_PRODUCTS[(product_id - 1) % len(SAMPLE_PRODUCTS)]
+        rows.append({
+            "asins": f"B{product_id:09d}",
+            "name": f"{template['name']} {product_id}",
+            "description": template["description"],
+            "price": str(template["price"]),
+            "category": template["category"],
+            "reviews.text": f"{rng.choice(texts)} &amp; <br/>{rng.choice(texts)}",
+            "reviews.username": f"Importer{i}",
+            "reviews.rating": str(rng.randint(1, 5)),
+            "reviews.date": (BASE_DATE - timedelta(days=rng.randint(0, 1000))).strftime("%Y-%m-%d"),
+        })
+    return rows
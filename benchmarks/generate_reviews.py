@@ -0,0 +1,182 @@
+"""
+Synthetic Review Dataset Generator
+
+Writes Datafiniti-style review datasets (CSV or JSON Lines) that
+import_amazon_reviews.py can read, for load tests and capacity planning
+without customer data.
+
+- Deterministic: the same --seed always produces the same file
+- Streaming: rows are written as they are generated, so multi-GB files are
+  produced in constant memory
+- Realistic: star ratings follow the skew of Amazon reviews, review lengths
+  are log-normal, reviews per product are heavy-tailed, and text is built from
+  the sentiment keyword and marketing phrase vocabularies of the analyzer
+
+Usage:
+    python benchmarks/generate_reviews.py reviews.csv --products 10000
+    python benchmarks/generate_reviews.py reviews.jsonl --products 1000000 --reviews-per-product 8
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.sentiment_analyzer import POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS, MARKETING_PHRASES
+from backend.product_data import products as SAMPLE_PRODUCTS
+
+FIELDNAMES = [
+    'id', 'asins', 'brand', 'name', 'description', 'price', 'categories',
+    'reviews.date', 'reviews.rating', 'reviews.title', 'reviews.text', 'reviews.username',
+]
+
+# Share of 1-5 star ratings in typical Amazon review datasets
+RATING_WEIGHTS = [0.10, 0.06, 0.09, 0.20, 0.55]
+
+CATEGORY_PATHS = [
+    "Electronics,Headphones,Audio", "Electronics,Televisions,Home Theater",
+    "Wearables,Fitness Trackers,Health", "Furniture,Office Chairs,Home Office",
+    "Kitchen,Blenders,Small Appliances", "Home,Bedding,Sheets",
+    "Electronics,Tablets,Computers", "Toys,Games,Puzzles", "Sports,Outdoors,Camping",
+    "Beauty,Skin Care,Moisturizers",
+]
+BRANDS = ["Acme", "Northwind", "Contoso", "Globex", "Initech", "Umbrella", "Stark", "Wayne"]
+NOUNS = ["battery", "sound", "screen", "build", "price", "setup", "design", "app", "fit",
+         "material", "packaging", "customer service", "size", "color", "motor"]
+FILLER = [
+    "I bought this {days} days ago", "it arrived on time", "I use it every day",
+    "my family uses the {noun} a lot", "compared to my old one", "the {noun} is as described",
+    "setup took about {days} minutes", "I have owned it for {days} weeks",
+]
+POSITIVE_TEMPLATES = [
+    "the {noun} is {kw}", "really {kw} {noun}", "I {kw} it", "{kw} for the price",
+    "overall {kw}", "the {noun} feels {kw}",
+]
+NEGATIVE_TEMPLATES = [
+    "the {noun} is {kw}", "{kw} {noun}", "feels {kw}", "I was {kw} with the {noun}",
+    "{kw} overall", "the {noun} {kw} after a month",
+]
+
+
+def _flatten(keyword_dict):
+    return [kw for keywords in keyword_dict.values() for kw in keywords]
+
+
+POSITIVE_VOCAB = _flatten(POSITIVE_KEYWORDS)
+NEGATIVE_VOCAB = _flatten(NEGATIVE_KEYWORDS)
+
+
+def review_length(rng):
+    """Number of sentences, log-normal with a long tail of detailed reviews"""
+    return max(1, min(40, int(rng.lognormvariate(1.1, 0.7))))
+
+
+def reviews_for_product(rng, mean_reviews):
+    """Heavy-tailed reviews-per-product count with the requested mean"""
+    sigma = 1.0
+    mu = math.log(max(mean_reviews, 1)) - sigma * sigma / 2
+    return max(1, int(rng.lognormvariate(mu, sigma)))
+
+
+def review_text(rng, rating):
+    """Compose a review whose tone matches the star rating"""
+    positive_share = {1: 0.05, 2: 0.2, 3: 0.5, 4: 0.8, 5: 0.95}[rating]
+    sentences = []
+    for _ in range(review_length(rng)):
+        roll = rng.random()
+        if roll < 0.3:
+            template = rng.choice(FILLER)
+        elif rng.random() < positive_share:
+            template = rng.choice(POSITIVE_TEMPLATES).replace("{kw}", rng.choice(POSITIVE_VOCAB))
+        else:
+            template = rng.choice(NEGATIVE_TEMPLATES).replace("{kw}", rng.choice(NEGATIVE_VOCAB))
+        sentence = template.format(noun=rng.choice(NOUNS), days=rng.randint(2, 60))
+        sentences.append(sentence[0].upper() + sentence[1:] + rng.choice([".", ".", ".", "!"]))
+    return " ".join(sentences)
+
+
+def product_description(rng, template):
+    claims = rng.sample(MARKETING_PHRASES, 3)
+    return f"{template['description']} {claims[0].capitalize()} design, {claims[1]} and {claims[2]} performance."
+
+
+def generate_rows(num_products, mean_reviews, seed):
+    """Yield Datafiniti-style review rows one at a time"""
+    start_date = datetime(2015, 1, 1)
+    for index in range(num_products):
+        # Per-product RNG keeps output deterministic for any --products value
+        rng = random.Random(f"{seed}-{index}")
+        template = SAMPLE_PRODUCTS[index % len(SAMPLE_PRODUCTS)]
+        brand = rng.choice(BRANDS)
+        product = {
+            'id': f"AV{index:012d}",
+            'asins': f"B{index:09d}",
+            'brand': brand,
+            'name': f"{brand} {template['name']} {index}",
+            'description': product_description(rng, template),
+            'price': f"{template['price'] * rng.uniform(0.5, 1.5):.2f}",
+            'categories': rng.choice(CATEGORY_PATHS),
+        }
+        for _ in range(reviews_for_product(rng, mean_reviews)):
+            rating = rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+            date = start_date + timedelta(days=rng.randint(0, 3000), seconds=rng.randint(0, 86399))
+            row = dict(product)
+            row.update({
+                'reviews.date': date.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'reviews.rating': str(rating),
+                'reviews.title': rng.choice(POSITIVE_VOCAB if rating >= 4 else NEGATIVE_VOCAB).capitalize(),
+                'reviews.text': review_text(rng, rating),
+                'reviews.username': f"user{rng.randint(1, 10 * num_products)}",
+            })
+            yield row
+
+
+def write_dataset(output_path, file_format, num_products, mean_reviews, seed):
+    """Stream generated rows to a CSV or JSON Lines file, returning the row count"""
+    count = 0
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for row in generate_rows(num_products, mean_reviews, seed):
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in generate_rows(num_products, mean_reviews, seed):
+                f.write(json.dumps(row))
+                f.write('\n')
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Datafiniti-style review dataset')
+    parser.add_argument('output_path', type=str, help='Output file (.csv or .jsonl)')
+    parser.add_argument('--format', type=str, choices=['csv', 'jsonl'], help='Output format (csv or jsonl)')
+    parser.add_argument('--products', type=int, default=10000, help='Number of products')
+    parser.add_argument('--reviews-per-product', type=float, default=10, help='Mean reviews per product')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    file_format = args.format
+    if not file_format:
+        if args.output_path.lower().endswith('.csv'):
+            file_format = 'csv'
+        elif args.output_path.lower().endswith('.jsonl'):
+            file_format = 'jsonl'
+        else:
+            print("Error: Could not determine file format. Please specify --format")
+            sys.exit(1)
+
+    count = write_dataset(args.output_path, file_format, args.products, args.reviews_per_product, args.seed)
+    print(json.dumps({"output": args.output_path, "format": file_format, "products": args.products, "reviews": count}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Application Benchmark Suite
+
+Seeds a SQLite database (in-memory TestingConfig by default) with a generated
+catalog and times the key paths:
+- /api/products, product detail, recommendations, sentiment timeline, top-rated, /api/analyze
+- import_reviews from the Amazon importer
+- the clean_database.py maintenance jobs
+
+Results are emitted as JSON tagged with the git commit, so runs can be
+compared across commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--products 200] [--reviews-per-product 20]
+        [--repeat 20] [--import-reviews 500] [--database-url sqlite:////tmp/bench.db]
+        [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run application benchmarks on a synthetic SQLite catalog')
+    parser.add_argument('--products', type=int, default=200, help='Number of products to seed')
+    parser.add_argument('--reviews-per-product', type=int, default=20, help='Reviews per seeded product')
+    parser.add_argument('--repeat', type=int, default=20, help='Requests per endpoint')
+    parser.add_argument('--import-reviews', type=int, default=500, help='Rows passed to import_reviews')
+    parser.add_argument('--database-url', type=str, help='SQLite URL to use instead of in-memory TestingConfig')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the catalog')
+    parser.add_argument('--output', type=str, help='Write JSON results to this file')
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Point the app at the benchmark database before it is imported"""
+    os.environ["FLASK_CONFIG"] = "testing"
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ.pop("DATABASE_URL", None)
+    os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="bench_metrics_"))
+    os.environ.setdefault("TQDM_DISABLE", "1")
+    # Time the computation, not the product response cache
+    os.environ["PRODUCT_CACHE_TTL"] = "0"
+    logging.basicConfig(level=logging.ERROR)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(durations):
+    """Latency summary in milliseconds"""
+    ms = sorted(d * 1000 for d in durations)
+    return {
+        "count": len(ms),
+        "mean_ms": round(statistics.mean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "min_ms": round(ms[0], 3),
+    }
+
+
+def time_requests(client, method, urls, repeat, payload=None):
+    """Issue repeat requests cycling through urls and summarize latency"""
+    durations = []
+    for i in range(repeat):
+        url = urls[i % len(urls)]
+        start = time.perf_counter()
+        response = client.open(url, method=method, json=payload)
+        durations.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}")
+    return summarize(durations)
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return {"seconds": round(time.perf_counter() - start, 4)}
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from app import app, db
+    from benchmarks.catalog import seed_catalog, generate_import_rows
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "database": app.config["SQLALCHEMY_DATABASE_URI"],
+            "products": args.products,
+            "reviews_per_product": args.reviews_per_product,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    timings = results["results"]
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        seeded = seed_catalog(db, args.products, args.reviews_per_product, seed=args.seed)
+        timings["seed"] = {"seconds": round(time.perf_counter() - start, 4), **seeded}
+
+    rng = random.Random(args.seed)
+    product_ids = [rng.randint(1, args.products) for _ in range(min(args.repeat, 10))] or [1]
+    client = app.test_client()
+
+    timings["api_products"] = time_requests(client, "GET", ["/api/products"], args.repeat)
+    timings["api_product_detail"] = time_requests(
+        client, "GET", [f"/api/products/{pid}" for pid in product_ids], args.repeat)
+    timings["api_recommendations"] = time_requests(
+        client, "GET", [f"/api/products/{pid}/recommendations" for pid in product_ids], args.repeat)
+    timings["api_sentiment_timeline"] = time_requests(
+        client, "GET", [f"/api/products/{pid}/sentiment-timeline?bucket=week" for pid in product_ids], args.repeat)
+    timings["api_top_rated"] = time_requests(client, "GET", ["/api/recommendations/top-rated"], args.repeat)
+    timings["api_analyze"] = time_requests(
+        client, "POST", ["/api/analyze"], args.repeat,
+        payload={"text": "Great sound quality but the battery life is disappointing. Not worth the price!"})
+
+    import import_amazon_reviews
+    import clean_database
+
+    rows = generate_import_rows(args.import_reviews, args.products)
+    timings["import_reviews"] = {**time_call(import_amazon_reviews.import_reviews, rows), "rows": len(rows)}
+    timings["update_sentiment_scores"] = time_call(import_amazon_reviews.update_sentiment_scores)
+    timings["normalize_reviews_text"] = time_call(clean_database.normalize_reviews_text)
+    timings["fix_broken_reviews"] = time_call(clean_database.fix_broken_reviews)
+    timings["fix_product_scores"] = time_call(clean_database.fix_product_scores)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,8 +14,6 @@ import logging
 import sys
 import os
 from tqdm import tqdm
-import re
-import html
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -23,49 +21,14 @@ logger = logging.getLogger('database_cleaner')
 
 from app import app, db
 from models import Product, Review
-from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment, get_sentiment_keywords
-import json
-
-def clean_text(text):
-    """Clean text data from common issues in Amazon reviews datasets"""
-    if not text:
-        return ""
-    
-    # Make sure we're working with a string
-    if not isinstance(text, str):
-        try:
-            text = str(text)
-        except:
-            return ""
-    
-    # Decode HTML entities
-    text = html.unescape(text)
-    
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', ' ', text)
-    
-    # Replace multiple spaces, newlines, and tabs with a single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove BOM character
-    text = text.replace('\ufeff', '')
-    
-    # Remove non-breaking spaces and other invisible characters
-    text = text.replace('\xa0', ' ')
-    
-    # Remove leading/trailing whitespace
-    text = text.strip()
-    
-    # Replace escaped quotes
-    text = text.replace('\\"', '"')
-    
-    # Remove excessive punctuation repetition
-    text = re.sub(r'([!?.])\\1+', r'\1', text)
-    
-    # Remove weird control characters
-    text = ''.join(c if ord(c) >= 32 else ' ' for c in text)
-    
-    return text
+from backend.sentiment_analyzer import (
+    ANALYZER_VERSION, analyze_sentiment, classify_sentiment, get_sentiment_keywords
+)
+from backend.text_normalization import normalize_text
+from backend.review_store import ReviewSnapshot
+from backend.sentiment_rollup import rebuild_sentiment_rollups, record_review_change
+from backend.aspect_summary import rebuild_aspect_summaries, record_review_aspects
+from backend.categories import assign_product_categories, rebuild_category_similarity
 
 def fix_broken_reviews():
     """Find and fix reviews with broken data"""
@@ -77,6 +40,8 @@ def fix_broken_reviews():
         fixed_count = 0
         for review in tqdm(reviews, desc="Fixing broken reviews"):
             needs_update = False
+            old_sentiment = (review.sentiment_score, review.sentiment_class)
+            old_keywords = (review.sentiment_score, review.sentiment_keywords)
             
             # Fix missing sentiment classification
             if not review.sentiment_class:
@@ -87,17 +52,19 @@ def fix_broken_reviews():
                     # Both are missing, recalculate
                     review.sentiment_score = analyze_sentiment(review.text)
                     review.sentiment_class = classify_sentiment(review.sentiment_score)
+                    review.analyzer_version = ANALYZER_VERSION
                     needs_update = True
                     
             # Fix missing sentiment score
             elif review.sentiment_score is None:
                 review.sentiment_score = analyze_sentiment(review.text)
+                review.analyzer_version = ANALYZER_VERSION
                 needs_update = True
                 
             # Fix missing sentiment keywords
-            if not review.sentiment_keywords:
+            if review.sentiment_keywords is None:
                 keywords = get_sentiment_keywords(review.text, review.sentiment_class)
-                review.sentiment_keywords = json.dumps(keywords)
+                review.sentiment_keywords = keywords
                 needs_update = True
             
             # Ensure valid rating
@@ -107,6 +74,10 @@ def fix_broken_reviews():
             
             if needs_update:
                 db.session.add(review)
+                record_review_change(db.session, review.product_id, review.date, old=old_sentiment,
+                                     new=(review.sentiment_score, review.sentiment_class))
+                record_review_aspects(db.session, review.product_id, old=old_keywords,
+                                      new=(review.sentiment_score, review.sentiment_keywords))
                 fixed_count += 1
         
         if fixed_count > 0:
@@ -121,6 +92,8 @@ def fix_product_scores():
     
     with app.app_context():
         products = Product.query.all()
+        # Review sentiment distribution per product from the columnar snapshot
+        distribution = ReviewSnapshot.from_database(db.session).sentiment_distribution()
         
         fixed_count = 0
         for product in tqdm(products, desc="Fixing product scores"):
@@ -141,19 +114,10 @@ def fix_product_scores():
             scores_dont_add_up = abs(scores_sum - 1.0) > 0.01 if scores_sum > 0 else True
             
             if scores_invalid or scores_dont_add_up:
-                reviews = Review.query.filter_by(product_id=product.id).all()
-                
-                if reviews:
-                    # Calculate sentiment distribution
-                    positive = sum(1 for r in reviews if r.sentiment_class == 'positive')
-                    neutral = sum(1 for r in reviews if r.sentiment_class == 'neutral')
-                    negative = sum(1 for r in reviews if r.sentiment_class == 'negative')
-                    total = len(reviews)
-                    
+                if product.id in distribution:
                     # Update product sentiment scores
-                    product.positive_score = positive / total if total > 0 else 0
-                    product.neutral_score = neutral / total if total > 0 else 0
-                    product.negative_score = negative / total if total > 0 else 0
+                    product.positive_score, product.neutral_score, product.negative_score = \
+                        distribution[product.id]
                     needs_update = True
                 else:
                     # No reviews, set to neutral
@@ -183,19 +147,26 @@ def normalize_reviews_text():
         for review in tqdm(reviews, desc="Normalizing reviews"):
             # Clean text and check if anything changed
             original_text = review.text
-            cleaned_text = clean_text(original_text)
+            cleaned_text, analysis_text = normalize_text(original_text)
             
             if original_text != cleaned_text:
                 review.text = cleaned_text
                 
                 # Recalculate sentiment with cleaned text
-                sentiment_score = analyze_sentiment(cleaned_text)
+                sentiment_score = analyze_sentiment(analysis_text, preprocessed=True)
                 sentiment_class = classify_sentiment(sentiment_score)
                 sentiment_keywords = get_sentiment_keywords(cleaned_text, sentiment_class)
                 
+                record_review_change(db.session, review.product_id, review.date,
+                                     old=(review.sentiment_score, review.sentiment_class),
+                                     new=(sentiment_score, sentiment_class))
+                record_review_aspects(db.session, review.product_id,
+                                      old=(review.sentiment_score, review.sentiment_keywords),
+                                      new=(sentiment_score, sentiment_keywords))
                 review.sentiment_score = sentiment_score
                 review.sentiment_class = sentiment_class
-                review.sentiment_keywords = json.dumps(sentiment_keywords)
+                review.sentiment_keywords = sentiment_keywords
+                review.analyzer_version = ANALYZER_VERSION
                 
                 db.session.add(review)
                 updated_count += 1
@@ -206,15 +177,39 @@ def normalize_reviews_text():
         else:
             logger.info("No reviews needed text normalization")
 
+def rebuild_review_summaries():
+    """Recompute the sentiment timeline rollups and product aspect summaries from all reviews"""
+    logger.info("Rebuilding sentiment timeline rollups and aspect summaries...")
+    
+    with app.app_context():
+        rebuild_sentiment_rollups(db.session)
+        rebuild_aspect_summaries(db.session)
+
+def rebuild_categories():
+    """Assign canonical categories to products without one and recompute category similarity"""
+    logger.info("Rebuilding product categories...")
+    
+    with app.app_context():
+        assign_product_categories(db.session)
+        rebuild_category_similarity(db.session)
+
+# Cleanup operations in the order run_cleanup runs them
+CLEANUP_STEPS = (
+    normalize_reviews_text,
+    fix_broken_reviews,
+    fix_product_scores,
+    rebuild_review_summaries,
+    rebuild_categories,
+)
+
 def run_cleanup():
     """Run all cleanup operations"""
     try:
         logger.info("Starting database cleanup...")
         
         # Fix all issues
-        normalize_reviews_text()
-        fix_broken_reviews()
-        fix_product_scores()
+        for step in CLEANUP_STEPS:
+            step()
         
         logger.info("Database cleanup completed successfully")
     except Exception as e:
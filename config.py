@@ -5,19 +5,36 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def pool_options(pool_size, max_overflow, pool_timeout=30):
+    """Engine options for a connection pool, overridable with DB_POOL_* environment variables"""
+    return {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", pool_timeout)),
+    }
+
+
 class Config:
     """Base configuration class"""
     SECRET_KEY = os.environ.get("SESSION_SECRET", "development_secret_key")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-    }
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=5, max_overflow=10)
+    # Optional read replica for GET endpoints (see backend/db_routing.py)
+    SQLALCHEMY_REPLICA_URI = os.environ.get("DATABASE_REPLICA_URL")
+    # Usernames allowed to use the admin endpoints (comma separated)
+    ADMIN_USERNAMES = [name.strip() for name in os.environ.get("ADMIN_USERNAMES", "").split(",") if name.strip()]
+    # Directory import jobs read from; uploaded import files are stored under it
+    JOB_IMPORT_DIR = os.path.abspath(os.environ.get("JOB_IMPORT_DIR", "data"))
+    # Rate and concurrency limits on CPU-heavy endpoints (see backend/admission.py)
+    ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "1") != "0"
 
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=5, max_overflow=5)
     # Use environment variable DATABASE_URL for Replit (if available)
     # Otherwise fall back to local PostgreSQL for local development
     SQLALCHEMY_DATABASE_URI = os.environ.get(
@@ -28,6 +45,8 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    # Sized per gunicorn worker; total connections = workers x (pool_size + max_overflow)
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(pool_size=10, max_overflow=20)
     # Use environment variable for production
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
 
@@ -37,6 +56,10 @@ class TestingConfig(Config):
     TESTING = True
     # Use in-memory SQLite for testing
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # In-memory SQLite uses a single static connection, so no pool sizing
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
+    # Benchmarks and tests issue many requests from one client
+    ADMISSION_CONTROL = False
 
 
 # Configuration dictionary
@@ -0,0 +1,81 @@
+"""
+Reviews Dataset Exporter
+
+This script exports reviews with their sentiment analysis results, and product
+sentiment aggregates, from the application's database to Parquet or Arrow IPC
+files for offline analytics.
+
+Rows are streamed from the database in chunks, so memory use stays constant
+however large the tables are. Exports can be limited to a date range and to
+specific products.
+
+Output files (in the output directory):
+- reviews.parquet / reviews.arrow: one row per review
+- products.parquet / products.arrow: one row per product with review count,
+  mean rating, mean sentiment and first/last review date within the filters
+"""
+
+import logging
+import sys
+import os
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('review_exporter')
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, db
+from backend.review_export import (
+    CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES, export_table, parse_date_filter, require_pyarrow
+)
+
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+
+def export_reviews(output_dir, file_format='parquet', tables=EXPORT_TABLES, start_date=None,
+                   end_date=None, product_ids=None, chunk_size=CHUNK_SIZE):
+    """Export the selected tables to output_dir, returning rows written per table"""
+    require_pyarrow()
+    os.makedirs(output_dir, exist_ok=True)
+    filters = {
+        "start_date": parse_date_filter(start_date),
+        "end_date": parse_date_filter(end_date, end=True),
+        "product_ids": product_ids,
+        "chunk_size": chunk_size,
+    }
+
+    stats = {}
+    with app.app_context():
+        for table in tables:
+            path = os.path.join(output_dir, f"{table}.{FILE_EXTENSIONS[file_format]}")
+            stats[table] = export_table(db.session, table, path, file_format, **filters)
+
+    logger.info(f"Export complete. Stats: {stats}")
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export reviews and product aggregates to Parquet or Arrow')
+    parser.add_argument('output_dir', type=str, help='Directory to write the export files to')
+    parser.add_argument('--format', type=str, choices=EXPORT_FORMATS, default='parquet',
+                        help='File format (parquet or arrow)')
+    parser.add_argument('--tables', type=str, nargs='+', choices=EXPORT_TABLES, default=list(EXPORT_TABLES),
+                        help='Tables to export')
+    parser.add_argument('--start-date', type=str, help='Only reviews on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, help='Only reviews on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--product-id', type=int, action='append', dest='product_ids',
+                        help='Only this product (repeat for several)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per chunk')
+
+    args = parser.parse_args()
+
+    try:
+        export_reviews(args.output_dir, args.format, args.tables, args.start_date, args.end_date,
+                       args.product_ids, args.chunk_size)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
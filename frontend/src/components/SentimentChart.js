@@ -4,9 +4,124 @@ import Chart from 'chart.js/auto';
 function SentimentChart({ positive, neutral, negative, product }) {
   const donutChartRef = useRef(null);
   const heatmapChartRef = useRef(null);
+  const timelineChartRef = useRef(null);
   const donutChartInstance = useRef(null);
   const heatmapChartInstance = useRef(null);
+  const timelineChartInstance = useRef(null);
   const [activeTab, setActiveTab] = useState('donut');
+  const [timelineBucket, setTimelineBucket] = useState('month');
+  const [timeline, setTimeline] = useState(null);
+
+  // Fetch the pre-aggregated sentiment timeline when its tab is opened
+  useEffect(() => {
+    if (activeTab !== 'timeline' || !product || !product.id) return;
+
+    let cancelled = false;
+    fetch(`/api/products/${product.id}/sentiment-timeline?bucket=${timelineBucket}`)
+      .then(response => {
+        if (!response.ok) throw new Error('Failed to fetch sentiment timeline');
+        return response.json();
+      })
+      .then(data => {
+        if (!cancelled) setTimeline(data.timeline);
+      })
+      .catch(err => {
+        console.error('Error fetching sentiment timeline:', err);
+        if (!cancelled) setTimeline([]);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [activeTab, timelineBucket, product]);
+
+  useEffect(() => {
+    if (timelineChartInstance.current) {
+      timelineChartInstance.current.destroy();
+      timelineChartInstance.current = null;
+    }
+    if (activeTab !== 'timeline' || !timelineChartRef.current || !timeline || timeline.length === 0) return;
+
+    const timelineCtx = timelineChartRef.current.getContext('2d');
+    timelineChartInstance.current = new Chart(timelineCtx, {
+      type: 'bar',
+      data: {
+        labels: timeline.map(t => t.period),
+        datasets: [
+          {
+            label: 'Positive',
+            data: timeline.map(t => t.positive),
+            backgroundColor: 'rgba(40, 167, 69, 0.8)',
+            stack: 'reviews'
+          },
+          {
+            label: 'Neutral',
+            data: timeline.map(t => t.neutral),
+            backgroundColor: 'rgba(255, 193, 7, 0.8)',
+            stack: 'reviews'
+          },
+          {
+            label: 'Negative',
+            data: timeline.map(t => t.negative),
+            backgroundColor: 'rgba(220, 53, 69, 0.8)',
+            stack: 'reviews'
+          },
+          {
+            label: 'Mean Sentiment',
+            type: 'line',
+            data: timeline.map(t => t.mean_score),
+            borderColor: 'rgba(13, 110, 253, 0.9)',
+            yAxisID: 'score'
+          }
+        ]
+      },
+      options: {
+        responsive: true,
+        plugins: {
+          title: {
+            display: true,
+            text: 'Sentiment Over Time',
+            font: {
+              size: 16
+            }
+          },
+          legend: {
+            position: 'bottom'
+          }
+        },
+        scales: {
+          x: {
+            stacked: true
+          },
+          y: {
+            stacked: true,
+            title: {
+              display: true,
+              text: 'Reviews'
+            }
+          },
+          score: {
+            position: 'right',
+            min: 0,
+            max: 1,
+            grid: {
+              drawOnChartArea: false
+            },
+            title: {
+              display: true,
+              text: 'Mean Sentiment (0-1)'
+            }
+          }
+        }
+      }
+    });
+
+    return () => {
+      if (timelineChartInstance.current) {
+        timelineChartInstance.current.destroy();
+        timelineChartInstance.current = null;
+      }
+    };
+  }, [activeTab, timeline]);
 
   // Generate heatmap data from reviews if available - Amazon style
   const generateHeatmapData = () => {
@@ -237,6 +352,15 @@ function SentimentChart({ positive, neutral, negative, product }) {
             Amazon Review Heatmap
           </button>
         </li>
+        <li className="nav-item">
+          <button 
+            className={`nav-link ${activeTab === 'timeline' ? 'active' : ''}`}
+            onClick={() => setActiveTab('timeline')}
+            disabled={!product || !product.id}
+          >
+            Sentiment Over Time
+          </button>
+        </li>
       </ul>
       
       <div className={`chart-container ${activeTab === 'donut' ? 'd-block' : 'd-none'}`}>
@@ -246,6 +370,24 @@ function SentimentChart({ positive, neutral, negative, product }) {
       <div className={`chart-container ${activeTab === 'heatmap' ? 'd-block' : 'd-none'}`}>
         <canvas ref={heatmapChartRef} height={product && product.reviews ? Math.max(200, product.reviews.length * 40) : 200}></canvas>
       </div>
+
+      <div className={`chart-container ${activeTab === 'timeline' ? 'd-block' : 'd-none'}`}>
+        <div className="btn-group btn-group-sm mb-2">
+          {['week', 'month'].map(bucket => (
+            <button
+              key={bucket}
+              className={`btn btn-outline-secondary ${timelineBucket === bucket ? 'active' : ''}`}
+              onClick={() => setTimelineBucket(bucket)}
+            >
+              {bucket === 'week' ? 'Weekly' : 'Monthly'}
+            </button>
+          ))}
+        </div>
+        {timeline && timeline.length === 0 && (
+          <p className="text-muted">No dated reviews to chart yet.</p>
+        )}
+        <canvas ref={timelineChartRef} height="200"></canvas>
+      </div>
     </div>
   );
 }
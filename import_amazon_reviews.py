@@ -2,7 +2,7 @@
 Amazon Reviews Dataset Importer
 
 This script imports real Amazon reviews from a dataset file into the application's database.
-The dataset should be in CSV or JSON format with the required fields.
+The dataset should be in CSV, JSON or JSON Lines format with the required fields.
 
 Common fields in Amazon reviews datasets:
 - product_id/asin: Amazon Standard Identification Number
@@ -13,17 +13,16 @@ Common fields in Amazon reviews datasets:
 - reviewer_name/reviewer_id: Information about the reviewer
 """
 
+import hashlib
 import json
 import csv
 import logging
 import sys
 import os
-import re
 from datetime import datetime
-from sqlalchemy.exc import IntegrityError
+from itertools import islice
+from sqlalchemy import select, tuple_
 from tqdm import tqdm  # For progress bar
-import pandas as pd
-import html
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -34,32 +33,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app import app, db
 from models import Product, Review
-from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment, get_sentiment_keywords
+from backend.sentiment_analyzer import (
+    ANALYZER_VERSION, analyze_sentiment, classify_sentiment, get_sentiment_keywords
+)
+from backend.import_cleaning import prepare_reviews
+from backend.categories import category_key, ensure_categories
+from backend.checkpoints import checkpoint_state, get_checkpoint
+from backend.upsert import insert_ignoring_conflicts
+from backend.review_store import REVIEW_SNAPSHOT_PATH, ReviewSnapshot, apply_sentiment_distribution
+from backend.sentiment_rollup import record_review_change
+from backend.aspect_summary import apply_aspect_deltas, aspect_deltas
 
-def parse_date(date_str):
-    """Parse date string into datetime object"""
-    try:
-        # Try different date formats
-        formats = [
-            '%Y-%m-%d',  # 2023-04-15
-            '%m/%d/%Y',  # 04/15/2023
-            '%B %d, %Y', # April 15, 2023
-            '%d %B %Y',  # 15 April 2023
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-                
-        # If none of the formats match, try a more flexible approach
-        return pd.to_datetime(date_str).to_pydatetime()
-    except Exception as e:
-        logger.warning(f"Could not parse date: {date_str}, error: {str(e)}")
-        return None
-
-def import_json_reviews(file_path, limit=None):
+def import_json_reviews(file_path, limit=None, progress=None, checkpoint_name=None):
     """Import reviews from a JSON file"""
     logger.info(f"Importing reviews from JSON file: {file_path}")
     
@@ -69,13 +54,33 @@ def import_json_reviews(file_path, limit=None):
     if limit and isinstance(data, list):
         data = data[:limit]
     
-    import_reviews(data)
+    return import_reviews(data, progress, checkpoint_name)
 
-def import_csv_reviews(file_path, limit=None):
-    """Import reviews from a CSV file"""
-    logger.info(f"Importing reviews from CSV file: {file_path}")
-    
-    reviews = []
+def read_jsonl_reviews(file_path, limit=None):
+    """Review objects from a JSON Lines file, read one line at a time"""
+    count = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if limit and count >= limit:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                review = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing line: {str(e)}")
+                continue
+            count += 1
+            yield review
+
+def import_jsonl_reviews(file_path, limit=None, progress=None, checkpoint_name=None):
+    """Import reviews from a JSON Lines file (one review object per line), streaming it"""
+    logger.info(f"Importing reviews from JSON Lines file: {file_path}")
+    return import_reviews(read_jsonl_reviews(file_path, limit), progress, checkpoint_name)
+
+def read_csv_reviews(file_path, limit=None):
+    """Review dicts from a Datafiniti CSV file, read one row at a time"""
     with open(file_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         for i, row in enumerate(reader):
@@ -94,6 +99,7 @@ def import_csv_reviews(file_path, limit=None):
                     'product_description': row.get('description', ''),
                     'price': float(row.get('price', 0)) if row.get('price') and row.get('price').strip() else None,
                     'category': row.get('categories', '').split(',')[0].strip() if row.get('categories') else 'Uncategorized',
+                    'categories': row.get('categories', ''),  # Full path, for the category hierarchy
                     'review_text': row.get('reviews.text', '').strip(),
                     'reviewer_name': row.get('reviews.username', 'Anonymous'),
                     'rating': float(row.get('reviews.rating', 3.0)),  # Default to neutral rating
@@ -104,79 +110,160 @@ def import_csv_reviews(file_path, limit=None):
                 if not review['asin'] or not review['product_title'] or not review['review_text']:
                     continue
                     
-                reviews.append(review)
+                yield review
             except Exception as e:
                 logger.error(f"Error processing row: {str(e)}")
                 continue
-    
-    import_reviews(reviews)
 
-def clean_text(text):
-    """Clean text data from common issues in Amazon reviews datasets"""
-    if not text:
-        return ""
-    
-    # Make sure we're working with a string
-    if not isinstance(text, str):
-        try:
-            text = str(text)
-        except:
-            return ""
-    
-    # Decode HTML entities
-    text = html.unescape(text)
-    
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', ' ', text)
-    
-    # Replace multiple spaces, newlines, and tabs with a single space
-    text = re.sub(r'\s+', ' ', text)
+def import_csv_reviews(file_path, limit=None, progress=None, checkpoint_name=None):
+    """Import reviews from a CSV file, streaming it"""
+    logger.info(f"Importing reviews from CSV file: {file_path}")
+    return import_reviews(read_csv_reviews(file_path, limit), progress, checkpoint_name)
+
+# Records cleaned, scored and committed (with the checkpoint) per transaction
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+
+def resolve_products(products, product_ids, stats):
+    """
+    Map each record's product to its ID, inserting new products (ON CONFLICT DO NOTHING)
+
+    Args:
+        products: Cleaned product dicts (with category_path), one per prepared record
+        product_ids: ASIN -> product ID cache shared across batches (updated)
+        stats: Import stats (products_created / products_skipped per record)
+    """
+    missing = {p["asin"] for p in products} - product_ids.keys()
+    if missing:
+        product_ids.update(db.session.execute(
+            select(Product.asin, Product.id).where(Product.asin.in_(missing))).all())
     
-    # Remove BOM character
-    text = text.replace('\ufeff', '')
+    new_products = {}
+    for product in products:
+        if product["asin"] not in product_ids:
+            new_products.setdefault(product["asin"], product)
     
-    # Remove non-breaking spaces and other invisible characters
-    text = text.replace('\xa0', ' ')
+    # Canonical categories (and their parents) of the new products
+    category_ids = ensure_categories(db.session, [p["category_path"] for p in new_products.values()])
+    rows = [
+        {**{k: v for k, v in product.items() if k != "category_path"},
+         "category_id": category_ids.get(category_key(product["category"]))}
+        for product in new_products.values()
+    ]
+    created = insert_ignoring_conflicts(db.session, Product, rows, ["asin"],
+                                        returning=(Product.asin, Product.id))
+    product_ids.update(created)
+    created_asins = {asin for asin, _ in created}
+    if len(created) < len(new_products):
+        # Inserted concurrently by another importer
+        product_ids.update(db.session.execute(
+            select(Product.asin, Product.id).where(Product.asin.in_(new_products.keys() - created_asins))).all())
     
-    # Remove leading/trailing whitespace
-    text = text.strip()
+    for product in products:
+        if product["asin"] in created_asins:
+            stats['products_created'] += 1
+            created_asins.discard(product["asin"])
+        else:
+            stats['products_skipped'] += 1
+
+def import_batch(prepared, product_ids, stats):
+    """Write one batch of prepared records (not committed)"""
+    resolve_products([record["product"] for record in prepared], product_ids, stats)
     
-    # Replace escaped quotes
-    text = text.replace('\\"', '"')
+    # One query finds the reviews that already exist, so they are neither scored nor inserted again
+    candidates = [(product_ids[r["product"]["asin"]], r["review"]) for r in prepared if r["review"] is not None]
+    pairs = {(product_id, review["dedupe_key"]) for product_id, review in candidates}
+    existing = set(db.session.execute(
+        select(Review.product_id, Review.dedupe_key)
+        .where(tuple_(Review.product_id, Review.dedupe_key).in_(pairs))).all()) if pairs else set()
     
-    # Remove excessive punctuation repetition
-    text = re.sub(r'([!?.])\\1+', r'\1', text)
+    rows = []
+    for product_id, review in candidates:
+        if (product_id, review["dedupe_key"]) in existing:
+            logger.debug(f"Duplicate review for product {product_id}")
+            stats['reviews_skipped'] += 1
+            continue
+        existing.add((product_id, review["dedupe_key"]))
+        
+        # Analyze sentiment
+        sentiment_score = analyze_sentiment(review["analysis_text"], preprocessed=True)
+        sentiment_class = classify_sentiment(sentiment_score)
+        sentiment_keywords = get_sentiment_keywords(review["text"], sentiment_class)
+        rows.append({
+            "product_id": product_id,
+            "author": review["author"],
+            "text": review["text"],
+            "rating": review["rating"],
+            "date": review["date"],
+            "sentiment_score": sentiment_score,
+            "sentiment_class": sentiment_class,
+            "sentiment_keywords": sentiment_keywords,
+            "analyzer_version": ANALYZER_VERSION,
+            "dedupe_key": review["dedupe_key"],
+        })
     
-    # Remove weird control characters
-    text = ''.join(c if ord(c) >= 32 else ' ' for c in text)
+    inserted = set(insert_ignoring_conflicts(db.session, Review, rows, ["product_id", "dedupe_key"],
+                                             returning=(Review.product_id, Review.dedupe_key)))
+    stats['reviews_created'] += len(inserted)
+    stats['reviews_skipped'] += len(rows) - len(inserted)
     
-    return text
+    # Keep the product sentiment scores, timeline rollups and aspect summaries
+    # current in the same transaction, so a resumed import has nothing to redo
+    aspect_rows = []
+    for row in rows:
+        if (row["product_id"], row["dedupe_key"]) in inserted:
+            record_review_change(db.session, row["product_id"], row["date"],
+                                 new=(row["sentiment_score"], row["sentiment_class"]))
+            aspect_rows.extend(aspect_deltas(row["product_id"],
+                                             new=(row["sentiment_score"], row["sentiment_keywords"])))
+    apply_aspect_deltas(db.session, aspect_rows)
+    touched = {product_id for product_id, _ in inserted}
+    if touched:
+        apply_sentiment_distribution(db.session, ReviewSnapshot.from_database(db.session, touched))
 
-def clean_number(value):
-    """Clean and convert numeric values"""
-    if not value:
-        return None
-        
-    if isinstance(value, (int, float)):
-        return float(value)
-        
-    if isinstance(value, str):
-        # Remove currency symbols and commas
-        value = re.sub(r'[$,£€]', '', value)
-        
-        # Extract the first number found
-        match = re.search(r'([-+]?\d*\.?\d+)', value)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                return None
-    
-    return None
+def import_records_individually(prepared, product_ids, stats):
+    """
+    Write a batch's records one savepoint each, after the batch as a whole
+    failed, so only the records that fail are counted as errors and lost
 
-def import_reviews(reviews_data):
-    """Process and import reviews into the database"""
-    logger.info(f"Processing {len(reviews_data)} reviews")
+    Returns:
+        The stats including the batch
+    """
+    for record in prepared:
+        record_stats = dict(stats)
+        try:
+            with db.session.begin_nested():
+                import_batch([record], product_ids, record_stats)
+            stats = record_stats
+        except Exception as e:
+            # Products created in the rolled back savepoint may be cached
+            product_ids.clear()
+            asin = record["product"]["asin"]
+            logger.error(f"Error saving record for ASIN {asin}: {str(e)}")
+            stats['errors'] += 1
+    return stats
+
+def import_reviews(reviews_data, progress=None, checkpoint_name=None):
+    """
+    Process and import reviews into the database
+
+    Reviews are written in batches of IMPORT_BATCH_SIZE. Products and reviews
+    that already exist (by ASIN, and by product and review_dedupe_key) are
+    skipped without being scored again, so re-running an import is safe. A
+    batch that fails is written again one record at a time, and only the
+    records that still fail are counted as errors.
+
+    Args:
+        reviews_data: List or iterator of review dicts; an iterator is read
+            one batch at a time
+        progress: Optional callable(done, total) called before each batch; it may raise
+            to stop the import (used by background jobs for progress and cancellation).
+            total is None when reviews_data is an iterator.
+        checkpoint_name: Optional JobCheckpoint name. The number of records done and the
+            stats are saved with every batch, and an unfinished import with the same
+            name resumes after its last committed batch.
+    """
+    total = len(reviews_data) if isinstance(reviews_data, (list, tuple)) else None
+    logger.info(f"Processing {total} reviews" if total is not None else "Processing reviews")
     
     # Track stats
     stats = {
@@ -189,217 +276,141 @@ def import_reviews(reviews_data):
     }
     
     with app.app_context():
-        # Process each review
-        for review_data in tqdm(reviews_data, desc="Importing reviews"):
+        checkpoint = None
+        start = 0
+        if checkpoint_name:
+            checkpoint = get_checkpoint(db.session, checkpoint_name)
+            if checkpoint.position and checkpoint.completed_at is None:
+                start = int(checkpoint.position)
+                stats.update(checkpoint_state(checkpoint))
+                logger.info(f"Resuming import after record {start}")
+            else:
+                checkpoint.position = "0"
+                checkpoint.processed = 0
+                checkpoint.completed_at = None
+            db.session.commit()
+        
+        # Records of the committed batches are read past without being kept
+        records = iter(reviews_data)
+        for _ in islice(records, start):
+            pass
+        
+        product_ids = {}
+        progress_bar = tqdm(desc="Importing reviews", initial=start, total=total)
+        batch_start = start
+        while True:
+            batch = list(islice(records, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+            if progress is not None:
+                progress(batch_start, total)
+            batch_end = batch_start + len(batch)
+            
+            # Clean the whole batch column-wise, then write it in one transaction
+            prepared = [record for record in prepare_reviews(batch, stats) if record is not None]
+            batch_stats = dict(stats)
             try:
-                # Extract product data and handle BOM character
-                asin = review_data.get('asins') or review_data.get('\ufeffasins') or review_data.get('asin') or review_data.get('product_id')
-                product_title = review_data.get('name') or review_data.get('product_title') or review_data.get('product_name') or review_data.get('title')
-                
-                # Clean up ASIN if it's a list
-                if isinstance(asin, str) and ',' in asin:
-                    asin = asin.split(',')[0].strip()
-                
-                # Clean up data
-                if asin:
-                    asin = asin.strip().upper()  # ASINs are typically uppercase
-                
-                # Clean product title and description
-                product_title = clean_text(product_title)
-                product_description = clean_text(review_data.get('product_description') or review_data.get('description') or '')
-                
-                if not asin or not product_title:
-                    logger.warning(f"Missing required product data. ASIN: {asin}, Title: {product_title}")
-                    stats['errors'] += 1
-                    continue
-                
-                # Check if product exists
-                product = Product.query.filter_by(asin=asin).first()
-                
-                if not product:
-                    # Create new product
-                    product = Product(
-                        asin=asin,
-                        name=product_title,
-                        description=product_description,
-                        price=clean_number(review_data.get('price')),
-                        category=clean_text(review_data.get('category') or '')
-                    )
-                    db.session.add(product)
-                    try:
-                        db.session.commit()
-                        stats['products_created'] += 1
-                    except IntegrityError:
-                        db.session.rollback()
-                        logger.warning(f"Duplicate product: {asin}")
-                        product = Product.query.filter_by(asin=asin).first()
-                        stats['products_skipped'] += 1
-                else:
-                    stats['products_skipped'] += 1
-                
-                # Extract and clean review data from various formats
-                review_text = clean_text(review_data.get('reviews.text') or review_data.get('review_text') or review_data.get('reviewText') or review_data.get('text') or '')
-                reviewer_name = clean_text(review_data.get('reviews.username') or review_data.get('reviewer_name') or review_data.get('reviewerName') or review_data.get('author') or 'Anonymous')
-                
-                # Clean rating value (1-5 stars)
-                raw_rating = review_data.get('reviews.rating') or review_data.get('rating') or review_data.get('star_rating') or review_data.get('overall') or 0
-                rating = clean_number(raw_rating)
-                if rating is not None:
-                    # Ensure rating is between 1-5
-                    rating = max(1, min(5, rating))
-                else:
-                    rating = 3.0  # Default to neutral rating
-                
-                # Clean and parse review date
-                review_date_str = review_data.get('reviews.date') or review_data.get('review_date') or review_data.get('reviewTime') or review_data.get('date')
-                review_date = parse_date(review_date_str) if review_date_str else None
-                
-                if not review_text or len(review_text) < 5:  # Skip very short reviews
-                    logger.warning(f"Missing or too short review text for product {asin}")
-                    stats['errors'] += 1
-                    continue
-                    
-                # Log that we cleaned some data
-                stats['cleaned_data'] += 1
-                
-                # Check if review already exists (simple check - real implementation might be more complex)
-                existing_review = Review.query.filter_by(
-                    product_id=product.id, 
-                    author=reviewer_name, 
-                    text=review_text
-                ).first()
-                
-                if existing_review:
-                    logger.debug(f"Duplicate review for product {asin}")
-                    stats['reviews_skipped'] += 1
-                    continue
-                
-                # Analyze sentiment
-                sentiment_score = analyze_sentiment(review_text)
-                sentiment_class = classify_sentiment(sentiment_score)
-                sentiment_keywords = get_sentiment_keywords(review_text, sentiment_class)
-                
-                # Create new review
-                review = Review(
-                    product_id=product.id,
-                    author=reviewer_name,
-                    text=review_text,
-                    rating=rating,
-                    date=review_date,
-                    sentiment_score=sentiment_score,
-                    sentiment_class=sentiment_class,
-                    sentiment_keywords=json.dumps(sentiment_keywords)
-                )
-                
-                db.session.add(review)
-                try:
-                    db.session.commit()
-                    stats['reviews_created'] += 1
-                except IntegrityError:
-                    db.session.rollback()
-                    logger.warning(f"Error saving review: {sys.exc_info()[0]}")
-                    stats['reviews_skipped'] += 1
-                
+                import_batch(prepared, product_ids, batch_stats)
+                stats = batch_stats
             except Exception as e:
                 db.session.rollback()
-                logger.error(f"Error processing review: {str(e)}")
-                stats['errors'] += 1
+                product_ids.clear()
+                logger.error(f"Error saving batch ending at record {batch_end}, "
+                             f"retrying its records one at a time: {str(e)}")
+                stats = import_records_individually(prepared, product_ids, stats)
+            if checkpoint is not None:
+                checkpoint.position = str(batch_end)
+                checkpoint.processed = batch_end
+                checkpoint.state = json.dumps(stats)
+            db.session.commit()
+            progress_bar.update(batch_end - batch_start)
+            batch_start = batch_end
+        progress_bar.close()
+        
+        if checkpoint is not None:
+            checkpoint.completed_at = datetime.utcnow()
+            db.session.commit()
     
     logger.info(f"Import complete. Stats: {stats}")
     return stats
 
-def normalize_reviews_text():
-    """Clean and normalize existing review text in the database"""
-    logger.info("Normalizing existing review text...")
-    
-    with app.app_context():
-        reviews = Review.query.all()
-        
-        updated_count = 0
-        for review in tqdm(reviews, desc="Normalizing reviews"):
-            # Clean text and check if anything changed
-            original_text = review.text
-            cleaned_text = clean_text(original_text)
-            
-            if original_text != cleaned_text:
-                review.text = cleaned_text
-                
-                # Recalculate sentiment with cleaned text
-                sentiment_score = analyze_sentiment(cleaned_text)
-                sentiment_class = classify_sentiment(sentiment_score)
-                sentiment_keywords = get_sentiment_keywords(cleaned_text, sentiment_class)
-                
-                review.sentiment_score = sentiment_score
-                review.sentiment_class = sentiment_class
-                review.sentiment_keywords = json.dumps(sentiment_keywords)
-                
-                db.session.add(review)
-                updated_count += 1
-        
-        if updated_count > 0:
-            db.session.commit()
-            logger.info(f"Normalized text for {updated_count} reviews")
-        else:
-            logger.info("No reviews needed text normalization")
-
 def update_sentiment_scores():
-    """Update sentiment score caches for all products"""
+    """
+    Update sentiment score caches for all products
+
+    Imports keep the scores of the products they add reviews to current; this
+    full pass is for scores changed outside the importer.
+    """
     logger.info("Updating product sentiment scores")
     
     with app.app_context():
-        products = Product.query.all()
-        
-        for product in tqdm(products, desc="Updating sentiment scores"):
-            reviews = Review.query.filter_by(product_id=product.id).all()
-            
-            if not reviews:
-                continue
-            
-            # Calculate sentiment distribution
-            positive = sum(1 for r in reviews if r.sentiment_class == 'positive')
-            neutral = sum(1 for r in reviews if r.sentiment_class == 'neutral')
-            negative = sum(1 for r in reviews if r.sentiment_class == 'negative')
-            total = len(reviews)
-            
-            # Update product sentiment scores
-            product.positive_score = positive / total if total > 0 else 0
-            product.neutral_score = neutral / total if total > 0 else 0
-            product.negative_score = negative / total if total > 0 else 0
-            
-            db.session.add(product)
-        
+        # Aggregate over the columnar review snapshot instead of loading Review objects
+        snapshot = ReviewSnapshot.from_database(db.session)
+        updated = apply_sentiment_distribution(db.session, snapshot)
         db.session.commit()
-        logger.info(f"Updated sentiment scores for {len(products)} products")
+        
+        if REVIEW_SNAPSHOT_PATH:
+            snapshot.save(REVIEW_SNAPSHOT_PATH)
+        logger.info(f"Updated sentiment scores for {updated} products")
+
+IMPORT_FORMATS = ('csv', 'json', 'jsonl')
+
+def detect_format(file_path):
+    """File format from the file extension, or None if it is not recognised"""
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    return extension if extension in IMPORT_FORMATS else None
+
+def import_checkpoint_name(file_path, limit=None):
+    """Checkpoint name identifying an import of this version of a file"""
+    info = os.stat(file_path)
+    identity = f"{os.path.abspath(file_path)}|{info.st_size}|{info.st_mtime_ns}|{limit}"
+    return f"import:{os.path.basename(file_path)[:80]}:{hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]}"
+
+def import_file(file_path, file_format=None, limit=None, progress=None, resume=True):
+    """
+    Import a reviews file
+
+    Reviews are cleaned and scored as they are inserted, and each batch updates
+    the sentiment scores, rollups and aspect summaries of the products it adds
+    reviews to, so nothing is recomputed over the whole table afterwards.
+    With resume, an interrupted import of the same (unchanged) file continues
+    after its last committed batch instead of starting over.
+
+    Returns:
+        Import stats from import_reviews
+    """
+    file_format = file_format or detect_format(file_path)
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError("Could not determine file format. Please specify --format")
+    checkpoint_name = import_checkpoint_name(file_path, limit)
+    if not resume:
+        with app.app_context():
+            get_checkpoint(db.session, checkpoint_name).position = None
+            db.session.commit()
+    
+    # Import reviews
+    if file_format == 'json':
+        stats = import_json_reviews(file_path, limit, progress, checkpoint_name)
+    elif file_format == 'jsonl':
+        stats = import_jsonl_reviews(file_path, limit, progress, checkpoint_name)
+    else:
+        stats = import_csv_reviews(file_path, limit, progress, checkpoint_name)
+    return stats
 
 if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Import Amazon reviews data')
-    parser.add_argument('file_path', type=str, help='Path to the reviews data file (CSV or JSON)')
-    parser.add_argument('--format', type=str, choices=['csv', 'json'], help='File format (csv or json)')
+    parser.add_argument('file_path', type=str, help='Path to the reviews data file (CSV, JSON or JSON Lines)')
+    parser.add_argument('--format', type=str, choices=IMPORT_FORMATS, help='File format (csv, json or jsonl)')
     parser.add_argument('--limit', type=int, help='Limit the number of reviews to import')
+    parser.add_argument('--restart', action='store_true',
+                        help='Start from the first review even if an earlier import of the file was interrupted')
     
     args = parser.parse_args()
     
-    # Determine format from file extension if not specified
-    file_format = args.format
-    if not file_format:
-        if args.file_path.lower().endswith('.json'):
-            file_format = 'json'
-        elif args.file_path.lower().endswith('.csv'):
-            file_format = 'csv'
-        else:
-            print("Error: Could not determine file format. Please specify --format")
-            sys.exit(1)
-    
-    # Import reviews
-    if file_format == 'json':
-        import_json_reviews(args.file_path, args.limit)
-    else:
-        import_csv_reviews(args.file_path, args.limit)
-    
-    # Clean and normalize review text
-    normalize_reviews_text()
-    
-    # Update sentiment scores
-    update_sentiment_scores()
\ No newline at end of file
+    try:
+        import_file(args.file_path, args.format, args.limit, resume=not args.restart)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
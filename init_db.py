@@ -34,6 +34,8 @@ logger.info("Imported Flask app and models")
 with app.app_context():
     logger.info("Creating database tables...")
     db.create_all()
+    from backend.schema_upgrades import upgrade_schema
+    upgrade_schema(db.engine)
     logger.info("Database tables created successfully!")
     
     # Check if User table exists and was created properly
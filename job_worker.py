@@ -0,0 +1,81 @@
+"""
+Background Job Worker
+
+This script runs local worker processes for the job queue (see
+backend/job_queue.py). Workers pick up imports, cleanups and re-scoring runs
+submitted through the admin endpoints (/api/jobs) or with --submit, report
+their progress and honour cancellation.
+
+Run it next to the API server, e.g.:
+    python job_worker.py --workers 2
+
+On SIGTERM or Ctrl+C, running jobs are re-queued and the workers exit.
+"""
+
+import logging
+import multiprocessing
+import signal
+import sys
+import os
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('job_worker')
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, db
+from backend.job_queue import JOB_HANDLERS, POLL_INTERVAL, job_dict, run_worker, submit_job
+
+
+def _worker_main(poll_interval):
+    run_worker(poll_interval=poll_interval)
+
+
+def run_workers(num_workers=1, poll_interval=POLL_INTERVAL):
+    """Run job workers until interrupted (in this process when num_workers is 1)"""
+    if num_workers <= 1:
+        run_worker(poll_interval=poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_main, args=(poll_interval,), name=f"job-worker-{i}")
+        for i in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def stop(*_):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Run background job workers')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help='Seconds between polls when the queue is empty')
+    parser.add_argument('--submit', type=str, choices=sorted(JOB_HANDLERS),
+                        help='Queue a job of this kind instead of running workers')
+    parser.add_argument('--params', type=str, default='{}',
+                        help='JSON parameters for --submit, e.g. \'{"file_path": "data/reviews.csv"}\'')
+
+    args = parser.parse_args()
+
+    if args.submit:
+        with app.app_context():
+            db.create_all()
+            job = submit_job(db.session, args.submit, json.loads(args.params))
+            print(json.dumps(job_dict(job), indent=2))
+    else:
+        run_workers(args.workers, args.poll_interval)
@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 import nltk
-from flask import send_from_directory, request
+from flask import abort
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -16,16 +16,30 @@ except Exception as e:
 
 # Import the Flask app from app.py in the root directory
 from app import app
+from backend.static_assets import StaticManifest
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'public')
+
+# Frontend files are read, hashed and precompressed once (see backend/static_assets.py)
+static_manifest = StaticManifest(STATIC_DIR)
+
+# Precompute the most popular products' responses before serving (see backend/warmup.py)
+from backend.warmup import WARMUP_PRODUCTS, warm_product_cache
+if WARMUP_PRODUCTS > 0:
+    from app import db
+    warm_product_cache(app, db)
 
 # Serve React frontend static files
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    """Serve React frontend static files"""
-    if path != "" and os.path.exists(os.path.join('frontend/public', path)):
-        return send_from_directory('frontend/public', path)
-    else:
-        return send_from_directory('frontend/public', 'index.html')
+    """Serve React frontend static files from the in-memory manifest"""
+    if app.debug:
+        static_manifest.reload_if_changed()
+    response = static_manifest.response(path)
+    if response is None:
+        abort(404)
+    return response
 
 if __name__ == "__main__":
     # Run the backend Flask app
@@ -1,7 +1,11 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from backend.password_hashing import hash_password, verify_password
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Native JSON column (JSONB on PostgreSQL); None is stored as SQL NULL, not JSON null
+KEYWORDS_JSON = db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
 
 
 class User(UserMixin, db.Model):
@@ -16,17 +20,38 @@ class User(UserMixin, db.Model):
     saved_products = db.relationship('UserSavedProduct', backref='user', lazy='dynamic')
 
     def set_password(self, password):
-        """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        """Set password hash (may raise PasswordHashingBusy)"""
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
-        """Check password against hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check password against hash (may raise PasswordHashingBusy)"""
+        return verify_password(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
 
 
+class Category(db.Model):
+    """Canonical product category, built by the importer (see backend/categories.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(128), unique=True, nullable=False)  # category_key(name): spellings sharing it are one category
+    name = db.Column(db.String(128), nullable=False)  # First spelling imported
+    parent_id = db.Column(db.Integer, db.ForeignKey('category.id'), index=True)
+
+    def __repr__(self):
+        return f'<Category {self.name}>'
+
+
+class CategorySimilarity(db.Model):
+    """Category points of a candidate in similar_id for a base product in category_id (both directions stored)"""
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    similar_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f'<CategorySimilarity {self.category_id} - {self.similar_id}>'
+
+
 class Product(db.Model):
     """Product model to store product information"""
     id = db.Column(db.Integer, primary_key=True)
@@ -35,6 +60,7 @@ class Product(db.Model):
     description = db.Column(db.Text)
     price = db.Column(db.Float)
     category = db.Column(db.String(128))
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), index=True)  # Canonical category
     image_url = db.Column(db.String(512))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -65,7 +91,11 @@ class Review(db.Model):
     # Sentiment analysis results
     sentiment_score = db.Column(db.Float)  # 0-1 score where 1 is positive
     sentiment_class = db.Column(db.String(16))  # positive, neutral, negative
-    sentiment_keywords = db.Column(db.Text)  # JSON list of keywords
+    sentiment_keywords = db.Column(KEYWORDS_JSON)  # List of keyword dicts from get_sentiment_keywords
+    analyzer_version = db.Column(db.Integer, index=True)  # ANALYZER_VERSION that produced the scores
+    dedupe_key = db.Column(db.String(40))  # review_dedupe_key(author, text), unique per product
+    
+    __table_args__ = (db.Index('uq_review_dedupe', 'product_id', 'dedupe_key', unique=True),)
     
     def __repr__(self):
         return f'<Review for Product {self.product_id}>'
@@ -81,4 +111,87 @@ class UserSavedProduct(db.Model):
     __table_args__ = (db.UniqueConstraint('user_id', 'product_id'),)
     
     def __repr__(self):
-        return f'<UserSavedProduct {self.user_id} - {self.product_id}>'
\ No newline at end of file
+        return f'<UserSavedProduct {self.user_id} - {self.product_id}>'
+
+class ProductSentimentRollup(db.Model):
+    """Per-product review sentiment counts for one week or month, maintained on import"""
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    bucket = db.Column(db.String(8), nullable=False)  # week, month
+    period_start = db.Column(db.Date, nullable=False)  # Monday of the week / first of the month
+
+    positive_count = db.Column(db.Integer, nullable=False, default=0)
+    neutral_count = db.Column(db.Integer, nullable=False, default=0)
+    negative_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)  # Sum of sentiment scores, for the mean
+
+    __table_args__ = (db.UniqueConstraint('product_id', 'bucket', 'period_start'),)
+
+    def __repr__(self):
+        return f'<ProductSentimentRollup {self.product_id} {self.bucket} {self.period_start}>'
+
+
+class ProductAspect(db.Model):
+    """Keyword mentions in a product's strongly positive or negative reviews, maintained on import"""
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    polarity = db.Column(db.String(8), nullable=False)  # positive, negative
+    keyword = db.Column(db.String(64), nullable=False)
+    category = db.Column(db.String(32))
+    mention_count = db.Column(db.Integer, nullable=False, default=0)
+    example_context = db.Column(db.Text)  # Review snippet around one mention
+
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'polarity', 'keyword'),
+        db.Index('ix_product_aspect_ranking', 'product_id', 'polarity', 'mention_count'),
+        # Inverted index: products mentioning a keyword or category (see /api/aspects/<keyword>)
+        db.Index('ix_product_aspect_keyword', 'keyword', 'polarity', 'mention_count'),
+        db.Index('ix_product_aspect_category', 'category', 'polarity'),
+    )
+
+    def __repr__(self):
+        return f'<ProductAspect {self.product_id} {self.polarity} {self.keyword}>'
+
+
+class JobCheckpoint(db.Model):
+    """Progress of a resumable batch job, so an interrupted run continues where it stopped"""
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(128), unique=True, nullable=False)
+    position = db.Column(db.String(256))  # Job-specific resume position, e.g. last processed ID
+    state = db.Column(db.Text)  # JSON of job-specific state saved with the position, e.g. running stats
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    completed_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<JobCheckpoint {self.job_name} at {self.position}>'
+
+
+class Job(db.Model):
+    """Background job run by job_worker.py (see backend/job_queue.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)  # import, cleanup, rescore
+    params = db.Column(db.Text)  # JSON object of handler arguments
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued, running, succeeded, failed, cancelled
+
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    message = db.Column(db.String(256))
+    result = db.Column(db.Text)  # JSON returned by the handler
+    error = db.Column(db.Text)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    worker = db.Column(db.String(64))  # host:pid of the worker running it
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Delays retries
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index('ix_job_queue', 'status', 'run_after', 'id'),)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
@@ -0,0 +1,56 @@
+"""
+Review Re-scoring Job
+
+This script re-scores reviews whose sentiment was produced by an older version
+of the sentiment analyzer (see ANALYZER_VERSION in backend/sentiment_analyzer.py),
+or by no recorded version, and updates the product sentiment scores, sentiment
+timeline rollups and aspect summaries of the affected products.
+
+Reviews are processed in chunks scored by low-priority worker processes and
+written in short transactions, with a checkpoint after every chunk. The app can
+keep serving while the job runs, and an interrupted run continues where it
+stopped when started again.
+"""
+
+import logging
+import sys
+import os
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('review_rescorer')
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, db
+from backend.rescoring import CHUNK_SIZE, PAUSE, WORKERS, count_stale_reviews, rescore_stale_reviews
+from backend.sentiment_analyzer import ANALYZER_VERSION
+
+
+def rescore_reviews(chunk_size=CHUNK_SIZE, workers=WORKERS, pause=PAUSE, reset=False, limit=None, dry_run=False):
+    """Re-score stale reviews, returning the job statistics"""
+    with app.app_context():
+        stale = count_stale_reviews(db.session)
+        logger.info(f"{stale} reviews not scored by analyzer version {ANALYZER_VERSION}")
+        if dry_run:
+            return {"analyzer_version": ANALYZER_VERSION, "stale_reviews": stale}
+        return rescore_stale_reviews(db.session, chunk_size=chunk_size, workers=workers, pause=pause,
+                                     reset=reset, limit=limit)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Re-score reviews produced by an older sentiment analyzer')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Reviews scored and written per transaction')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Scoring processes (0 scores in this process)')
+    parser.add_argument('--pause', type=float, default=PAUSE, help='Seconds to sleep after each chunk')
+    parser.add_argument('--limit', type=int, help='Stop after about this many reviews')
+    parser.add_argument('--reset', action='store_true', help='Ignore the saved checkpoint and start from the first review')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the stale reviews')
+
+    args = parser.parse_args()
+
+    stats = rescore_reviews(args.chunk_size, args.workers, args.pause, args.reset, args.limit, args.dry_run)
+    print(stats)
@@ -0,0 +1,35 @@
+"""
+Test configuration
+
+The app reads its settings from the environment when it is first imported,
+so a scratch database and metrics directory are set here, before any test
+module imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_DIR)
+
+_workdir = tempfile.mkdtemp(prefix="sentiment_tests_")
+os.environ["FLASK_CONFIG"] = "testing"
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["METRICS_DIR"] = os.path.join(_workdir, "metrics")
+# Every request computes its response, so the apps are compared rather than the cache
+os.environ["PRODUCT_CACHE_TTL"] = "0"
+
+
+@pytest.fixture(scope="module")
+def database():
+    """Empty tables for a test module, with an app context held for its tests"""
+    from app import app, db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
@@ -0,0 +1,72 @@
+"""Admission control (backend/admission.py) through the Flask test client"""
+
+import pytest
+
+from backend import admission
+from backend.admission import AdmissionPolicy
+from backend.product_cache import product_cache
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    from app import app
+    from benchmarks.catalog import seed_catalog
+
+    seed_catalog(database, 3, 4)
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def admission_control(client, monkeypatch):
+    from app import app
+
+    monkeypatch.setitem(app.config, "ADMISSION_CONTROL", True)
+    buckets, slots = admission.create_backend("memory")
+    monkeypatch.setattr(admission, "_buckets", buckets)
+    monkeypatch.setattr(admission, "_slots", slots)
+    monkeypatch.setattr(product_cache, "ttl", 60)
+    product_cache.clear()
+    yield slots
+    product_cache.clear()
+
+
+def test_empty_token_bucket_gets_429(client, monkeypatch):
+    monkeypatch.setitem(admission.POLICIES, "analyze", AdmissionPolicy(max_concurrent=0, rate=0.1, burst=2))
+
+    for _ in range(2):
+        assert client.post("/api/analyze", json={"text": "Works well"}).status_code == 200
+    response = client.post("/api/analyze", json={"text": "Works well"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert response.get_json() == {"error": "Rate limit exceeded"}
+
+
+def test_full_concurrency_slots_get_503(client, admission_control, monkeypatch):
+    monkeypatch.setitem(admission.POLICIES, "product_detail", AdmissionPolicy(max_concurrent=1, rate=0, burst=0))
+
+    busy = admission_control.acquire("product_detail", 1)
+    try:
+        response = client.get("/api/products/1")
+    finally:
+        admission_control.release("product_detail", busy)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admission.ADMISSION_RETRY_AFTER)
+
+    assert client.get("/api/products/1").status_code == 200
+
+
+def test_cache_hits_bypass_admission(client, admission_control, monkeypatch):
+    monkeypatch.setitem(admission.POLICIES, "product_detail", AdmissionPolicy(max_concurrent=1, rate=0.1, burst=1))
+
+    assert client.get("/api/products/2").status_code == 200
+    busy = admission_control.acquire("product_detail", 1)
+    try:
+        # Hits take no slot and spend no token, though the first request spent the only one
+        cached = [client.get("/api/products/2") for _ in range(3)]
+        uncached = client.get("/api/products/3")
+    finally:
+        admission_control.release("product_detail", busy)
+
+    assert [response.status_code for response in cached] == [200] * 3
+    assert cached[0].get_json()["id"] == 2
+    assert uncached.status_code == 429
@@ -0,0 +1,86 @@
+"""Limit query parameters are validated and capped"""
+
+import pytest
+
+PRODUCTS = 30
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    from app import app
+    from benchmarks.catalog import seed_catalog
+
+    seed_catalog(database, PRODUCTS, 3)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_aspect_limit_below_one_is_rejected(client, limit):
+    response = client.get(f"/api/aspects/quality?field=category&limit={limit}")
+    assert response.status_code == 400
+
+
+def test_aspect_limit_is_capped(client, monkeypatch):
+    from backend import app as api
+
+    monkeypatch.setattr(api, "MAX_ASPECT_PRODUCTS", 4)
+    response = client.get("/api/aspects/satisfaction?field=category&limit=1000000")
+    assert response.status_code == 200
+    assert len(response.get_json()["products"]) == 4
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_recommendations_limit_below_one_is_rejected(client, limit):
+    response = client.get(f"/api/products/1/recommendations?limit={limit}")
+    assert response.status_code == 400
+
+
+def test_recommendations_limit_is_capped_before_the_cache_key(client, monkeypatch):
+    from backend import app as api
+    from backend.product_cache import product_cache
+
+    monkeypatch.setattr(api, "MAX_RECOMMENDATIONS", 4)
+    keys = []
+    get_or_compute = product_cache.get_or_compute
+
+    def recording(key, *args):
+        keys.append(key)
+        return get_or_compute(key, *args)
+
+    monkeypatch.setattr(product_cache, "get_or_compute", recording)
+    for limit in (4, 50, 10 ** 9):
+        response = client.get(f"/api/products/1/recommendations?limit={limit}")
+        assert response.status_code == 200
+        assert len(response.get_json()["recommendations"]) == 4
+    assert keys == [("recommendations", 1, 4)] * 3
+
+
+@pytest.fixture
+def user(client):
+    client.post("/api/auth/register", json={"username": "limits", "email": "limits@example.com",
+                                            "password": "limits-password"})
+    client.post("/api/auth/login", json={"username": "limits", "password": "limits-password"})
+    yield client
+    client.post("/api/auth/logout")
+
+
+@pytest.mark.parametrize("path", ["/api/recommendations/for-me", "/api/recommendations/top-rated"])
+@pytest.mark.parametrize("limit", [0, -2])
+def test_top_rated_and_for_me_limits_below_one_are_rejected(user, path, limit):
+    assert user.get(f"{path}?limit={limit}").status_code == 400
+
+
+def test_top_rated_and_for_me_limits_are_capped(user, monkeypatch):
+    from backend import app as api
+
+    monkeypatch.setattr(api, "MAX_RECOMMENDATIONS", 3)
+    response = user.get("/api/recommendations/top-rated?limit=1000")
+    assert len(response.get_json()["top_rated"]) == 3
+    # Top-rated fallback, then personalized once a product is saved
+    for save in (False, True):
+        if save:
+            user.post("/api/products/1/save")
+        response = user.get("/api/recommendations/for-me?limit=1000")
+        assert response.status_code == 200
+        assert response.get_json()["personalized"] is save
+        assert len(response.get_json()["recommendations"]) == 3
@@ -0,0 +1,94 @@
+"""Aspect summaries maintained with apply_aspect_deltas match a rebuild from the reviews"""
+
+from sqlalchemy import delete, select
+
+from backend.aspect_summary import (
+    apply_aspect_deltas, aspect_deltas, get_aspect_summary, rebuild_aspect_summaries
+)
+from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment, get_sentiment_keywords
+
+POSITIVE = "Excellent quality, the battery life is amazing and I love the design"
+PRAISE = "Great sound, comfortable fit, love the battery"
+NEGATIVE = "Terrible quality, flimsy hinge and awful customer service, broke in a week"
+PLAIN = "It is a phone case. It arrived on Tuesday."
+
+
+def scored(text):
+    score = analyze_sentiment(text)
+    return score, get_sentiment_keywords(text, classify_sentiment(score))
+
+
+def add_review(db, product, text, deltas):
+    from models import Review
+
+    score, keywords = scored(text)
+    review = Review(product_id=product.id, text=text, sentiment_score=score, sentiment_keywords=keywords)
+    db.session.add(review)
+    deltas.extend(aspect_deltas(product.id, new=(score, keywords)))
+    return review
+
+
+def rescore(review, text, deltas):
+    score, keywords = scored(text)
+    deltas.extend(aspect_deltas(review.product_id, old=(review.sentiment_score, review.sentiment_keywords),
+                                new=(score, keywords)))
+    review.text, review.sentiment_score, review.sentiment_keywords = text, score, keywords
+
+
+def remove(db, review, deltas):
+    deltas.extend(aspect_deltas(review.product_id, old=(review.sentiment_score, review.sentiment_keywords)))
+    db.session.delete(review)
+
+
+def aspect_rows(db):
+    """Mention counts and categories of every aspect row, keyed by product, polarity and keyword"""
+    from models import ProductAspect
+
+    return {
+        (a.product_id, a.polarity, a.keyword): (a.category, a.mention_count)
+        for a in db.session.scalars(select(ProductAspect))
+    }
+
+
+def test_aspect_deltas_match_rebuild(database):
+    from models import Product, ProductAspect, Review
+
+    database.session.execute(delete(ProductAspect))
+    database.session.execute(delete(Review))
+    products = [Product(name=f"Aspect product {i}", asin=f"ASP{i}") for i in range(3)]
+    database.session.add_all(products)
+    database.session.flush()
+
+    # Each stage is applied as one batch, like an import batch or a re-scoring chunk
+    deltas = []
+    reviews = [add_review(database, products[i % 2], (POSITIVE, PRAISE, NEGATIVE, PLAIN)[i % 4], deltas)
+               for i in range(12)]
+    lone = add_review(database, products[2], NEGATIVE, deltas)
+    apply_aspect_deltas(database.session, deltas)
+    database.session.commit()
+
+    deltas = []
+    for review in reviews[:4]:
+        rescore(review, NEGATIVE if review.text in (POSITIVE, PRAISE) else PRAISE, deltas)
+    rescore(lone, PLAIN, deltas)
+    apply_aspect_deltas(database.session, deltas)
+    database.session.commit()
+
+    deltas = []
+    for review in reviews[8:11]:
+        remove(database, review, deltas)
+    add_review(database, products[1], PRAISE, deltas)
+    apply_aspect_deltas(database.session, deltas)
+    database.session.commit()
+
+    incremental = aspect_rows(database)
+    # The lone review's aspects fell to zero mentions: kept as rows, but not reported
+    emptied = [key for key, (_, count) in incremental.items() if count == 0]
+    assert any(product_id == products[2].id for product_id, _, _ in emptied)
+    assert get_aspect_summary(database.session, products[2].id) == {"positive": [], "negative": []}
+    assert all(count >= 0 for _, count in incremental.values())
+
+    rebuild_aspect_summaries(database.session)
+    rebuilt = aspect_rows(database)
+    assert rebuilt
+    assert {key: value for key, value in incremental.items() if value[1]} == rebuilt
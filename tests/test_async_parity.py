@@ -0,0 +1,80 @@
+"""The async read API returns the same responses as the Flask blueprint"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("aiosqlite")
+
+PRODUCTS = 12
+REVIEWS_PER_PRODUCT = 6
+
+
+@pytest.fixture(scope="module")
+def clients(database):
+    from app import app
+    from benchmarks.catalog import seed_catalog
+    from models import Product
+
+    seed_catalog(database, PRODUCTS, REVIEWS_PER_PRODUCT)
+    category = database.session.scalar(database.select(Product.category).limit(1))
+
+    from backend.async_app import app as async_app
+    return app.test_client(), async_app.test_client(), category
+
+
+def get_both(clients, path):
+    sync_client, async_client, _ = clients
+    sync_response = sync_client.get(path)
+
+    async def fetch():
+        response = await async_client.get(path)
+        return response.status_code, await response.get_json()
+
+    async_status, async_json = asyncio.run(fetch())
+    return (sync_response.status_code, sync_response.get_json()), (async_status, async_json)
+
+
+def test_product_list(clients):
+    sync_result, async_result = get_both(clients, "/api/products")
+    assert sync_result[0] == 200
+    assert len(sync_result[1]) == PRODUCTS
+    assert async_result == sync_result
+
+
+@pytest.mark.parametrize("product_id", [1, 5, PRODUCTS, 10000])
+def test_product_detail(clients, product_id):
+    sync_result, async_result = get_both(clients, f"/api/products/{product_id}")
+    assert async_result == sync_result
+
+
+@pytest.mark.parametrize("path", [
+    "/api/products/1/recommendations",
+    "/api/products/7/recommendations?limit=5",
+    "/api/products/10000/recommendations",
+    "/api/products/3/recommendations?limit=1000",
+])
+def test_recommendations(clients, path):
+    sync_result, async_result = get_both(clients, path)
+    assert sync_result[0] == 200
+    assert async_result == sync_result
+
+
+@pytest.mark.parametrize("path", [
+    "/api/products/1/recommendations?limit=0",
+    "/api/recommendations/top-rated?limit=-3",
+])
+def test_limit_below_one_is_rejected(clients, path):
+    sync_result, async_result = get_both(clients, path)
+    assert sync_result[0] == 400
+    assert async_result == sync_result
+
+
+def test_top_rated(clients):
+    category = clients[2]
+    for path in ("/api/recommendations/top-rated?limit=4", "/api/recommendations/top-rated?limit=1000",
+                 f"/api/recommendations/top-rated?category={category}"):
+        sync_result, async_result = get_both(clients, path)
+        assert sync_result[0] == 200
+        assert async_result == sync_result
@@ -0,0 +1,98 @@
+"""Canonical categories: taxonomy scores, the name fallback and category filters"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+import app  # noqa: F401  (imports the models before the modules that use them)
+from backend.categories import (
+    SAME_CATEGORY_SCORE, SIMILAR_CATEGORY_SCORE, category_filter, category_key, category_points,
+    ensure_categories, invalidate_category_taxonomy, load_category_taxonomy
+)
+
+PATHS = [
+    ("Headphones", "Audio", "Electronics"),
+    ("Speakers", "Audio"),
+    ("electronics ", ),
+    ("Electronics Accessories", ),
+    ("Kitchen", "Home"),
+]
+
+
+@pytest.fixture(scope="module")
+def categories(database):
+    """Category IDs by key, and products in them (plus one outside the taxonomy) by ASIN"""
+    from models import Product
+
+    ids = ensure_categories(database.session, PATHS)
+    products = [
+        Product(asin=asin, name=asin, category=category, category_id=ids.get(category_key(category)))
+        for asin, category in (("HEAD", "Headphones"), ("SPEAK", "Speakers"), ("AUDIO", "Audio"),
+                               ("ELEC", "Electronics"), ("DEVICE", "Electronics Accessories"),
+                               ("KITCHEN", "Kitchen"))
+    ]
+    products.append(Product(asin="UNLISTED", name="UNLISTED", category="Audio Cables"))
+    database.session.add_all(products)
+    database.session.commit()
+    invalidate_category_taxonomy()
+    return ids, {product.asin: product for product in products}
+
+
+def points(base, candidate, taxonomy):
+    return category_points(base, taxonomy)(candidate)
+
+
+def test_spellings_share_a_category(database, categories):
+    ids, _ = categories
+    assert ids["electronics"] == ensure_categories(database.session, [("ELECTRONICS",)])["electronics"]
+    assert set(ids) == {"headphones", "audio", "electronics", "speakers", "electronics accessories",
+                        "kitchen", "home"}
+
+
+def test_taxonomy_scores(database, categories):
+    _, products = categories
+    taxonomy = load_category_taxonomy(database.session)
+
+    assert points(products["HEAD"], products["HEAD"], taxonomy) == SAME_CATEGORY_SCORE
+    # Parent and child, a more distant ancestor, and names containing each other
+    assert points(products["HEAD"], products["AUDIO"], taxonomy) == SIMILAR_CATEGORY_SCORE
+    assert points(products["AUDIO"], products["HEAD"], taxonomy) == SIMILAR_CATEGORY_SCORE
+    assert points(products["HEAD"], products["ELEC"], taxonomy) == SIMILAR_CATEGORY_SCORE
+    assert points(products["ELEC"], products["DEVICE"], taxonomy) == SIMILAR_CATEGORY_SCORE
+    # Siblings and unrelated categories
+    assert points(products["HEAD"], products["SPEAK"], taxonomy) == 0.0
+    assert points(products["HEAD"], products["KITCHEN"], taxonomy) == 0.0
+
+
+def test_products_outside_the_taxonomy_are_scored_by_name(database, categories):
+    _, products = categories
+    taxonomy = load_category_taxonomy(database.session)
+    unlisted = products["UNLISTED"]
+
+    assert unlisted.category_id is None
+    assert points(unlisted, products["AUDIO"], taxonomy) == SIMILAR_CATEGORY_SCORE
+    assert points(products["AUDIO"], unlisted, taxonomy) == SIMILAR_CATEGORY_SCORE
+    assert points(products["HEAD"], unlisted, taxonomy) == 0.0
+    assert points(unlisted, unlisted, taxonomy) == SAME_CATEGORY_SCORE
+
+    # Plain objects without category_id, and no taxonomy at all
+    gadget = SimpleNamespace(category="Audio Cables")
+    assert points(gadget, products["AUDIO"], None) == SIMILAR_CATEGORY_SCORE
+    assert points(products["KITCHEN"], SimpleNamespace(category="Kitchen"), taxonomy) == SAME_CATEGORY_SCORE
+
+
+@pytest.mark.parametrize("category, expected", [
+    ("Audio", {"AUDIO", "HEAD", "SPEAK"}),
+    ("  audio ", {"AUDIO", "HEAD", "SPEAK"}),
+    ("Electronics", {"ELEC", "AUDIO", "HEAD", "SPEAK"}),
+    ("Speakers", {"SPEAK"}),
+    ("Home", {"KITCHEN"}),
+    ("Audio Cables", {"UNLISTED"}),
+    ("Garden", set()),
+])
+def test_category_filter(database, categories, category, expected):
+    from models import Product
+
+    asins = database.session.scalars(select(Product.asin).where(category_filter(database.session, category)))
+    assert set(asins) == expected
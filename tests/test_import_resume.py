@@ -0,0 +1,119 @@
+"""Resumable, idempotent imports (import_amazon_reviews.py)"""
+
+import json
+
+import pytest
+
+import import_amazon_reviews as importer
+
+RECORDS = 23
+BATCH_SIZE = 5
+
+TEXTS = (
+    "Great sound and the battery lasts all week, I love it",
+    "Terrible build quality, the hinge broke after two days",
+    "It works as described and arrived on time",
+)
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", BATCH_SIZE)
+
+
+def write_reviews(path, prefix):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(RECORDS):
+            f.write(json.dumps({
+                "asin": f"{prefix}{i // 4:05d}",
+                "product_title": f"Product {prefix} {i // 4}",
+                "category": "Electronics",
+                "price": 10 + i,
+                "review_text": f"{TEXTS[i % len(TEXTS)]} (review {i})",
+                "reviewer_name": f"Reviewer {i}",
+                "rating": 1 + i % 5,
+                "review_date": "2024-03-01",
+            }) + "\n")
+    return str(path)
+
+
+def imported_reviews(db, prefix):
+    from models import Product, Review
+
+    return db.session.execute(
+        db.select(Review.product_id, Review.dedupe_key)
+        .join(Product, Product.id == Review.product_id)
+        .where(Product.asin.startswith(prefix))
+    ).all()
+
+
+def test_interrupted_import_resumes_from_checkpoint(database, tmp_path):
+    from models import JobCheckpoint
+
+    path = write_reviews(tmp_path / "reviews.jsonl", "RES")
+
+    def stop_after_two_batches(done, total):
+        if done >= 2 * BATCH_SIZE:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        importer.import_file(path, progress=stop_after_two_batches)
+    assert len(imported_reviews(database, "RES")) == 2 * BATCH_SIZE
+
+    started = []
+    stats = importer.import_file(path, progress=lambda done, total: started.append(done))
+    assert started[0] == 2 * BATCH_SIZE
+    assert stats["reviews_created"] == RECORDS
+    assert stats["errors"] == 0
+
+    reviews = imported_reviews(database, "RES")
+    assert len(reviews) == RECORDS
+    assert len(set(reviews)) == RECORDS
+    checkpoint = database.session.scalar(database.select(JobCheckpoint).where(
+        JobCheckpoint.job_name == importer.import_checkpoint_name(path)))
+    assert checkpoint.completed_at is not None
+    assert checkpoint.processed == RECORDS
+
+
+def test_reimport_skips_existing_reviews(database, tmp_path):
+    from models import Product
+
+    path = write_reviews(tmp_path / "reviews.jsonl", "DUP")
+    first = importer.import_file(path)
+    again = importer.import_file(path)
+    restarted = importer.import_file(path, resume=False)
+
+    assert first["reviews_created"] == RECORDS
+    for stats in (again, restarted):
+        assert stats["reviews_created"] == 0
+        assert stats["reviews_skipped"] == RECORDS
+        assert stats["products_created"] == 0
+    assert len(imported_reviews(database, "DUP")) == RECORDS
+
+    # Each batch keeps the sentiment scores of the products it adds reviews to current
+    products = database.session.scalars(
+        database.select(Product).where(Product.asin.startswith("DUP"))).all()
+    assert all(abs(p.positive_score + p.neutral_score + p.negative_score - 1) < 1e-6 for p in products)
+
+
+def test_failing_batch_is_retried_one_record_at_a_time(database, tmp_path, monkeypatch):
+    path = write_reviews(tmp_path / "reviews.jsonl", "ERR")
+    analyze_sentiment = importer.analyze_sentiment
+
+    def failing_analyze_sentiment(text, **kwargs):
+        if "(review 7)" in text:
+            raise ValueError("cannot score this review")
+        return analyze_sentiment(text, **kwargs)
+
+    monkeypatch.setattr(importer, "analyze_sentiment", failing_analyze_sentiment)
+    stats = importer.import_file(path)
+
+    assert stats["errors"] == 1
+    assert stats["reviews_created"] == RECORDS - 1
+    reviews = imported_reviews(database, "ERR")
+    assert len(reviews) == RECORDS - 1
+    assert len(set(reviews)) == RECORDS - 1
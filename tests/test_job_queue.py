@@ -0,0 +1,179 @@
+"""Background job queue (backend/job_queue.py) on SQLite"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from backend import job_queue
+from backend.job_queue import (
+    cancel_job, claim_next_job, requeue_abandoned_jobs, retry_job, run_job, submit_job
+)
+
+
+class HandlerError(Exception):
+    pass
+
+
+def succeed(context, value=None):
+    return {"value": value}
+
+
+def fail(context):
+    raise HandlerError("handler failed")
+
+
+def report_progress(context):
+    context.report(1, 2, "Halfway", force=True)
+    return {}
+
+
+@pytest.fixture(autouse=True)
+def handlers(database, monkeypatch):
+    from models import Job
+
+    database.session.execute(delete(Job))
+    database.session.commit()
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "succeed", succeed)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "fail", fail)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "report", report_progress)
+    monkeypatch.setitem(job_queue.KIND_CONCURRENCY, "report", 1)
+
+
+def fetch(db, job_id):
+    from models import Job
+
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def run(db, job_id):
+    run_job(db.session, db.engine, job_id, threading.Event())
+    return fetch(db, job_id)
+
+
+def test_each_job_is_claimed_once(database):
+    job_ids = {submit_job(database.session, "succeed").id for _ in range(12)}
+    claimed = []
+    engine = database.engine
+
+    def worker(name):
+        with Session(engine) as session:
+            while (job_id := claim_next_job(session, name)) is not None:
+                claimed.append(job_id)
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+    assert all(fetch(database, job_id).attempts == 1 for job_id in job_ids)
+
+
+def test_limited_kind_is_not_claimed_twice_at_once(database):
+    first = submit_job(database.session, "report").id
+    second = submit_job(database.session, "report").id
+    other = submit_job(database.session, "succeed").id
+
+    assert claim_next_job(database.session, "worker-1") == first
+    assert claim_next_job(database.session, "worker-2") == other
+    assert claim_next_job(database.session, "worker-2") is None
+
+    assert run(database, first).status == "succeeded"
+    assert claim_next_job(database.session, "worker-2") == second
+
+
+def test_failed_job_backs_off_then_fails_after_max_attempts(database, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_BACKOFF", 30)
+    job_id = submit_job(database.session, "fail", max_attempts=2).id
+
+    assert claim_next_job(database.session, "worker") == job_id
+    before = datetime.utcnow()
+    job = run(database, job_id)
+    assert job.status == "queued"
+    assert job.error == "handler failed"
+    assert job.run_after >= before + timedelta(seconds=30)
+    assert claim_next_job(database.session, "worker") is None
+
+    job.run_after = datetime.utcnow()
+    database.session.commit()
+    assert claim_next_job(database.session, "worker") == job_id
+    job = run(database, job_id)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.finished_at is not None
+
+
+def test_successful_job_records_result(database):
+    job_id = submit_job(database.session, "succeed", {"value": 3}).id
+    claim_next_job(database.session, "worker")
+
+    job = run(database, job_id)
+    assert job.status == "succeeded"
+    assert job_queue.job_dict(job)["result"] == {"value": 3}
+
+
+def test_cancel_queued_job(database):
+    job = submit_job(database.session, "succeed")
+
+    cancel_job(database.session, job)
+    assert fetch(database, job.id).status == "cancelled"
+    assert claim_next_job(database.session, "worker") is None
+
+
+def test_cancel_running_job(database):
+    job_id = submit_job(database.session, "report").id
+    assert claim_next_job(database.session, "worker") == job_id
+
+    cancel_job(database.session, fetch(database, job_id))
+    assert fetch(database, job_id).cancel_requested
+    job = run(database, job_id)
+    assert job.status == "cancelled"
+    assert job.progress_done == 1
+
+
+def test_retry_only_failed_or_cancelled_jobs(database):
+    job = submit_job(database.session, "fail", max_attempts=1)
+    with pytest.raises(ValueError):
+        retry_job(database.session, job)
+
+    claim_next_job(database.session, "worker")
+    with pytest.raises(ValueError):
+        retry_job(database.session, fetch(database, job.id))
+
+    job = run(database, job.id)
+    assert job.status == "failed"
+    retry_job(database.session, job)
+    job = fetch(database, job.id)
+    assert (job.status, job.attempts, job.error) == ("queued", 0, None)
+
+    done = submit_job(database.session, "succeed")
+    assert claim_next_job(database.session, "worker") == job.id
+    assert claim_next_job(database.session, "worker") == done.id
+    assert run(database, done.id).status == "succeeded"
+    with pytest.raises(ValueError):
+        retry_job(database.session, fetch(database, done.id))
+
+
+def test_abandoned_jobs_are_requeued(database):
+    retried = submit_job(database.session, "succeed", max_attempts=2).id
+    exhausted = submit_job(database.session, "succeed", max_attempts=1).id
+    alive = submit_job(database.session, "succeed").id
+    for _ in range(3):
+        claim_next_job(database.session, "worker")
+
+    stale = datetime.utcnow() - timedelta(seconds=job_queue.HEARTBEAT_TIMEOUT + 60)
+    for job_id in (retried, exhausted):
+        fetch(database, job_id).heartbeat_at = stale
+        database.session.commit()
+
+    assert requeue_abandoned_jobs(database.session) == 1
+    assert fetch(database, retried).status == "queued"
+    assert fetch(database, retried).worker is None
+    assert fetch(database, exhausted).status == "failed"
+    assert fetch(database, alive).status == "running"
+    assert claim_next_job(database.session, "worker") == retried
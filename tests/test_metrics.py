@@ -0,0 +1,17 @@
+"""SQL timing listeners (backend/metrics.py)"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import app  # noqa: F401  (registers the SQL listeners on every Engine)
+
+
+def test_failed_statements_leave_no_start_time_on_the_connection():
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info.get("query_start_time") == []
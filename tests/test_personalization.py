@@ -0,0 +1,114 @@
+"""ProductFeatureIndex ranks like rank_recommendations, averaged over the saved products"""
+
+import pytest
+from sqlalchemy import select
+
+import app  # noqa: F401  (imports the models before the modules that use them)
+from backend.categories import category_points, current_category_taxonomy, invalidate_category_taxonomy
+from backend.personalization import SCORE_DECIMALS, ProductFeatureIndex
+from backend.recommendations import features_from_reviews, positive_reviews_by_product, rank_recommendations
+
+PRODUCTS = 24
+LIMIT = 6
+
+COPIED = (2, 5, 9)
+# IDs of the copies of COPIED[i]: without a price, then the tied pair
+NO_PRICE = [PRODUCTS + 1 + 3 * i for i in range(len(COPIED))]
+TIED = [(PRODUCTS + 2 + 3 * i, PRODUCTS + 3 + 3 * i) for i in range(len(COPIED))]
+UNCATEGORIZED = PRODUCTS + 3 * len(COPIED) + 1
+
+
+@pytest.fixture(scope="module")
+def catalog(database):
+    """(index, products by ID, features by ID, taxonomy) of a seeded catalog with priceless and tied products"""
+    from benchmarks.catalog import seed_catalog
+    from models import Product
+
+    seed_catalog(database, PRODUCTS, 5)
+    extra = []
+    for product in database.session.scalars(select(Product).where(Product.id.in_(COPIED)).order_by(Product.id)):
+        # A copy without a price, and two identical copies that tie
+        for price in (None, product.price, product.price):
+            extra.append(Product(
+                asin=f"COPY{len(extra)}", name=f"{product.name} copy", description=product.description,
+                price=price, category=product.category, category_id=product.category_id,
+                positive_score=product.positive_score, neutral_score=product.neutral_score,
+                negative_score=product.negative_score))
+    # Outside the taxonomy, scored by category name
+    extra.append(Product(asin="UNCATEGORIZED", name="Unlisted gadget", description="A gadget",
+                         price=30.0, category="Electronic Gadgets", positive_score=0.6, neutral_score=0.2,
+                         negative_score=0.2))
+    database.session.add_all(extra)
+    database.session.commit()
+
+    invalidate_category_taxonomy()
+    taxonomy = current_category_taxonomy(database.session)
+    products = {product.id: product for product in database.session.scalars(select(Product).order_by(Product.id))}
+    reviews_by_product = positive_reviews_by_product()
+    features = {pid: features_from_reviews(product.description, reviews_by_product.get(pid, []))
+                for pid, product in products.items()}
+    assert products[UNCATEGORIZED].category_id is None
+    assert all(products[pid].price is None for pid in NO_PRICE)
+    return ProductFeatureIndex.from_database(database.session), products, features, taxonomy
+
+
+def reference_score(base, product, base_features, features, taxonomy):
+    """rank_recommendations' score of one candidate"""
+    score = (product.positive_score * 1.0 + product.neutral_score * 0.5) * 5
+    score += category_points(base, taxonomy)(product)
+    if base.price and product.price:
+        price_diff_pct = abs(product.price - base.price) / max(base.price, 1)
+        score += 2 if price_diff_pct < 0.2 else 1 if price_diff_pct < 0.5 else 0
+    return score + len(set(base_features) & set(features)) * 0.5
+
+
+def reference_recommend(catalog, saved_ids, limit):
+    _, products, features, taxonomy = catalog
+    candidates = [pid for pid in products if pid not in saved_ids]
+    means = {
+        pid: round(sum(reference_score(products[saved_id], products[pid], features[saved_id], features[pid],
+                                       taxonomy) for saved_id in saved_ids) / len(saved_ids), SCORE_DECIMALS)
+        for pid in candidates
+    }
+    return sorted(candidates, key=lambda pid: (-means[pid], pid))[:limit]
+
+
+def test_single_saved_product_matches_rank_recommendations(catalog):
+    index, products, features, taxonomy = catalog
+    for product_id, base in products.items():
+        candidates = [product for pid, product in products.items() if pid != product_id]
+        expected = [product.id for product in rank_recommendations(
+            base, candidates, features[product_id], features, LIMIT, taxonomy=taxonomy)]
+        assert index.recommend([product_id], LIMIT) == expected
+        assert reference_recommend(catalog, [product_id], LIMIT) == expected
+
+
+@pytest.mark.parametrize("saved_ids", [
+    [1, 2],
+    [3, 7, 11, 19],
+    [2, NO_PRICE[0], TIED[0][0]],
+    NO_PRICE,
+    [UNCATEGORIZED, 4],
+    [TIED[1][1], 1],
+    list(range(1, PRODUCTS + 1)),
+])
+def test_several_saved_products_match_the_mean_score(catalog, saved_ids):
+    index = catalog[0]
+    assert index.recommend(saved_ids, LIMIT) == reference_recommend(catalog, saved_ids, LIMIT)
+
+
+@pytest.mark.parametrize("saved_ids", [[1], [4, 12]])
+def test_ties_keep_product_id_order(catalog, saved_ids):
+    index, products, _, _ = catalog
+    ranking = index.recommend(saved_ids, len(products))
+    for first, second in TIED:
+        assert ranking.index(second) == ranking.index(first) + 1
+    assert ranking == reference_recommend(catalog, saved_ids, len(products))
+
+
+def test_limits_and_unknown_products(catalog):
+    index, products, _, _ = catalog
+    assert index.recommend([1], 0) == []
+    assert index.recommend([10 ** 6], LIMIT) == []
+    assert len(index.recommend([1], len(products) + 10)) == len(products) - 1
+    assert index.recommend(list(products), LIMIT) == []
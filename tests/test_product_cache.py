@@ -0,0 +1,167 @@
+"""Single-flight coalescing and the product response cache"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend import product_cache as product_cache_module
+from backend.metrics import _label_key, registry
+from backend.product_cache import ProductCache
+from backend.single_flight import SingleFlight
+
+WAITERS = 8
+
+
+class LoaderError(Exception):
+    pass
+
+
+def run_concurrently(target, count=WAITERS):
+    """Call target from count threads, returning each call's result or exception"""
+    outcomes = [None] * count
+
+    def call(i):
+        try:
+            outcomes[i] = target()
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def blocking_loader(calls, release, outcome):
+    """Loader that counts its calls and finishes (returning or raising outcome) once released"""
+
+    def loader(*args):
+        calls.append(args)
+        release.wait(5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return loader
+
+
+def release_when_waiting(flight, release, waiters):
+    """Release the loader once every other caller is waiting on the leader"""
+
+    def wait_then_release():
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and _coalesced(flight) < waiters:
+            time.sleep(0.001)
+        release.set()
+
+    thread = threading.Thread(target=wait_then_release)
+    thread.start()
+    return thread
+
+
+def _coalesced(flight):
+    series = registry.snapshot()["counters"].get("single_flight_requests_total", {})
+    return series.get(_label_key({"group": flight.name, "result": "coalesced"}), 0)
+
+
+@pytest.fixture
+def flight(request):
+    return SingleFlight(f"test_{request.node.name}", enabled=True)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced monotonic clock of the product cache"""
+    now = [1000.0]
+    monkeypatch.setattr(product_cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_concurrent_misses_run_the_loader_once(flight):
+    cache = ProductCache(ttl=60)
+    calls, release = [], threading.Event()
+    result = {"id": 1}
+    releaser = release_when_waiting(flight, release, WAITERS - 1)
+
+    outcomes = run_concurrently(lambda: cache.get_or_compute(
+        ("detail", 1), flight, blocking_loader(calls, release, result), 1))
+    releaser.join()
+
+    assert calls == [(1,)]
+    assert all(outcome is result for outcome in outcomes)
+    assert flight.in_flight() == 0
+    assert cache.get(("detail", 1)) is result
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached(flight):
+    cache = ProductCache(ttl=60)
+    calls, release = [], threading.Event()
+    error = LoaderError("database unavailable")
+    releaser = release_when_waiting(flight, release, WAITERS - 1)
+
+    outcomes = run_concurrently(lambda: cache.get_or_compute(
+        ("detail", 1), flight, blocking_loader(calls, release, error), 1))
+    releaser.join()
+
+    assert len(calls) == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert cache.get(("detail", 1)) is None
+    assert cache.get_or_compute(("detail", 1), flight, lambda product_id: {"id": product_id}, 1) == {"id": 1}
+
+
+def test_entries_expire_after_ttl(flight, clock):
+    cache = ProductCache(ttl=10)
+    loads = []
+
+    def loader(product_id):
+        loads.append(product_id)
+        return {"id": product_id, "load": len(loads)}
+
+    assert cache.get_or_compute(("detail", 1), flight, loader, 1)["load"] == 1
+    clock[0] += 9
+    assert cache.get_or_compute(("detail", 1), flight, loader, 1)["load"] == 1
+    clock[0] += 2
+    assert cache.get_or_compute(("detail", 1), flight, loader, 1)["load"] == 2
+    assert len(loads) == 2
+
+
+def test_none_results_and_disabled_cache_are_not_stored(flight):
+    cache = ProductCache(ttl=60)
+    assert cache.get_or_compute(("detail", 404), flight, lambda product_id: None, 404) is None
+    assert len(cache) == 0
+
+    disabled = ProductCache(ttl=0)
+    disabled.set(("detail", 1), {"id": 1})
+    assert len(disabled) == 0
+
+
+def test_max_size_evicts_the_entry_closest_to_expiry(clock):
+    cache = ProductCache(ttl=60, max_size=3)
+    for product_id in range(1, 4):
+        cache.set(("detail", product_id), {"id": product_id})
+        clock[0] += 1
+
+    cache.set(("detail", 1), {"id": 1, "refreshed": True})
+    assert len(cache) == 3
+    cache.set(("detail", 4), {"id": 4})
+
+    assert len(cache) == 3
+    assert cache.get(("detail", 2)) is None
+    assert cache.get(("detail", 1)) == {"id": 1, "refreshed": True}
+    assert cache.get(("detail", 3)) == {"id": 3}
+    assert cache.get(("detail", 4)) == {"id": 4}
+
+
+def test_invalidate_drops_entries_by_prefix():
+    cache = ProductCache(ttl=60)
+    cache.set(("for_me", 1, 5, (2,)), [])
+    cache.set(("for_me", 2, 5, (3,)), [])
+    cache.set(("detail", 1), {"id": 1})
+
+    cache.invalidate(("for_me", 1))
+    assert cache.get(("for_me", 1, 5, (2,))) is None
+    assert cache.get(("for_me", 2, 5, (3,))) == []
+    assert cache.get(("detail", 1)) == {"id": 1}
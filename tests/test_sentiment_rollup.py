@@ -0,0 +1,94 @@
+"""Incrementally maintained sentiment rollups match a rebuild from the reviews"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+
+from backend.sentiment_analyzer import analyze_sentiment, classify_sentiment
+from backend.sentiment_rollup import get_sentiment_timeline, rebuild_sentiment_rollups, record_review_change
+
+POSITIVE = "Excellent quality, the battery life is amazing and I love the design"
+NEGATIVE = "Terrible quality, flimsy hinge and awful customer service, broke in a week"
+MIXED = "Great sound, but the case feels cheap"
+
+DATES = [datetime(2024, 1, 3), datetime(2024, 1, 4), datetime(2024, 1, 29), datetime(2024, 2, 14), None]
+
+
+def scored(text):
+    score = analyze_sentiment(text)
+    return score, classify_sentiment(score)
+
+
+def add_review(db, product, text, review_date):
+    from models import Review
+
+    score, sentiment_class = scored(text)
+    review = Review(product_id=product.id, text=text, date=review_date,
+                    sentiment_score=score, sentiment_class=sentiment_class)
+    db.session.add(review)
+    record_review_change(db.session, product.id, review_date, new=(score, sentiment_class))
+    return review
+
+
+def rescore(db, review, text):
+    score, sentiment_class = scored(text)
+    record_review_change(db.session, review.product_id, review.date,
+                         old=(review.sentiment_score, review.sentiment_class), new=(score, sentiment_class))
+    review.text, review.sentiment_score, review.sentiment_class = text, score, sentiment_class
+
+
+def remove(db, review):
+    record_review_change(db.session, review.product_id, review.date,
+                         old=(review.sentiment_score, review.sentiment_class))
+    db.session.delete(review)
+
+
+def rollup_rows(db):
+    """Counts and score sums of the rollup rows with any reviews, keyed by product, bucket and period"""
+    from models import ProductSentimentRollup
+
+    rows = [r for r in db.session.scalars(select(ProductSentimentRollup))
+            if r.positive_count + r.neutral_count + r.negative_count]
+    counts = {(r.product_id, r.bucket, r.period_start): (r.positive_count, r.neutral_count, r.negative_count)
+              for r in rows}
+    score_sums = {(r.product_id, r.bucket, r.period_start): r.score_sum for r in rows}
+    return counts, score_sums
+
+
+def test_incremental_rollups_match_rebuild(database):
+    from models import Product, ProductSentimentRollup, Review
+
+    database.session.execute(delete(ProductSentimentRollup))
+    database.session.execute(delete(Review))
+    products = [Product(name=f"Rollup product {i}", asin=f"ROLL{i}") for i in range(3)]
+    database.session.add_all(products)
+    database.session.flush()
+
+    reviews = []
+    for i in range(15):
+        text = (POSITIVE, NEGATIVE, MIXED)[i % 3]
+        reviews.append(add_review(database, products[i % 2], text, DATES[i % len(DATES)]))
+    # The only review of a period, re-scored and then deleted, leaves it empty
+    lone = add_review(database, products[2], POSITIVE, datetime(2023, 6, 1))
+    database.session.commit()
+
+    for review in reviews[:5]:
+        rescore(database, review, NEGATIVE if review.text == POSITIVE else POSITIVE)
+    rescore(database, lone, NEGATIVE)
+    database.session.commit()
+
+    for review in reviews[10:13] + [lone]:
+        remove(database, review)
+    add_review(database, products[1], MIXED, datetime(2024, 3, 1))
+    database.session.commit()
+
+    counts, score_sums = rollup_rows(database)
+    assert get_sentiment_timeline(products[2].id, "month") == []
+
+    rebuild_sentiment_rollups(database.session)
+    rebuilt_counts, rebuilt_score_sums = rollup_rows(database)
+    assert rebuilt_counts
+    assert counts == rebuilt_counts
+    # The rebuild sums the review snapshot's float32 scores
+    assert score_sums == pytest.approx(rebuilt_score_sums, rel=1e-6)
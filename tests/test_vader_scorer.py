@@ -0,0 +1,106 @@
+"""backend/vader_scorer.py scores texts exactly like NLTK's SentimentIntensityAnalyzer"""
+
+import os
+
+import nltk
+import pytest
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from backend.vader_scorer import VADER_LEXICON_FILE, FastSentimentIntensityAnalyzer
+
+NLTK_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'nltk_data')
+
+NEGATION = [
+    "This product is not good.",
+    "It isn't bad at all",
+    "I never liked the screen",
+    "Nothing about it is great",
+    "The battery is not very good",
+    "Without a doubt the best purchase I made",
+    "It is not the worst, but not the best either",
+    "I don't think it is not useful",
+    "This is the least helpful manual ever",
+    "at least it works",
+]
+
+BUT = [
+    "The screen is great but the battery is terrible",
+    "The price was bad, but the quality is excellent!",
+    "good but",
+    "But it broke after a week",
+    "It works but but it is slow",
+]
+
+CAPS = [
+    "This is GREAT",
+    "The sound is AMAZING but the fit is AWFUL",
+    "THE WHOLE REVIEW IS IN CAPS AND IT IS GOOD",
+    "I LOVE it, really LOVE it",
+    "Ok",
+]
+
+BOOSTERS = [
+    "The camera is very good",
+    "Extremely disappointing battery life",
+    "It is kind of nice",
+    "The case is barely usable",
+    "Absolutely fantastic and incredibly fast",
+    "The fit is sort of uncomfortable",
+    "This is the bomb",
+    "The update was the kiss of death for this phone",
+    "Hardly worth the money",
+]
+
+EMOJI = [
+    "Love it :)",
+    "Broke on day two :(",
+    "Works fine :-D",
+    "Great product 😀",
+    "Terrible 😡😡",
+    "meh </3",
+]
+
+PUNCTUATION = [
+    "Good!",
+    "Good!!!",
+    "Good!!!!!!!",
+    "Bad???",
+    "Is it good?!?!",
+    "Works... I guess",
+    "Great, fast, cheap.",
+    "'good' and \"nice\"",
+    "",
+    "   ",
+    "!!!",
+]
+
+
+@pytest.fixture(scope="module")
+def analyzers():
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    try:
+        nltk.data.find(VADER_LEXICON_FILE)
+    except LookupError:
+        pytest.skip("vader_lexicon is not installed")
+    return SentimentIntensityAnalyzer(), FastSentimentIntensityAnalyzer()
+
+
+@pytest.mark.parametrize("text", NEGATION + BUT + CAPS + BOOSTERS + EMOJI + PUNCTUATION)
+def test_matches_nltk(analyzers, text):
+    nltk_analyzer, fast_analyzer = analyzers
+    assert fast_analyzer.polarity_scores(text) == nltk_analyzer.polarity_scores(text)
+
+
+def test_matches_nltk_with_cached_tokens(analyzers):
+    nltk_analyzer, fast_analyzer = analyzers
+    texts = NEGATION + BUT + CAPS + BOOSTERS
+    # Scoring again reuses the cached token attributes
+    for text in texts + texts:
+        assert fast_analyzer.polarity_scores(text) == nltk_analyzer.polarity_scores(text)
+
+
+def test_repeated_tokens_match_nltk(analyzers):
+    nltk_analyzer, fast_analyzer = analyzers
+    text = "good good not good very good GOOD but bad bad!!"
+    assert fast_analyzer.polarity_scores(text) == nltk_analyzer.polarity_scores(text)